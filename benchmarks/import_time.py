@@ -0,0 +1,92 @@
+"""
+Cold-start benchmark for the pydiagram entry points.
+
+Each module is imported in a fresh interpreter several times. The benchmark fails when
+the best import time of a module exceeds the budget, or when importing it loads one of
+the heavy optional dependencies, which must only be imported by the code paths that use
+them.
+
+Usage:
+    python benchmarks/import_time.py [--budget-ms 150] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ENTRY_MODULES = [
+    "main",
+    "pydiagram.cli",
+    "pydiagram.py_class_extractor",
+    "pydiagram.uml_generator.layout",
+    "pydiagram.uml_generator.renderers",
+]
+
+HEAVY_MODULES = [
+    "chardet",
+    "networkx",
+    "numpy",
+    "pydot",
+    "multiprocessing",
+    "concurrent.futures.process",
+]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "heavy": sorted(set({heavy!r}) & set(sys.modules))}}))
+"""
+
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(module: str, repeat: int) -> dict:
+    """
+    Imports a module in `repeat` fresh interpreters and keeps the best time.
+
+    Args:
+        module (str): The module to import.
+        repeat (int): The number of interpreters to start.
+
+    Returns:
+        dict: The best import time in seconds and the heavy modules that were loaded.
+    """
+    best = None
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=REPOSITORY_ROOT, capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        if best is None or result["seconds"] < best["seconds"]:
+            best = result
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=150.0,
+                        help="maximum import time of each entry module, in milliseconds")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="number of fresh interpreters per module")
+    args = parser.parse_args()
+
+    failed = False
+    for module in ENTRY_MODULES:
+        result = measure(module, args.repeat)
+        milliseconds = result["seconds"] * 1000
+        problems = []
+        if milliseconds > args.budget_ms:
+            problems.append(f"over the {args.budget_ms:.0f} ms budget")
+        if result["heavy"]:
+            problems.append(f"imports {', '.join(result['heavy'])}")
+        failed = failed or bool(problems)
+        print(f"{module:40} {milliseconds:8.1f} ms  {'; '.join(problems) or 'ok'}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""
+Scaling benchmark of class extraction on adversarial inputs.
+
+Each case generates a Python module at a few increasing sizes and extracts its classes
+with `process_file`. The benchmark fails when the cost per AST node of the largest size
+exceeds the cost per node of the smallest size by more than the allowed growth, which
+catches extraction steps that are quadratic or exponential in the size of the input.
+
+Usage:
+    python benchmarks/pathological.py [--max-growth 2.5] [--repeat 3] [--case deep_tuples] [--depth full]
+"""
+import argparse
+import ast
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY_ROOT)
+
+from pydiagram.py_class_extractor import process_file  # noqa: E402
+from pydiagram.py_class_extractor.filters import EXTRACTION_DEPTHS, ExtractionFilter  # noqa: E402
+
+
+def deep_tuples(size: int) -> str:
+    """
+    A method assigning and returning tuples nested `size` levels deep.
+    """
+    target = "self.a0"
+    literal = "0"
+    for level in range(1, size + 1):
+        target = f"(self.a{level}, {target})"
+        literal = f"({level}, {literal})"
+    return ("class Table:\n"
+            "    def __init__(self):\n"
+            f"        {target} = {literal}\n"
+            "    def rows(self):\n"
+            f"        return {literal}\n")
+
+
+def literal_dict(size: int) -> str:
+    """
+    A class attribute holding a dictionary literal with `size` entries.
+    """
+    entries = ",\n".join(f"        {index}: ({index}, 'value{index}', [{index}, {index + 1}])"
+                         for index in range(size))
+    return f"class Settings:\n    TABLE = {{\n{entries}\n    }}\n"
+
+
+def many_methods(size: int) -> str:
+    """
+    A class with `size` annotated methods referencing a few other classes.
+    """
+    lines = ["class Left:\n    pass\n", "class Right:\n    pass\n", "class Service(Left):"]
+    for index in range(size):
+        lines.append(f"    def method{index}(self, left: Left, right: 'Right') -> Left:\n"
+                     f"        self.value{index} = Right(left, right)\n"
+                     f"        return left")
+    return "\n".join(lines) + "\n"
+
+
+def many_classes(size: int) -> str:
+    """
+    `size` classes in one module, each annotating, calling and inheriting from its neighbors.
+    """
+    lines = ["class Class0:\n    pass"]
+    for index in range(1, size):
+        lines.append(f"class Class{index}(Class{index - 1}):\n"
+                     f"    previous: Class{index - 1}\n"
+                     f"    def link(self, other: 'Class{max(index - 2, 0)}') -> None:\n"
+                     f"        self.other = Class{index - 1}(other)")
+    return "\n".join(lines) + "\n"
+
+
+def nested_classes(size: int) -> str:
+    """
+    Classes nested `size` levels deep, each with a method and an attribute.
+    """
+    lines = []
+    for level in range(size):
+        indent = "    " * level
+        lines.append(f"{indent}class Level{level}:")
+        lines.append(f"{indent}    def method{level}(self):\n{indent}        self.value{level} = {level}")
+    return "\n".join(lines) + "\n"
+
+
+# Case name -> (source generator, sizes)
+CASES: Dict[str, tuple] = {
+    "deep_tuples": (deep_tuples, [8, 16, 32]),
+    "literal_dict": (literal_dict, [1000, 2000, 4000]),
+    "many_methods": (many_methods, [2500, 5000, 10000]),
+    "many_classes": (many_classes, [1000, 2000, 4000]),
+    "nested_classes": (nested_classes, [10, 20, 40]),
+}
+
+
+def measure(generate: Callable[[int], str], size: int, repeat: int, directory: str,
+            depth: str = "full") -> tuple:
+    """
+    Extracts the classes of a generated module `repeat` times and keeps the best time.
+
+    Args:
+        generate (Callable[[int], str]): The source generator of the case.
+        size (int): The size passed to the generator.
+        repeat (int): The number of extractions.
+        directory (str): The directory the module is written to.
+        depth (str): The extraction depth.
+
+    Returns:
+        tuple: The number of AST nodes of the module and the best extraction time in seconds.
+    """
+    source = generate(size)
+    path = os.path.join(directory, f"{generate.__name__}_{size}.py")
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(source)
+    nodes = sum(1 for _ in ast.walk(ast.parse(source)))
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        process_file(path, os.path.dirname(directory), ExtractionFilter(depth=depth))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return nodes, best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--max-growth", type=float, default=2.5,
+                        help="maximum ratio between the cost per node of the largest and the smallest size")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="number of extractions per size")
+    parser.add_argument("--case", action="append", choices=sorted(CASES),
+                        help="run only this case (repeatable)")
+    parser.add_argument("--depth", choices=EXTRACTION_DEPTHS, default="full",
+                        help="extraction depth (default: full)")
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as directory:
+        for name in args.case or CASES:
+            generate, sizes = CASES[name]
+            costs: List[float] = []
+            for size in sizes:
+                nodes, seconds = measure(generate, size, args.repeat, directory, args.depth)
+                costs.append(seconds / nodes * 1e6)
+                print(f"{name:16} size {size:6}  {nodes:8} nodes  {seconds * 1000:9.1f} ms  "
+                      f"{costs[-1]:6.2f} us/node")
+
+            growth = costs[-1] / costs[0]
+            ok = growth <= args.max_growth
+            failed = failed or not ok
+            print(f"{name:16} cost per node x{growth:.2f}  "
+                  f"{'ok' if ok else f'over the x{args.max_growth:g} limit'}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
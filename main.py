@@ -7,40 +7,29 @@ import xml.etree.ElementTree as ET
 from pydiagram.py_class_extractor import generate_classes_dicts_from_directory, generate_classes_dicts_from_file
 from pydiagram.py_class_extractor.ast_management import parse_ast_from_file
 from pydiagram.py_class_extractor.file_management import save_data_to_json
-from pydiagram.uml_generator.builders.relationships import RelationshipBuilder
-from pydiagram.uml_generator.elements import DrawIODiagram, UMLClassDiagramElement
-from pydiagram.uml_generator.relationships import AssociationRelationship, InheritanceRelationship
-from pydiagram.uml_generator.utils import Dimensions
-
-import networkx as nx
-from networkx.drawing.nx_pydot import pydot_layout
+from pydiagram.pipeline import build_drawio_diagram
+from pydiagram.uml_generator.layout import LayoutCache, autolayout_class_diagram
+from pydiagram.uml_generator.layout.dot import find_graphviz
+from pydiagram.uml_generator.layout.incremental import load_previous_positions
 
 # Configure logging
 logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s - %(levelname)s - %(message)s')
 
-
-def has_common_element(arr1, arr2):
-    if len(arr1) == 0 and len(arr2) == 0:
-        return True
-    return bool(set(arr1) & set(arr2))
+# "layered" needs no external tool; "dot" runs Graphviz through networkx and pydot;
+# "force" needs NumPy and is meant for graphs too large for "dot".
+LAYOUT_ENGINE = "layered"
+LAYOUT_CACHE_DIR = os.path.join(".pydiagram-cache", "layout")
+# Set to True to ignore cached layouts and recompute them
+FORCE_LAYOUT = False
+LAYOUT_JOBS = os.cpu_count() or 1
 
 
 def install_graphviz():
     """Install Graphviz using winget if it's not already installed."""
-    try:
-        # Check if Graphviz is already installed
-        result = subprocess.run(
-            ['winget', 'search', 'Graphviz.Graphviz', '--accept-source-agreements'], capture_output=True, text=True)
-        if "Graphviz" in result.stdout:
-            logging.info("Graphviz is already installed.")
-            return
-    except FileNotFoundError:
-        logging.error("winget not found. Please install winget first.")
-        sys.exit(1)
-    except subprocess.CalledProcessError:
-        logging.error("Error checking Graphviz installation status.")
-        sys.exit(1)
+    if find_graphviz():
+        logging.info("Graphviz is already installed.")
+        return
 
     logging.info("Installing Graphviz...")
     try:
@@ -50,17 +39,26 @@ def install_graphviz():
             '--accept-package-agreements'
         ], check=True)
         logging.info("Graphviz installed successfully.")
+    except FileNotFoundError:
+        logging.error("winget not found. Please install winget first.")
+        sys.exit(1)
     except subprocess.CalledProcessError:
         logging.error("Failed to install Graphviz.")
         sys.exit(1)
+    find_graphviz.cache_clear()
 
 
 def add_graphviz_to_path():
     """Add Graphviz to system PATH."""
-    graphviz_bin_dir = r"C:\Program Files\Graphviz\bin"
+    dot_path = find_graphviz()
+    if dot_path is None:
+        logging.error("Graphviz not found.")
+        sys.exit(1)
+
+    graphviz_bin_dir = os.path.dirname(dot_path)
     current_path = os.getenv('PATH', '')
 
-    if graphviz_bin_dir not in current_path:
+    if graphviz_bin_dir not in current_path.split(os.pathsep):
         new_path = os.pathsep.join([current_path, graphviz_bin_dir])
         os.environ['PATH'] = new_path
 
@@ -74,71 +72,10 @@ def add_graphviz_to_path():
         logging.info("Graphviz directory is already in PATH.")
 
 
-def sanitize_class_name(name):
-    """Sanitize class names to be used as node identifiers."""
-    return ''.join(char for char in name if char.isalnum() or char == '_')
-
-
-def autolayout_class_diagram(metadata):
-    """Generate and save a class diagram from the metadata."""
-    G = nx.DiGraph()
-    for cls in metadata:
-        sanitized_name = sanitize_class_name(cls["name"])
-        G.add_node(sanitized_name, label=cls["name"])
-
-    for cls in metadata:
-        source_name = sanitize_class_name(cls["name"])
-        for rel in cls["relationships"]:
-            target_name = sanitize_class_name(rel.get("related", ""))
-            if target_name in G.nodes:
-                G.add_edge(source_name, target_name)
-
-    pos = pydot_layout(G, prog='dot')
-    return pos
-
-
-def create_uml_classes(metadata, diagram, positions):
-    """Create UML class elements from metadata."""
-    classes = []
-    for class_metadata in metadata:
-        sanitized_name = sanitize_class_name(class_metadata["name"])
-        if sanitized_name in positions:
-            x, y = positions[sanitized_name]
-            dimensions = Dimensions(x=x*3, y=y*5, width=160, height=26)
-            UML_class = UMLClassDiagramElement(
-                class_metadata, dimensions, diagram.default_parent_id)
-            classes.append(UML_class)
-        else:
-            logging.warning(
-                f"Node {class_metadata['name']} not found in positions.")
-    return classes
-
-
-def create_relationships(metadata, classes, diagram):
-    """Create relationships between UML classes."""
-    relationships = []
-    view = []
-    for source_index, source_class_metadata in enumerate(metadata):
-        source_id = classes[source_index].id
-        for relationship in source_class_metadata["relationships"]:
-            builder = RelationshipBuilder(diagram.default_parent_id, source_id)
-            for target_index, target_class_metadata in enumerate(metadata):
-                if (relationship["related"] == target_class_metadata["name"] and
-                        has_common_element(relationship["modules"], target_class_metadata["modules"])):
-                    if relationship["relation_type"] == "inheritance":
-                        view.append((source_class_metadata["name"], target_class_metadata["name"]))
-                        relationships.append(builder.build(
-                            InheritanceRelationship, classes[target_index].id))
-                    elif relationship["relation_type"] == "association":
-                        view.append((source_class_metadata["name"], target_class_metadata["name"]))
-                        relationships.append(builder.build(
-                            AssociationRelationship, classes[target_index].id))
-    return relationships
-
-
 def main():
-    install_graphviz()
-    add_graphviz_to_path()
+    if LAYOUT_ENGINE == "dot":
+        install_graphviz()
+        add_graphviz_to_path()
 
     metadata = generate_classes_dicts_from_file(
         r"C:\Users\Aluno\Desktop\pydiagram\tests\test_2.py")
@@ -151,14 +88,16 @@ def main():
     
     save_data_to_json("class.json", metadata)
 
-    positions = autolayout_class_diagram(metadata)
+    # Keep the classes of the previous diagram (including manual moves) where they are
+    previous_positions = None
+    if os.path.exists('output.xml'):
+        previous_positions = load_previous_positions('output.xml')
 
-    diagram = DrawIODiagram("pydiagram")
-    classes = create_uml_classes(metadata, diagram, positions)
-    relationships = create_relationships(metadata, classes, diagram)
+    positions = autolayout_class_diagram(
+        metadata, LAYOUT_ENGINE, previous_positions,
+        cache=LayoutCache(LAYOUT_CACHE_DIR), force=FORCE_LAYOUT, jobs=LAYOUT_JOBS)
 
-    diagram.extend(relationships)
-    diagram.extend(classes)
+    diagram = build_drawio_diagram(metadata, positions)
     with open('output.xml', 'w', encoding='utf-8') as file:
         file.write(ET.tostring(diagram, encoding='unicode'))
 
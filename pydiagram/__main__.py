@@ -0,0 +1,4 @@
+import sys
+from pydiagram.cli import main
+
+sys.exit(main())
@@ -0,0 +1,394 @@
+import argparse
+import contextlib
+import json
+import logging
+import os
+import sys
+from typing import List, Optional, Tuple
+from pydiagram.pipeline import DEFAULT_QUEUE_SIZE, OUTPUT_FORMATS, STAGES, render_diagram, render_pipelined
+from pydiagram.profiling import profile_memory, stage
+from pydiagram.py_class_extractor import extract_shard, extract_to_store, generate_classes_dicts_from_paths, merge_shards
+from pydiagram.py_class_extractor.diff import diff_metadata
+from pydiagram.py_class_extractor.file_management import save_data_to_json
+from pydiagram.py_class_extractor.filters import EXTRACTION_DEPTHS, ExtractionFilter
+from pydiagram.uml_generator.layout import LAYOUT_ENGINES, LayoutCache, autolayout_class_diagram
+from pydiagram.uml_generator.layout.graph import ClassGraph
+from pydiagram.uml_generator.layout.incremental import load_previous_positions, save_positions_file
+from pydiagram.uml_generator.patch import patch_drawio_file
+from pydiagram.uml_generator.selection import RANKINGS, select_neighborhood, select_top_classes
+
+DEFAULT_CACHE_DIR = os.path.join(".pydiagram-cache", "layout")
+# Same as pydiagram.server.DEFAULT_PORT, repeated so the server is not imported at startup
+DEFAULT_PORT = 8765
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Builds the parser of the `pydiagram` command line.
+
+    Returns:
+        argparse.ArgumentParser: The argument parser.
+    """
+    parser = argparse.ArgumentParser(
+        prog="pydiagram",
+        description="Generate UML class diagrams from Python source code.")
+    parser.add_argument("paths", nargs="*",
+                        help="Python files, directories or archives (.whl, .zip, .tar.gz) to analyze "
+                             "(needed by the extract stage)")
+    parser.add_argument("-f", "--format", choices=OUTPUT_FORMATS, default="drawio",
+                        help="output format of the render stage (default: drawio)")
+    parser.add_argument("-o", "--output", default="-",
+                        help="file the diagram is written to, or - for standard output (default: -)")
+    parser.add_argument("--stages", type=parse_stages,
+                        help="comma-separated stages to run, among extract, layout and render "
+                             "(default: every stage the output format needs, and extract only "
+                             "when input paths are given)")
+    parser.add_argument("--metadata",
+                        help="class metadata JSON file, written by the extract stage and read "
+                             "by the other stages when extract is not run")
+    parser.add_argument("--positions",
+                        help="class positions JSON file, written by the layout stage and read by the "
+                             "render stage when layout is not run; positions found there are kept")
+    parser.add_argument("--store",
+                        help="SQLite metadata store, written by the extract stage and read by the "
+                             "other stages when extract is not run (instead of --metadata)")
+    parser.add_argument("--package",
+                        help="with --store, only read the classes of this dotted module prefix")
+    parser.add_argument("--include", action="append", default=[], metavar="PATTERN",
+                        help="only extract the modules matching this pattern, for example 'app.models.*'; "
+                             "a pattern without a dot matches a package or module name at any depth "
+                             "(repeatable)")
+    parser.add_argument("--exclude", action="append", default=[], metavar="PATTERN",
+                        help="skip the modules matching this pattern, for example 'migrations' or "
+                             "'*.tests.*', without reading them (repeatable)")
+    parser.add_argument("--include-class", action="append", default=[], metavar="PATTERN",
+                        help="only extract the classes whose name or qualified name matches this "
+                             "pattern (repeatable)")
+    parser.add_argument("--exclude-class", action="append", default=[], metavar="PATTERN",
+                        help="skip the classes whose name or qualified name matches this pattern, "
+                             "for example 'Test*' (repeatable)")
+    parser.add_argument("--depth", choices=EXTRACTION_DEPTHS, default="full",
+                        help="detail extracted from each class: headers (names and bases), signatures "
+                             "(and methods, class attributes and annotations, without reading method "
+                             "bodies) or full (default: full)")
+    parser.add_argument("--diff-from", metavar="OLD_METADATA",
+                        help="compare the class metadata with a previous class metadata file and "
+                             "write the differences as JSON instead of a diagram")
+    parser.add_argument("--patch", metavar="DRAWIO",
+                        help="with --diff-from, update a draw.io file built from the previous "
+                             "metadata in place instead of writing the differences")
+    parser.add_argument("--shard", type=parse_shard,
+                        help="extract only shard i of N (1 <= i <= N) and write a partial metadata "
+                             "file to --metadata, to be combined with --merge")
+    parser.add_argument("--merge", nargs="+", metavar="SHARD",
+                        help="build the class metadata from the partial files of every shard "
+                             "instead of extracting it")
+    parser.add_argument("--seed", action="append", metavar="CLASS",
+                        help="only lay out and render this class and its neighborhood (see --hops); "
+                             "a class name or a dotted qualified name, repeatable")
+    parser.add_argument("--hops", type=int, default=1,
+                        help="with --seed, the maximum number of relationships between a seed and "
+                             "a shown class (default: 1)")
+    parser.add_argument("--top", type=int, metavar="N",
+                        help="only lay out and render the N most connected classes; the number of "
+                             "hidden related classes is shown next to the class names")
+    parser.add_argument("--rank", choices=RANKINGS, default="degree",
+                        help="with --top, how classes are ranked (default: degree)")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="maximum number of worker processes, 0 for one per CPU (default: 1)")
+    parser.add_argument("--layout-engine", choices=LAYOUT_ENGINES, default="layered",
+                        help="layout engine (default: layered)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help=f"directory of the layout cache (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="do not read or write the layout cache")
+    parser.add_argument("--force-layout", action="store_true",
+                        help="recompute the layout even when the cache holds it")
+    parser.add_argument("--reset-positions", action="store_true",
+                        help="ignore the positions of a previous run and lay out every class again")
+    parser.add_argument("--pipelined", action="store_true",
+                        help="run every stage at once, package by package, with the stages "
+                             "connected by bounded queues; text output is identical to a sequential "
+                             "run, draw.io output is equivalent but lays each package out in its own band")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE,
+                        help=f"packages waiting between two pipelined stages (default: {DEFAULT_QUEUE_SIZE})")
+    parser.add_argument("--serve", action="store_true",
+                        help="run a local diagram server over the first path (default: the current "
+                             "directory) instead of the pipeline")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT,
+                        help=f"port of the diagram server (default: {DEFAULT_PORT})")
+    parser.add_argument("--memory-report", metavar="REPORT",
+                        help="trace the memory of every stage (slower) and write the peaks, RSS "
+                             "deltas and top allocation sites of each stage as JSON")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="log the progress of each stage")
+    return parser
+
+
+def parse_stages(value: str) -> List[str]:
+    """
+    Parses a comma-separated list of stages, keeping the pipeline order.
+
+    Args:
+        value (str): The value of the `--stages` option.
+
+    Returns:
+        List[str]: The selected stages.
+
+    Raises:
+        argparse.ArgumentTypeError: If a stage is unknown.
+    """
+    stages = {stage.strip() for stage in value.split(",") if stage.strip()}
+    unknown = stages.difference(STAGES)
+    if unknown or not stages:
+        raise argparse.ArgumentTypeError(
+            f"invalid stages: {value!r}. Expected a comma-separated list of: {', '.join(STAGES)}")
+    return [stage for stage in STAGES if stage in stages]
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """
+    Parses a shard specification of the form "i/N".
+
+    Args:
+        value (str): The value of the `--shard` option.
+
+    Returns:
+        Tuple[int, int]: The shard index and the shard count.
+
+    Raises:
+        argparse.ArgumentTypeError: If the specification is invalid.
+    """
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid shard: {value!r}. Expected i/N, for example 1/4")
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"invalid shard: {value!r}. Expected 1 <= i <= N")
+    return index, count
+
+
+def run(args: argparse.Namespace) -> None:
+    """
+    Runs the selected stages of the pipeline.
+
+    Every stage either computes its input from the previous stage or reads it from the
+    artifact written by an earlier run (`--metadata`, `--positions`), so the stages can be
+    run separately, for example the extract stage alone in CI.
+
+    Args:
+        args (argparse.Namespace): The parsed command line.
+
+    Raises:
+        ValueError: If a stage lacks its input.
+    """
+    stages = args.stages
+    if stages is None:
+        stages = [stage for stage in STAGES
+                  if (stage != "layout" or args.format == "drawio" or args.positions)
+                  and (stage != "extract" or args.paths)]
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+    extraction_filter = None
+    if args.include or args.exclude or args.include_class or args.exclude_class or args.depth != "full":
+        if "extract" not in stages or args.serve or args.merge:
+            raise ValueError("--include, --exclude, --include-class, --exclude-class and --depth only apply "
+                             "to the extract stage.")
+        extraction_filter = ExtractionFilter(tuple(args.include), tuple(args.exclude),
+                                             tuple(args.include_class), tuple(args.exclude_class), args.depth)
+
+    if args.serve:
+        # Imported here: asyncio is only needed by the server
+        from pydiagram.server import serve
+        serve(args.paths[0] if args.paths else ".", args.port, args.layout_engine,
+              None if args.no_cache else args.cache_dir, jobs)
+        return
+
+    if args.pipelined:
+        if args.stages is not None or args.metadata or args.positions or args.top is not None or args.seed:
+            raise ValueError("--pipelined runs every stage at once and cannot be combined with "
+                             "--stages, --metadata, --positions, --seed or --top.")
+        if not args.paths:
+            raise ValueError("The extract stage needs at least one input path.")
+        with _open_output(args.output) as stream, stage("pipelined"):
+            render_pipelined(args.paths, stream, args.format, args.layout_engine,
+                             None if args.no_cache else LayoutCache(args.cache_dir), jobs, args.queue_size,
+                             extraction_filter)
+        return
+
+    if args.shard is not None:
+        if stages != ["extract"] or not args.metadata or not args.paths:
+            raise ValueError("--shard only runs the extract stage: use it with --stages extract, "
+                             "--metadata and the input paths.")
+        save_data_to_json(args.metadata, extract_shard(args.paths, args.shard, jobs, extraction_filter))
+        logging.info(f"Shard {args.shard[0]}/{args.shard[1]} saved as '{args.metadata}'.")
+        return
+
+    if args.patch and not args.diff_from:
+        raise ValueError("--patch needs --diff-from, the metadata the draw.io file was built from.")
+    old_metadata = None
+    if args.diff_from:
+        # Read before the extract stage, which may overwrite the same file through --metadata
+        with open(args.diff_from, "r", encoding="utf-8") as file:
+            old_metadata = json.load(file)
+
+    if args.merge:
+        shards = []
+        for shard_path in args.merge:
+            with open(shard_path, "r", encoding="utf-8") as file:
+                shards.append(json.load(file))
+        with stage("merge"):
+            metadata = merge_shards(shards)
+        logging.info(f"Merged {len(shards)} shards into {len(metadata)} classes.")
+        if args.metadata:
+            save_data_to_json(args.metadata, metadata)
+            logging.info(f"Class metadata saved as '{args.metadata}'.")
+    elif "extract" in stages and args.store:
+        if not args.paths:
+            raise ValueError("The extract stage needs at least one input path.")
+        with _open_store(args.store) as store:
+            store.clear()
+            with stage("extract"):
+                written = extract_to_store(args.paths, store, jobs, extraction_filter)
+            logging.info(f"Stored {written} classes in '{args.store}'.")
+            # Reading the classes back is only worth it when other stages follow
+            metadata = _read_store(store, args) if stages != ["extract"] else []
+    elif "extract" in stages:
+        if not args.paths:
+            raise ValueError("The extract stage needs at least one input path.")
+        with stage("extract"):
+            metadata = generate_classes_dicts_from_paths(args.paths, jobs, extraction_filter=extraction_filter)
+        logging.info(f"Extracted {len(metadata)} classes.")
+        if args.metadata:
+            save_data_to_json(args.metadata, metadata)
+            logging.info(f"Class metadata saved as '{args.metadata}'.")
+    elif args.store:
+        with _open_store(args.store) as store:
+            metadata = _read_store(store, args)
+    elif args.metadata:
+        with open(args.metadata, "r", encoding="utf-8") as file:
+            metadata = json.load(file)
+    else:
+        raise ValueError("Without the extract stage, --metadata or --store must point to the class metadata.")
+
+    if old_metadata is not None:
+        if args.patch:
+            diff = patch_drawio_file(args.patch, old_metadata, metadata)
+            logging.info(f"'{args.patch}' patched: {len(diff.added_classes)} classes added, "
+                         f"{len(diff.removed_classes)} removed, {len(diff.changed_classes)} changed.")
+        else:
+            with _open_output(args.output) as stream:
+                json.dump(diff_metadata(old_metadata, metadata).to_dictionary(), stream, ensure_ascii=False, indent=4)
+        return
+
+    if args.seed:
+        metadata = select_neighborhood(metadata, args.seed, args.hops)
+        logging.info(f"Kept {len(metadata)} classes within {args.hops} hops of {', '.join(args.seed)}.")
+    if args.top is not None:
+        metadata = select_top_classes(metadata, args.top, args.rank)
+        logging.info(f"Kept the {len(metadata)} classes with the highest {args.rank}.")
+
+    positions = None
+    if "layout" in stages:
+        previous_positions = None
+        if not args.reset_positions:
+            previous_path = args.positions
+            if args.format == "drawio" and os.path.splitext(args.output)[1].lower() in (".xml", ".drawio"):
+                previous_path = previous_path or args.output
+            if previous_path and os.path.exists(previous_path):
+                # Keep the classes of the previous diagram (including manual moves) where they are
+                previous_positions = load_previous_positions(previous_path)
+
+        cache = None if args.no_cache else LayoutCache(args.cache_dir)
+        with stage("layout"):
+            positions = autolayout_class_diagram(
+                metadata, args.layout_engine, previous_positions,
+                cache=cache, force=args.force_layout, jobs=jobs)
+        logging.info(f"Laid out {len(positions)} classes with the {args.layout_engine} engine.")
+        if args.positions:
+            save_positions_file(args.positions, positions, ClassGraph.from_metadata(metadata))
+            logging.info(f"Class positions saved as '{args.positions}'.")
+    elif "render" in stages and args.format == "drawio":
+        if not args.positions:
+            raise ValueError("Without the layout stage, --positions must point to the class positions.")
+        positions = {name: stored[:2] for name, stored in load_previous_positions(args.positions).items()}
+
+    if "render" in stages:
+        with _open_output(args.output) as stream, stage("render"):
+            render_diagram(metadata, stream, args.format, positions)
+        if args.output != "-":
+            logging.info(f"UML diagram saved as '{args.output}'.")
+
+
+def _run_profiled(args: argparse.Namespace) -> None:
+    """
+    Runs the pipeline under `profile_memory` and writes the memory report, even if a stage fails.
+    """
+    if args.jobs != 1:
+        logging.warning("Only the main process is profiled: the files parsed and the components laid "
+                        "out by worker processes are missing from the memory report.")
+    with profile_memory() as profiler:
+        try:
+            run(args)
+        finally:
+            save_data_to_json(args.memory_report, profiler.report())
+            logging.info(f"Memory report saved as '{args.memory_report}'.")
+
+
+def _open_store(path: str):
+    """
+    Opens a metadata store; sqlite3 is only imported when a store is used.
+    """
+    from pydiagram.py_class_extractor.store import MetadataStore
+    return MetadataStore(path)
+
+
+def _read_store(store, args: argparse.Namespace) -> List[dict]:
+    """
+    Reads the classes of a metadata store that the diagram may show.
+
+    With --seed, only the neighborhood of the seeds is read, matched by class name, and
+    `select_neighborhood` narrows it down to the resolved relationships afterwards. One more
+    hop is read so that the classes at the edge of the neighborhood count their hidden
+    related classes.
+    """
+    if args.seed:
+        return store.neighborhood([seed.rsplit(".", 1)[-1] for seed in args.seed], args.hops + 1)
+    return list(store.iter_classes(args.package))
+
+
+def _open_output(output: str):
+    """
+    Opens the output file of the render stage, or returns standard output for "-".
+    """
+    if output == "-":
+        return contextlib.nullcontext(sys.stdout)
+    return open(output, "w", encoding="utf-8")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Entry point of the `pydiagram` command.
+
+    Args:
+        argv (Optional[List[str]]): The command line arguments, without the program name.
+            Defaults to `sys.argv[1:]`.
+
+    Returns:
+        int: The exit status.
+    """
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+    try:
+        if args.memory_report:
+            _run_profiled(args)
+        else:
+            run(args)
+    except (OSError, RuntimeError, ValueError) as error:
+        logging.error(error)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
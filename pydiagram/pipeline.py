@@ -0,0 +1,383 @@
+import logging
+import queue
+import threading
+import xml.etree.ElementTree as ET
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+from pydiagram.profiling import stage
+from pydiagram.py_class_extractor import (add_placeholder_classes, collect_file_tasks, iter_processed_files,
+                                          process_files, utils)
+from pydiagram.py_class_extractor.filters import ExtractionFilter
+from pydiagram.uml_generator.builders.relationships import RelationshipBuilder
+from pydiagram.uml_generator.edges import EdgeResolver
+from pydiagram.uml_generator.elements import CLASS_WIDTH, ROW_HEIGHT, DrawIODiagram, UMLClassDiagramElement
+from pydiagram.uml_generator.layout import LayoutCache, autolayout_class_diagram
+from pydiagram.uml_generator.layout.graph import ClassGraph
+from pydiagram.uml_generator.layout.incremental import incremental_layout
+from pydiagram.uml_generator.layout.layered import layered_layout
+from pydiagram.uml_generator.relationships import AssociationRelationship, InheritanceRelationship
+from pydiagram.uml_generator.renderers import RENDERERS, render_text_diagram
+from pydiagram.uml_generator.utils import Dimensions, class_identifier
+
+STAGES = ("extract", "layout", "render")
+OUTPUT_FORMATS = ("drawio", *RENDERERS)
+DEFAULT_QUEUE_SIZE = 4
+# Vertical distance between the bands of two packages in a pipelined draw.io diagram
+PARTITION_GAP = 120
+
+_DONE = object()
+
+
+def create_uml_classes(metadata: List[Dict[str, Any]], diagram: DrawIODiagram,
+                       positions: Dict[str, Tuple[float, float]]) -> List[UMLClassDiagramElement]:
+    """
+    Creates the draw.io class boxes of a diagram.
+
+    Args:
+        metadata (List[Dict[str, Any]]): Class metadata dictionaries.
+        diagram (DrawIODiagram): The diagram the boxes belong to.
+        positions (Dict[str, Tuple[float, float]]): The top-left corner of each class box, keyed by
+            class identifier (see `class_identifier`).
+
+    Returns:
+        List[UMLClassDiagramElement]: One box per class found in `positions`.
+    """
+    classes = []
+    for class_metadata in metadata:
+        identifier = class_identifier(class_metadata)
+        if identifier in positions:
+            x, y = positions[identifier]
+            dimensions = Dimensions(x=x, y=y, width=CLASS_WIDTH, height=ROW_HEIGHT)
+            UML_class = UMLClassDiagramElement(
+                class_metadata, dimensions, diagram.default_parent_id)
+            classes.append(UML_class)
+        else:
+            logging.warning(
+                f"Node {class_metadata['name']} not found in positions.")
+    return classes
+
+
+def create_relationships(metadata: List[Dict[str, Any]], classes: List[UMLClassDiagramElement],
+                         diagram: DrawIODiagram) -> List[ET.Element]:
+    """
+    Creates the draw.io edges between class boxes.
+
+    Args:
+        metadata (List[Dict[str, Any]]): Class metadata dictionaries.
+        classes (List[UMLClassDiagramElement]): The class boxes, in the order of `metadata`.
+        diagram (DrawIODiagram): The diagram the edges belong to.
+
+    Returns:
+        List[ET.Element]: The inheritance and association edges.
+    """
+    relationship_types = {
+        "inheritance": InheritanceRelationship,
+        "association": AssociationRelationship,
+    }
+    relationships = []
+    builder = None
+    for edge in EdgeResolver(metadata).resolve():
+        relationship_class = relationship_types.get(edge.relation_type)
+        if relationship_class is None:
+            continue
+        if builder is None or builder.source != classes[edge.source].id:
+            builder = RelationshipBuilder(
+                diagram.default_parent_id, classes[edge.source].id)
+        relationships.append(builder.build(
+            relationship_class, classes[edge.target].id))
+    return relationships
+
+
+def build_drawio_diagram(metadata: List[Dict[str, Any]], positions: Dict[str, Tuple[float, float]],
+                         name: str = "pydiagram") -> DrawIODiagram:
+    """
+    Builds a draw.io diagram with a box per class and an edge per relationship.
+
+    Args:
+        metadata (List[Dict[str, Any]]): Class metadata dictionaries.
+        positions (Dict[str, Tuple[float, float]]): The top-left corner of each class box.
+        name (str): The name of the diagram page.
+
+    Returns:
+        DrawIODiagram: The diagram, ready to be serialized.
+    """
+    diagram = DrawIODiagram(name)
+    classes = create_uml_classes(metadata, diagram, positions)
+    relationships = create_relationships(metadata, classes, diagram)
+
+    diagram.extend(relationships)
+    diagram.extend(classes)
+    return diagram
+
+
+def render_diagram(metadata: List[Dict[str, Any]], stream: TextIO, output_format: str,
+                   positions: Optional[Dict[str, Tuple[float, float]]] = None) -> None:
+    """
+    Writes a class diagram in any of the supported output formats.
+
+    Args:
+        metadata (List[Dict[str, Any]]): Class metadata dictionaries.
+        stream (TextIO): The stream the diagram is written to.
+        output_format (str): One of `OUTPUT_FORMATS`.
+        positions (Optional[Dict[str, Tuple[float, float]]]): The top-left corner of each class box.
+            Only the draw.io format uses positions, and requires them.
+
+    Raises:
+        ValueError: If the output format is unknown, or if positions are missing for draw.io.
+    """
+    if output_format != "drawio":
+        with stage("text"):
+            render_text_diagram(metadata, stream, output_format)
+        return
+
+    if positions is None:
+        raise ValueError("The draw.io format needs the positions computed by the layout stage.")
+    with stage("elements"):
+        diagram = build_drawio_diagram(metadata, positions)
+    with stage("tostring"):
+        document = ET.tostring(diagram, encoding="unicode")
+    stream.write(document)
+
+
+class _StageFailure:
+    """
+    Carries an exception raised in a pipeline thread to the consumer of the pipeline.
+    """
+
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+class PipelinedExecutor:
+    """
+    Runs a sequence of stages over a stream of items, each stage in its own thread.
+
+    Consecutive stages are connected by bounded queues. A stage that gets ahead of the
+    next one blocks until the next one catches up, so at most `queue_size` items wait
+    between two stages and the memory held by the pipeline stays bounded. Items come out
+    in the order they went in.
+
+    Stages overlap in time whenever they release the GIL, that is while they wait for
+    worker processes or for I/O. When a stage raises, the remaining items are skipped and
+    the exception is raised again by `run` in the consuming thread.
+
+    Attributes:
+        stages (List[Callable]): The functions applied to each item, in order.
+        queue_size (int): The maximum number of items waiting between two stages.
+    """
+
+    def __init__(self, stages: Iterable[Callable[[Any], Any]], queue_size: int = DEFAULT_QUEUE_SIZE) -> None:
+        """
+        Initializes the executor.
+
+        Args:
+            stages (Iterable[Callable]): The functions applied to each item, in order.
+            queue_size (int): The maximum number of items waiting between two stages.
+        """
+        self.stages = list(stages)
+        self.queue_size = queue_size
+
+    def run(self, items: Iterable[Any]) -> Iterator[Any]:
+        """
+        Feeds items through the stages and yields the output of the last stage.
+
+        Args:
+            items (Iterable[Any]): The input items, consumed in a thread of their own.
+
+        Yields:
+            Any: The result of the last stage for each item, in input order.
+        """
+        queues = [queue.Queue(self.queue_size) for _ in range(len(self.stages) + 1)]
+        cancelled = threading.Event()
+
+        def feed() -> None:
+            try:
+                for item in items:
+                    if cancelled.is_set():
+                        break
+                    queues[0].put(item)
+            except BaseException as error:
+                cancelled.set()
+                queues[0].put(_StageFailure(error))
+            finally:
+                queues[0].put(_DONE)
+
+        def work(stage: Callable[[Any], Any], inbox: queue.Queue, outbox: queue.Queue) -> None:
+            # Keep reading until the end marker even after a failure, so that the
+            # previous stage is never left blocked on a full queue.
+            while (item := inbox.get()) is not _DONE:
+                if isinstance(item, _StageFailure):
+                    outbox.put(item)
+                elif not cancelled.is_set():
+                    try:
+                        outbox.put(stage(item))
+                    except BaseException as error:
+                        cancelled.set()
+                        outbox.put(_StageFailure(error))
+            outbox.put(_DONE)
+
+        threads = [threading.Thread(target=feed, daemon=True)]
+        threads.extend(threading.Thread(target=work, args=(stage, queues[index], queues[index + 1]), daemon=True)
+                       for index, stage in enumerate(self.stages))
+        for thread in threads:
+            thread.start()
+
+        item = None
+        try:
+            while (item := queues[-1].get()) is not _DONE:
+                if isinstance(item, _StageFailure):
+                    raise item.error
+                yield item
+        finally:
+            cancelled.set()
+            while item is not _DONE:
+                item = queues[-1].get()
+            for thread in threads:
+                thread.join()
+
+
+def partition_file_tasks(file_tasks: List[Tuple[str, str]]) -> List[Tuple[str, List[Tuple[str, str]]]]:
+    """
+    Groups files by top-level package.
+
+    The files of each subdirectory of an input directory form a partition, and the files
+    directly inside an input directory form one more. Partitions keep the file order.
+
+    Args:
+        file_tasks (List[Tuple[str, str]]): (file path, base directory) pairs.
+
+    Returns:
+        List[Tuple[str, List[Tuple[str, str]]]]: The package path and the files of each partition.
+    """
+    return [(package, [file_tasks[position] for position in positions])
+            for package, positions in _partition_positions(file_tasks)]
+
+
+def _partition_positions(file_tasks: List[Tuple[str, str]]) -> List[Tuple[str, List[int]]]:
+    """
+    Groups the positions of the files in `file_tasks` by top-level package, as `partition_file_tasks` does.
+    """
+    partitions: Dict[str, List[int]] = {}
+    for position, (file_path, base_directory) in enumerate(file_tasks):
+        module_paths = utils.relative_module_paths(file_path, base_directory)
+        package = "/".join(module_paths[:2]) if len(module_paths) > 2 else module_paths[0]
+        partitions.setdefault(package, []).append(position)
+    return list(partitions.items())
+
+
+def render_pipelined(paths: List[str], stream: TextIO, output_format: str, layout_engine: str = "layered",
+                     cache: Optional[LayoutCache] = None, jobs: int = 1,
+                     queue_size: int = DEFAULT_QUEUE_SIZE,
+                     extraction_filter: Optional[ExtractionFilter] = None) -> None:
+    """
+    Extracts, lays out and renders a diagram package by package, with the stages overlapping.
+
+    The input files are split into top-level packages (see `partition_file_tasks`), and the
+    packages flow through a `PipelinedExecutor`: one package is laid out while the next one
+    is being extracted, and the class boxes of a laid out package are built while the
+    following ones are still in flight. Text formats need no layout and are written as the
+    packages arrive, in the order of the files: the text is identical to that of a
+    sequential run.
+
+    A draw.io diagram is equivalent to that of a sequential run, with the same classes and
+    edges, but not identical: each package is laid out on its own and placed in a horizontal
+    band below the previous one, so the boxes are placed differently. Relationships across
+    packages and the placeholders of base classes defined elsewhere are only known once
+    every package is extracted, so they are resolved at the end; placeholders are placed
+    next to their subclasses without moving any other class.
+
+    Extraction only runs in worker processes when `jobs` is greater than one. With a single
+    job the stages take turns on the GIL and the pipeline mostly bounds memory.
+
+    Args:
+        paths (List[str]): Paths to Python files or to directories containing Python files.
+        stream (TextIO): The stream the diagram is written to.
+        output_format (str): One of `OUTPUT_FORMATS`.
+        layout_engine (str): The name of the layout engine used for draw.io diagrams.
+        cache (Optional[LayoutCache]): The cache of component layouts.
+        jobs (int): The maximum number of worker processes.
+        queue_size (int): The maximum number of packages waiting between two stages.
+        extraction_filter (Optional[ExtractionFilter]): Patterns of the modules and classes to extract.
+    """
+    file_tasks = collect_file_tasks(paths, extraction_filter)
+    partitions = [(package, [file_tasks[position] for position in positions], positions)
+                  for package, positions in _partition_positions(file_tasks)]
+    executor = None
+    if jobs > 1:
+        # Imported here: loading multiprocessing is a noticeable part of the startup time
+        from concurrent.futures import ProcessPoolExecutor
+        executor = ProcessPoolExecutor(max_workers=jobs)
+
+    def extract(partition: Tuple[str, List[Tuple[str, str]], List[int]]) -> list:
+        return process_files(partition[1], executor=executor, extraction_filter=extraction_filter)
+
+    def extract_files(partition: Tuple[str, List[Tuple[str, str]], List[int]]) -> List[Tuple[int, list]]:
+        return list(zip(partition[2], iter_processed_files(partition[1], executor=executor,
+                                                           extraction_filter=extraction_filter)))
+
+    def layout(class_metadata_list: list) -> Tuple[list, List[Dict[str, Any]], Dict[str, Tuple[float, float]]]:
+        metadata = [class_metadata.to_dictionary() for class_metadata in class_metadata_list]
+        return class_metadata_list, metadata, autolayout_class_diagram(metadata, layout_engine, cache=cache, jobs=jobs)
+
+    try:
+        if output_format == "drawio":
+            _render_drawio_pipelined(PipelinedExecutor([extract, layout], queue_size).run(partitions), stream)
+            return
+
+        def class_stream() -> Iterator[Dict[str, Any]]:
+            all_classes = []
+            # A package may hold files listed both before and after another package, such as
+            # the modules around a subpackage: files wait until the files before them are written
+            pending: Dict[int, list] = {}
+            next_position = 0
+            for extracted_files in PipelinedExecutor([extract_files], queue_size).run(partitions):
+                pending.update(extracted_files)
+                while next_position in pending:
+                    class_metadata_list = pending.pop(next_position)
+                    next_position += 1
+                    all_classes.extend(class_metadata_list)
+                    yield from (class_metadata.to_dictionary() for class_metadata in class_metadata_list)
+            extracted = len(all_classes)
+            yield from (placeholder.to_dictionary() for placeholder in add_placeholder_classes(all_classes)[extracted:])
+
+        render_text_diagram(class_stream(), stream, output_format)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
+def _render_drawio_pipelined(partitions: Iterator[tuple], stream: TextIO) -> None:
+    """
+    Builds the draw.io diagram of laid out packages as they arrive, then adds placeholders and edges.
+    """
+    diagram = DrawIODiagram("pydiagram")
+    all_classes: list = []
+    metadata: List[Dict[str, Any]] = []
+    classes: List[UMLClassDiagramElement] = []
+    positions: Dict[str, Tuple[float, float]] = {}
+    top = 0
+
+    for class_metadata_list, partition_metadata, partition_positions in partitions:
+        if not partition_positions:
+            continue
+        heights = {class_identifier(class_metadata): UMLClassDiagramElement.measure(class_metadata)[1]
+                   for class_metadata in partition_metadata}
+        partition_top = min(y for _, y in partition_positions.values())
+        band = {name: (x, y - partition_top + top) for name, (x, y) in partition_positions.items()}
+        top = max(y + heights[name] for name, (_, y) in band.items()) + PARTITION_GAP
+
+        all_classes.extend(class_metadata_list)
+        metadata.extend(partition_metadata)
+        classes.extend(create_uml_classes(partition_metadata, diagram, band))
+        positions.update(band)
+
+    extracted = len(all_classes)
+    placeholders = [placeholder.to_dictionary() for placeholder in add_placeholder_classes(all_classes)[extracted:]]
+    if placeholders:
+        metadata.extend(placeholders)
+        previous = {name: (x, y, None, None) for name, (x, y) in positions.items()}
+        positions = incremental_layout(ClassGraph.from_metadata(metadata), previous, layered_layout)
+        classes.extend(create_uml_classes(placeholders, diagram, positions))
+
+    diagram.extend(create_relationships(metadata, classes, diagram))
+    diagram.extend(classes)
+    stream.write(ET.tostring(diagram, encoding="unicode"))
@@ -0,0 +1,217 @@
+import contextlib
+import contextvars
+import os
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+# Number of allocation sites reported per stage
+DEFAULT_TOP_ALLOCATIONS = 10
+
+# The profiler of the current thread, set by `profile_memory`
+_active_profiler: contextvars.ContextVar = contextvars.ContextVar("pydiagram_memory_profiler", default=None)
+
+
+class MemoryProfiler:
+    """
+    Records the memory used by the stages of a run.
+
+    Every entry in a stage (see `stage`) records:
+    - the peak of the memory traced by `tracemalloc` during the stage, above the traced
+      memory at its start, which measures the transient cost of the stage;
+    - the traced memory and the resident set size (RSS) left after the stage;
+    - the growth of the RSS high-water mark during the stage, which points at the stage
+      that made the process reach its maximum size;
+    - the allocation sites whose live memory grew the most during the stage.
+
+    A stage entered several times, such as the parsing of each file, is reported once: its
+    durations and deltas are summed and its peaks are the largest of its entries. Stages
+    nested in another stage are reported under their path, for example "extract/parse".
+
+    Only the current thread is profiled. Allocations made in worker processes are not traced.
+
+    Attributes:
+        top (int): The number of allocation sites reported per stage.
+        stages (Dict[str, Dict[str, Any]]): The record of each stage, keyed by stage path, in the
+            order the stages were first entered.
+    """
+
+    def __init__(self, top: int = DEFAULT_TOP_ALLOCATIONS) -> None:
+        """
+        Initializes an empty profile.
+
+        Args:
+            top (int): The number of allocation sites reported per stage.
+        """
+        self.top = top
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self._stack: List[Dict[str, Any]] = []
+        self._started = time.perf_counter()
+
+    @contextlib.contextmanager
+    def measure(self, name: str, allocation_sites: bool = True) -> Iterator[None]:
+        """
+        Records one entry in a stage.
+
+        Args:
+            name (str): The name of the stage.
+            allocation_sites (bool): Whether to compare `tracemalloc` snapshots around the stage.
+                Snapshots cost time proportional to the traced memory, so stages entered once
+                per file skip them; their allocations show in the sites of the enclosing stage.
+        """
+        # Imported here: only profiled runs need it
+        import tracemalloc
+
+        # tracemalloc keeps a single peak: fold the peak reached so far into the enclosing
+        # stage before resetting it for this one
+        current, peak = tracemalloc.get_traced_memory()
+        if self._stack:
+            self._stack[-1]["peak"] = max(self._stack[-1]["peak"], peak)
+        tracemalloc.reset_peak()
+
+        path = "/".join([*(frame["path"] for frame in self._stack[-1:]), name])
+        frame = {"path": path, "start": current, "peak": current,
+                 "snapshot": tracemalloc.take_snapshot() if allocation_sites and self.top else None}
+        record = self.stages.setdefault(path, {
+            "name": path, "calls": 0, "seconds": 0.0,
+            "traced_peak_bytes": 0, "traced_peak_delta_bytes": 0, "traced_delta_bytes": 0,
+            "rss_delta_bytes": None, "rss_high_water_delta_bytes": None, "top_allocations": [],
+        })
+        rss_start, high_water_start = resident_set_size(), peak_resident_set_size()
+        self._stack.append(frame)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            self._stack.pop()
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, frame["peak"])
+            if self._stack:
+                self._stack[-1]["peak"] = max(self._stack[-1]["peak"], peak)
+
+            record["calls"] += 1
+            record["seconds"] += seconds
+            record["traced_peak_bytes"] = max(record["traced_peak_bytes"], peak)
+            record["traced_peak_delta_bytes"] = max(record["traced_peak_delta_bytes"], peak - frame["start"])
+            record["traced_delta_bytes"] += current - frame["start"]
+            rss_end, high_water_end = resident_set_size(), peak_resident_set_size()
+            if rss_start is not None and rss_end is not None:
+                record["rss_delta_bytes"] = (record["rss_delta_bytes"] or 0) + rss_end - rss_start
+            if high_water_start is not None and high_water_end is not None:
+                record["rss_high_water_delta_bytes"] = ((record["rss_high_water_delta_bytes"] or 0)
+                                                        + high_water_end - high_water_start)
+            if frame["snapshot"] is not None:
+                record["top_allocations"] = self._allocation_sites(frame["snapshot"], tracemalloc.take_snapshot())
+
+    def _allocation_sites(self, before, after) -> List[Dict[str, Any]]:
+        """
+        Lists the source lines whose live memory grew the most between two snapshots.
+        """
+        # Imported here: only profiled runs need it
+        import tracemalloc
+
+        ignored = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+        statistics = after.filter_traces(ignored).compare_to(before.filter_traces(ignored), "lineno")
+        return [{"file": statistic.traceback[0].filename, "line": statistic.traceback[0].lineno,
+                 "size_delta_bytes": statistic.size_diff, "count_delta": statistic.count_diff}
+                for statistic in statistics[:self.top] if statistic.size_diff > 0]
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Builds the machine-readable report of the run.
+
+        Returns:
+            Dict[str, Any]: The report, which can be saved as JSON.
+        """
+        # Imported here: only profiled runs need it
+        import platform
+        import tracemalloc
+
+        traced_current, traced_peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (None, None)
+        return {
+            "python": platform.python_version(),
+            "platform": sys.platform,
+            "seconds": time.perf_counter() - self._started,
+            "traced_current_bytes": traced_current,
+            "traced_peak_bytes": traced_peak,
+            "rss_bytes": resident_set_size(),
+            "peak_rss_bytes": peak_resident_set_size(),
+            "stages": list(self.stages.values()),
+        }
+
+
+@contextlib.contextmanager
+def profile_memory(top: int = DEFAULT_TOP_ALLOCATIONS) -> Iterator[MemoryProfiler]:
+    """
+    Profiles the stages run in the current thread within the block.
+
+    `tracemalloc` is started for the duration of the block, unless it is already tracing,
+    which slows the run down and increases its memory use: profiling is meant for
+    investigations and capacity planning, not for every run.
+
+    Args:
+        top (int): The number of allocation sites reported per stage.
+
+    Yields:
+        MemoryProfiler: The profiler, whose `report` must be read before the end of the block.
+    """
+    # Imported here: only profiled runs need it
+    import tracemalloc
+
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    profiler = MemoryProfiler(top)
+    token = _active_profiler.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _active_profiler.reset(token)
+        if started:
+            tracemalloc.stop()
+
+
+def stage(name: str, allocation_sites: bool = True):
+    """
+    Returns a context manager recording a stage in the active profiler, if any.
+
+    Outside of `profile_memory`, the context manager does nothing, so stages can be marked
+    in code that runs on every file.
+
+    Args:
+        name (str): The name of the stage, for example "parse".
+        allocation_sites (bool): Whether to report the allocation sites of the stage (see
+            `MemoryProfiler.measure`).
+
+    Returns:
+        ContextManager: The context manager to wrap the stage in.
+    """
+    profiler = _active_profiler.get()
+    if profiler is None:
+        return contextlib.nullcontext()
+    return profiler.measure(name, allocation_sites)
+
+
+def resident_set_size() -> Optional[int]:
+    """
+    Returns the resident set size of the process in bytes, or None where it cannot be read cheaply.
+    """
+    try:
+        with open("/proc/self/statm", "rb") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def peak_resident_set_size() -> Optional[int]:
+    """
+    Returns the largest resident set size the process reached so far in bytes, or None on Windows.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
@@ -1,40 +1,105 @@
+import itertools
+import os
+import zlib
+from collections import deque
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+import pydiagram.py_class_extractor.archives as archives
 import pydiagram.py_class_extractor.ast_management as ast_mgmt
 import pydiagram.py_class_extractor.ast_collectors as ast_collectors
 import pydiagram.py_class_extractor.file_management as file_mgmt
 import pydiagram.py_class_extractor.schemas as schemas
 import pydiagram.py_class_extractor.utils as utils
+from pydiagram.py_class_extractor.filters import ExtractionFilter
+from pydiagram.profiling import stage
 
+# Number of archive members read ahead of the worker processes
+ARCHIVE_PREFETCH = 64
 
-def process_file(file_path: str, base_module_name: str) -> list:
+
+def process_file(file_path: str, base_directory: str, extraction_filter: Optional[ExtractionFilter] = None) -> list:
     """
     Processes a single Python file to extract class metadata.
 
     Args:
         file_path (str): The path to the Python file.
-        base_module_name (str): The base module name used for relative paths.
+        base_directory (str): The directory module paths are relative to, which holds the analyzed
+            package or module.
+        extraction_filter (Optional[ExtractionFilter]): Patterns of the classes to extract, and the extraction depth.
 
     Returns:
         list: A list of class metadata objects.
     """
     # Parse the abstract syntax tree (AST) from the file
-    ast_tree = ast_mgmt.parse_ast_from_file(file_path)
+    with stage("parse", allocation_sites=False):
+        ast_tree = ast_mgmt.parse_ast_from_file(file_path)
+    module_paths = utils.relative_module_paths(file_path, base_directory)
+    return process_tree(ast_tree, module_paths, extraction_filter)
+
+
+def process_source(source: bytes, module_paths: list, file_name: str,
+                   extraction_filter: Optional[ExtractionFilter] = None) -> list:
+    """
+    Processes Python source code that is not read from a file, such as an archive member.
+
+    Args:
+        source (bytes): The raw source code.
+        module_paths (list): The module path of the source, for example ["pkg", "module"].
+        file_name (str): The name of the source, used in error messages.
+        extraction_filter (Optional[ExtractionFilter]): Patterns of the classes to extract, and the extraction depth.
+
+    Returns:
+        list: A list of class metadata objects.
+    """
+    with stage("parse", allocation_sites=False):
+        ast_tree = ast_mgmt.parse_ast_from_source(source, file_name)
+    return process_tree(ast_tree, module_paths, extraction_filter)
+
+
+def process_tree(ast_tree, module_paths: list, extraction_filter: Optional[ExtractionFilter] = None) -> list:
+    """
+    Extracts the class metadata of a parsed Python module.
+
+    Args:
+        ast_tree (ast.AST): The abstract syntax tree of the module.
+        module_paths (list): The module path of the module, for example ["pkg", "module"].
+        extraction_filter (Optional[ExtractionFilter]): Patterns of the classes to extract, and the extraction depth.
+            The other classes are dropped before their members and relationships are analyzed.
+
+    Returns:
+        list: A list of class metadata objects.
+    """
+    with stage("visit", allocation_sites=False):
+        return _visit_tree(ast_tree, module_paths, extraction_filter)
+
+
+def _visit_tree(ast_tree, module_paths: list, extraction_filter: Optional[ExtractionFilter]) -> list:
+    """
+    Runs the AST visitors of `process_tree`.
+    """
+    depth = extraction_filter.depth if extraction_filter is not None else "full"
+    skip_function_bodies = depth != "full"
 
-    # Extract class nodes and module paths
-    class_nodes = ast_mgmt.extract_class_nodes(ast_tree)
-    module_paths = utils.extract_sublist_between(
-        utils.split_path(file_path), base_module_name
-    )
-    import_aliases = ast_mgmt.extract_alias_imports(ast_tree)
+    # Extract class nodes
+    class_nodes, parent_names = ast_mgmt.extract_nested_class_nodes(ast_tree, skip_function_bodies)
+    if extraction_filter is not None and extraction_filter.filters_classes():
+        selected = extraction_filter.select_classes([node.name for node in class_nodes], parent_names, module_paths)
+        class_nodes = [class_nodes[position] for position in selected]
+        parent_names = [parent_names[position] for position in selected]
+        if not class_nodes:
+            return []
+    import_aliases = ast_mgmt.extract_alias_imports(ast_tree, skip_function_bodies)
 
     class_metadata_list = []
-    for node in class_nodes:
-        metadata = ast_mgmt.get_class_metadata(node)
+    for node, parent_name in zip(class_nodes, parent_names):
+        metadata = ast_mgmt.get_class_metadata(node, depth)
         metadata.modules = module_paths
+        metadata.parent = parent_name
         class_metadata_list.append(metadata)
 
     # Analyze class relationships
     relationship_analyzer = ast_collectors.ClassRelationshipInspector(
-        import_aliases, class_metadata_list)
+        import_aliases, class_metadata_list, depth)
     for index, metadata in enumerate(class_metadata_list):
         metadata.relationships = relationship_analyzer.visit(
             class_nodes[index])
@@ -42,21 +107,28 @@ def process_file(file_path: str, base_module_name: str) -> list:
     return class_metadata_list
 
 
-def generate_classes_dicts_from_file(file_path: str) -> list:
+def add_placeholder_classes(class_metadata_list: list) -> list:
     """
-    Analyzes the specified Python file and returns class metadata in dictionary format.
+    Adds an empty class for every base class that is referenced but not defined in the list.
+
+    Association targets are left out, so that only inheritance hierarchies are completed.
 
     Args:
-        file_path (str): The path to the Python file to be analyzed.
+        class_metadata_list (list): The class metadata objects, modified in place.
 
     Returns:
-        list: A list of dictionaries representing class metadata.
+        list: The same list, with the placeholder classes appended.
     """
-    base_module_name = utils.split_path(file_path)[-1]
-    class_metadata_list = process_file(file_path, base_module_name)
+    with stage("placeholders"):
+        return _add_placeholder_classes(class_metadata_list)
+
 
+def _add_placeholder_classes(class_metadata_list: list) -> list:
+    """
+    Appends the placeholder classes of `add_placeholder_classes`.
+    """
     all_class_names = {
-    metadata.name for metadata in class_metadata_list}
+        metadata.name for metadata in class_metadata_list}
     for metadata in class_metadata_list:
         for relationship in metadata.relationships:
             if relationship.relation_type != "association" and relationship.related not in all_class_names:
@@ -64,49 +136,401 @@ def generate_classes_dicts_from_file(file_path: str) -> list:
                     tuple(relationship.modules), relationship.related, [], [], []
                 ))
                 all_class_names.add(relationship.related)
-                
+    return class_metadata_list
+
+
+def iter_processed_files(file_tasks: list, jobs: int = 1, executor=None,
+                         extraction_filter: Optional[ExtractionFilter] = None) -> Iterator[list]:
+    """
+    Processes several Python files, in a process pool when `jobs` is greater than one.
+
+    Args:
+        file_tasks (list): (file path, base directory) pairs.
+        jobs (int): The maximum number of worker processes.
+        executor (Optional[concurrent.futures.Executor]): A running pool to use instead of
+            starting one, shared by callers that process files in several batches.
+        extraction_filter (Optional[ExtractionFilter]): Patterns of the classes to extract, and the extraction depth.
+
+    Yields:
+        list: The class metadata objects of each file, in the order of the files.
+    """
+    if executor is None and jobs > 1 and len(file_tasks) > 1:
+        # Imported here: loading multiprocessing is a noticeable part of the startup time
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=min(jobs, len(file_tasks))) as executor:
+            yield from iter_processed_files(file_tasks, executor=executor, extraction_filter=extraction_filter)
+        return
+
+    if executor is not None and file_tasks:
+        file_paths, base_directories = zip(*file_tasks)
+        yield from executor.map(process_file, file_paths, base_directories,
+                                itertools.repeat(extraction_filter), chunksize=16)
+    else:
+        for file_path, base_directory in file_tasks:
+            yield process_file(file_path, base_directory, extraction_filter)
+
+
+def iter_processed_archive(archive_path: str, jobs: int = 1, executor=None,
+                           extraction_filter: Optional[ExtractionFilter] = None) -> Iterator[list]:
+    """
+    Processes the Python files of a wheel, zip or tar archive without unpacking it.
+
+    The members are read one at a time in the calling process, and parsed in a process
+    pool when `jobs` is greater than one. At most `ARCHIVE_PREFETCH` members are waiting
+    to be parsed at any time, so large archives are never held in memory as a whole.
+
+    Args:
+        archive_path (str): Path to the archive.
+        jobs (int): The maximum number of worker processes.
+        executor (Optional[concurrent.futures.Executor]): A running pool to use instead of starting one.
+        extraction_filter (Optional[ExtractionFilter]): Patterns of the modules and classes to
+            extract. Excluded members are not read from the archive.
+
+    Yields:
+        list: The class metadata objects of each Python member, in the order of `iter_archive_sources`.
+    """
+    if executor is None and jobs > 1:
+        # Imported here: loading multiprocessing is a noticeable part of the startup time
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            yield from iter_processed_archive(archive_path, executor=executor, extraction_filter=extraction_filter)
+        return
+
+    accept_member = None
+    if extraction_filter is not None and extraction_filter.filters_modules():
+        def accept_member(name: str) -> bool:
+            return extraction_filter.accepts_module(archives.member_module_paths(name))
+
+    sources = ((source, list(archives.member_module_paths(name)), os.path.join(archive_path, name), extraction_filter)
+               for name, source in archives.iter_archive_sources(archive_path, accept_member=accept_member))
+    if executor is None:
+        for arguments in sources:
+            yield process_source(*arguments)
+        return
+
+    pending = deque()
+    for arguments in sources:
+        pending.append(executor.submit(process_source, *arguments))
+        if len(pending) >= ARCHIVE_PREFETCH:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def iter_processed_paths(paths: list, jobs: int = 1,
+                         extraction_filter: Optional[ExtractionFilter] = None) -> Iterator[list]:
+    """
+    Processes Python files, directories and archives, in the order of the paths.
+
+    Args:
+        paths (list): Paths to Python files, to directories containing Python files, or to
+            archives (see `archives.ARCHIVE_EXTENSIONS`).
+        jobs (int): The maximum number of worker processes.
+        extraction_filter (Optional[ExtractionFilter]): Patterns of the modules and classes to extract.
+
+    Yields:
+        list: The class metadata objects of each file or archive member.
+    """
+    for archive_group, group in itertools.groupby(paths, key=archives.is_archive):
+        if archive_group:
+            for archive_path in group:
+                yield from iter_processed_archive(archive_path, jobs, extraction_filter=extraction_filter)
+        else:
+            file_tasks = collect_file_tasks(list(group), extraction_filter)
+            yield from iter_processed_files(file_tasks, jobs, extraction_filter=extraction_filter)
+
+
+def process_files(file_tasks: list, jobs: int = 1, executor=None,
+                  extraction_filter: Optional[ExtractionFilter] = None) -> list:
+    """
+    Processes several Python files, in a process pool when `jobs` is greater than one.
+
+    The classes are returned in the order of the files, whatever the number of jobs.
+
+    Args:
+        file_tasks (list): (file path, base directory) pairs.
+        jobs (int): The maximum number of worker processes.
+        executor (Optional[concurrent.futures.Executor]): A running pool to use instead of
+            starting one, shared by callers that process files in several batches.
+        extraction_filter (Optional[ExtractionFilter]): Patterns of the classes to extract, and the extraction depth.
+
+    Returns:
+        list: A list of class metadata objects for all files combined.
+    """
+    class_metadata_list = []
+    for file_classes in iter_processed_files(file_tasks, jobs, executor, extraction_filter):
+        class_metadata_list.extend(file_classes)
+    return class_metadata_list
+
+
+def collect_file_tasks(paths: list, extraction_filter: Optional[ExtractionFilter] = None) -> list:
+    """
+    Lists the Python files to analyze for a list of files and directories.
+
+    Module paths are relative to the parent of the given path: a directory is its own base
+    module, and a single file is a module of its own.
+
+    Args:
+        paths (list): Paths to Python files or to directories containing Python files.
+        extraction_filter (Optional[ExtractionFilter]): Patterns of the modules to extract. The
+            other files are left out, and the directories whose modules are all excluded are not walked.
+
+    Returns:
+        list: (file path, base directory) pairs.
+
+    Raises:
+        ValueError: If one of the paths is an archive, whose files are read with `iter_processed_archive`.
+    """
+    with stage("discovery"):
+        return _collect_file_tasks(paths, extraction_filter)
+
+
+def _collect_file_tasks(paths: list, extraction_filter: Optional[ExtractionFilter]) -> list:
+    """
+    Lists the files of `collect_file_tasks`.
+    """
+    if extraction_filter is not None and not extraction_filter.filters_modules():
+        extraction_filter = None
+
+    file_tasks = []
+    for path in paths:
+        if archives.is_archive(path):
+            raise ValueError(f"'{path}' is an archive: archives are only supported by a complete extraction.")
+        path = os.path.abspath(path)
+        base_directory = os.path.dirname(path)
+        if os.path.isdir(path):
+            accept_directory = None
+            if extraction_filter is not None:
+                def accept_directory(directory: str, base_directory: str = base_directory) -> bool:
+                    return extraction_filter.accepts_package(Path(os.path.relpath(directory, base_directory)).parts)
+
+            file_tasks.extend((file_path, base_directory)
+                              for file_path in file_mgmt.find_files_with_extension(path, ".py", accept_directory))
+        else:
+            file_tasks.append((path, base_directory))
+
+    if extraction_filter is not None:
+        file_tasks = [(file_path, base_directory) for file_path, base_directory in file_tasks
+                      if extraction_filter.accepts_module(
+                          utils.relative_module_paths(file_path, base_directory))]
+    return file_tasks
+
+
+def generate_classes_dicts_from_file(file_path: str) -> list:
+    """
+    Analyzes the specified Python file and returns class metadata in dictionary format.
+
+    Args:
+        file_path (str): The path to the Python file to be analyzed.
+
+    Returns:
+        list: A list of dictionaries representing class metadata.
+    """
+    base_directory = os.path.dirname(os.path.abspath(file_path))
+    class_metadata_list = add_placeholder_classes(
+        process_file(file_path, base_directory))
+
     # Convert class metadata to dictionary format
     class_metadata_dicts = [metadata.to_dictionary()
                             for metadata in class_metadata_list]
-    
 
     return class_metadata_dicts
 
 
-def generate_classes_dicts_from_directory(directory_path: str) -> list:
+def generate_classes_dicts_from_directory(directory_path: str, jobs: int = 1,
+                                          shard: Optional[Tuple[int, int]] = None,
+                                          extraction_filter: Optional[ExtractionFilter] = None) -> list:
     """
     Analyzes all Python files in the specified directory and returns a list of dictionaries
     containing class metadata for all files combined.
 
     Args:
         directory_path (str): The path to the directory containing Python files.
+        jobs (int): The maximum number of processes used to parse the files.
+        shard (Optional[Tuple[int, int]]): An (index, count) pair, with 1 <= index <= count, to
+            analyze only one shard of the files (see `select_shard`).
+        extraction_filter (Optional[ExtractionFilter]): Patterns of the modules and classes to extract.
 
     Returns:
         list: A list of dictionaries representing class metadata.
     """
-    python_file_paths = file_mgmt.find_files_with_extension(
-        directory_path, ".py")
-    base_module_name = utils.split_path(directory_path)[-1]
+    return generate_classes_dicts_from_paths([directory_path], jobs, shard, extraction_filter)
 
-    # Collect metadata for all classes across all files
-    combined_class_metadata_list = []
-    for file_path in python_file_paths:
-        combined_class_metadata_list.extend(
-            process_file(file_path, base_module_name))
 
-    # Ensure all relationships are accounted for
-    all_class_names = {
-        metadata.name for metadata in combined_class_metadata_list}
-    for metadata in combined_class_metadata_list:
-        for relationship in metadata.relationships:
-            if relationship.relation_type != "association" and relationship.related not in all_class_names:
-                combined_class_metadata_list.append(schemas.ClassInformation(
-                    tuple(relationship.modules), relationship.related, [], [], []
-                ))
-                all_class_names.add(relationship.related)
+def generate_classes_dicts_from_paths(paths: list, jobs: int = 1, shard: Optional[Tuple[int, int]] = None,
+                                      extraction_filter: Optional[ExtractionFilter] = None) -> list:
+    """
+    Analyzes Python files and directories and returns the class metadata of all of them
+    combined, in dictionary format.
+
+    When a shard is given, only the classes of the files of that shard are returned, and no
+    placeholder is added for base classes: the shard may not hold the definition of a base
+    class that another shard defines. Use `extract_shard` and `merge_shards` to obtain the
+    result of a complete run from several shards.
+
+    Args:
+        paths (list): Paths to Python files, to directories containing Python files, or to
+            archives. Archives cannot be sharded.
+        jobs (int): The maximum number of processes used to parse the files.
+        shard (Optional[Tuple[int, int]]): An (index, count) pair, with 1 <= index <= count, to
+            analyze only one shard of the files.
+        extraction_filter (Optional[ExtractionFilter]): Patterns of the modules and classes to extract.
+
+    Returns:
+        list: A list of dictionaries representing class metadata.
+    """
+    if shard is not None:
+        file_tasks = collect_file_tasks(paths, extraction_filter)
+        file_tasks = [file_tasks[index] for index in select_shard(file_tasks, shard)]
+        combined_class_metadata_list = process_files(file_tasks, jobs, extraction_filter=extraction_filter)
+    else:
+        # Collect metadata for all classes across all files
+        combined_class_metadata_list = [metadata for file_classes in iter_processed_paths(paths, jobs, extraction_filter)
+                                        for metadata in file_classes]
+
+        # Ensure all relationships are accounted for
+        add_placeholder_classes(combined_class_metadata_list)
 
     # Convert all class metadata to dictionary format
     combined_class_metadata_dicts = [
         metadata.to_dictionary() for metadata in combined_class_metadata_list]
 
     return combined_class_metadata_dicts
+
+
+def relative_module_path(file_path: str, base_directory: str) -> str:
+    """
+    Returns the path of a file relative to the parent of its input directory, with "/" separators.
+
+    The result is the same on every machine and operating system, whatever the location
+    of the checkout.
+
+    Args:
+        file_path (str): The path to the Python file.
+        base_directory (str): The directory module paths are relative to.
+
+    Returns:
+        str: The relative path, without the file extension (for example "pkg/sub/module").
+    """
+    return "/".join(utils.relative_module_paths(file_path, base_directory))
+
+
+def select_shard(file_tasks: list, shard: Tuple[int, int]) -> List[int]:
+    """
+    Selects the files of one shard.
+
+    Files are assigned to shards by a CRC-32 of their relative module path, so the
+    assignment is deterministic across machines and runs, and a file keeps its shard when
+    other files are added or removed.
+
+    Args:
+        file_tasks (list): (file path, base directory) pairs.
+        shard (Tuple[int, int]): An (index, count) pair, with 1 <= index <= count.
+
+    Returns:
+        List[int]: The positions in `file_tasks` of the files of the shard.
+
+    Raises:
+        ValueError: If the shard is invalid.
+    """
+    index, count = shard
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Invalid shard {index}/{count}: expected 1 <= index <= count.")
+    return [position for position, (file_path, base_directory) in enumerate(file_tasks)
+            if zlib.crc32(relative_module_path(file_path, base_directory).encode("utf-8")) % count == index - 1]
+
+
+def extract_shard(paths: list, shard: Tuple[int, int], jobs: int = 1,
+                  extraction_filter: Optional[ExtractionFilter] = None) -> dict:
+    """
+    Analyzes one shard of the files and returns a partial metadata document for `merge_shards`.
+
+    The document records the position of each file in the complete file list, so that the
+    merge can restore the order of a single-node run, and the number of files of the
+    complete run, so that the merge can tell when a shard is missing.
+
+    Args:
+        paths (list): Paths to Python files or to directories containing Python files.
+        shard (Tuple[int, int]): An (index, count) pair, with 1 <= index <= count.
+        jobs (int): The maximum number of processes used to parse the files.
+        extraction_filter (Optional[ExtractionFilter]): Patterns of the modules and classes to
+            extract, the same for every shard.
+
+    Returns:
+        dict: The shard document, which can be saved as JSON.
+    """
+    file_tasks = collect_file_tasks(paths, extraction_filter)
+    positions = select_shard(file_tasks, shard)
+    selected_tasks = [file_tasks[position] for position in positions]
+
+    files = []
+    file_classes_list = iter_processed_files(selected_tasks, jobs, extraction_filter=extraction_filter)
+    for position, task, file_classes in zip(positions, selected_tasks, file_classes_list):
+        files.append({
+            "position": position,
+            "path": relative_module_path(*task),
+            "classes": [metadata.to_dictionary() for metadata in file_classes],
+        })
+    return {"shard": list(shard), "file_count": len(file_tasks), "files": files}
+
+
+def merge_shards(shards: list) -> list:
+    """
+    Merges shard documents into the class metadata of a complete run.
+
+    Classes are put back in the order of a single-node run, and the placeholders of base
+    classes are added once every shard is known, so base classes defined in another shard
+    are found. The result is the same as `generate_classes_dicts_from_paths` without shard.
+
+    Args:
+        shards (list): The documents returned by `extract_shard`, in any order.
+
+    Returns:
+        list: A list of dictionaries representing class metadata.
+
+    Raises:
+        ValueError: If the documents do not form one complete set of shards.
+    """
+    if not shards:
+        raise ValueError("No shard to merge.")
+    count = shards[0]["shard"][1]
+    file_count = shards[0]["file_count"]
+    indices = sorted(document["shard"][0] for document in shards)
+    if any(document["shard"][1] != count or document["file_count"] != file_count for document in shards):
+        raise ValueError("The shards come from different shard counts or file sets.")
+    if indices != list(range(1, count + 1)):
+        raise ValueError(f"Expected shards 1 to {count} once each, got: {', '.join(map(str, indices))}.")
+
+    files = sorted((file for document in shards for file in document["files"]), key=lambda file: file["position"])
+    if [file["position"] for file in files] != list(range(file_count)):
+        raise ValueError("The shards do not cover every file exactly once.")
+
+    class_metadata_list = [schemas.ClassInformation.from_dictionary(class_metadata)
+                           for file in files for class_metadata in file["classes"]]
+    add_placeholder_classes(class_metadata_list)
+    return [metadata.to_dictionary() for metadata in class_metadata_list]
+
+
+def extract_to_store(paths: list, store, jobs: int = 1, extraction_filter: Optional[ExtractionFilter] = None) -> int:
+    """
+    Analyzes Python files and directories and writes their class metadata to a `MetadataStore`.
+
+    Classes are written file by file in batched transactions, so the metadata of the whole
+    run is never held in memory. Placeholders of base classes are added by the store once
+    every file is written.
+
+    Args:
+        paths (list): Paths to Python files, to directories containing Python files, or to archives.
+        store (MetadataStore): The store to append the classes to.
+        jobs (int): The maximum number of processes used to parse the files.
+        extraction_filter (Optional[ExtractionFilter]): Patterns of the modules and classes to extract.
+
+    Returns:
+        int: The number of classes written, placeholders included.
+    """
+    written = store.write(metadata.to_dictionary()
+                          for file_classes in iter_processed_paths(paths, jobs, extraction_filter)
+                          for metadata in file_classes)
+    return written + store.add_placeholder_classes()
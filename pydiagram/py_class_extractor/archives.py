@@ -0,0 +1,82 @@
+import os
+from pathlib import PurePosixPath
+from typing import Callable, Iterator, Optional, Tuple
+
+# Extensions of the archives whose Python members can be analyzed without unpacking them
+ARCHIVE_EXTENSIONS = (".whl", ".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+
+
+def is_archive(path: str) -> bool:
+    """
+    Checks whether a path is an archive file supported by `iter_archive_sources`.
+
+    Args:
+        path (str): Path to a file or a directory.
+
+    Returns:
+        bool: True if the path is a file with one of the `ARCHIVE_EXTENSIONS`.
+    """
+    return path.lower().endswith(ARCHIVE_EXTENSIONS) and os.path.isfile(path)
+
+
+def member_module_paths(member_name: str) -> Tuple[str, ...]:
+    """
+    Computes the module path of an archive member from its location in the archive.
+
+    Wheels hold the packages at their root, so "pkg/sub/module.py" gives ("pkg", "sub", "module").
+    Source distributions hold a top-level directory, which is kept like the name of an
+    analyzed directory: "pkg-1.0/pkg/module.py" gives ("pkg-1.0", "pkg", "module").
+
+    Args:
+        member_name (str): The name of the member, with "/" separators.
+
+    Returns:
+        Tuple[str, ...]: The module path of the member.
+    """
+    return tuple(part for part in PurePosixPath(member_name).with_suffix("").parts if part not in ("", "/", "."))
+
+
+def iter_archive_sources(archive_path: str, extension: str = ".py",
+                         accept_member: Optional[Callable[[str], bool]] = None) -> Iterator[Tuple[str, bytes]]:
+    """
+    Reads the members of an archive that have a given extension, one at a time.
+
+    Members are read straight from the archive, without writing them to disk. Zip archives
+    (including wheels) are read in name order; tar archives are read in a single pass in
+    archive order, so that compressed tar files are decompressed once.
+
+    Args:
+        archive_path (str): Path to a zip, wheel or tar archive, possibly compressed.
+        extension (str): Extension of the members to read.
+        accept_member (Optional[Callable[[str], bool]]): Called with the name of every member
+            with the extension; the members it rejects are skipped without being read.
+
+    Yields:
+        Tuple[str, bytes]: The name of each member and its content.
+
+    Raises:
+        ValueError: If the file is not a supported archive.
+    """
+    # Imported here: only archive inputs need them, and they are slow to import
+    import tarfile
+    import zipfile
+
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as archive:
+            for info in sorted(archive.infolist(), key=lambda info: info.filename):
+                if info.is_dir() or not info.filename.endswith(extension):
+                    continue
+                if accept_member is None or accept_member(info.filename):
+                    yield info.filename, archive.read(info)
+        return
+
+    try:
+        archive = tarfile.open(archive_path, mode="r|*")
+    except tarfile.TarError as error:
+        raise ValueError(f"'{archive_path}' is not a supported archive: {error}") from error
+    with archive:
+        for member in archive:
+            if not member.isfile() or not member.name.endswith(extension):
+                continue
+            if accept_member is None or accept_member(member.name):
+                yield member.name, archive.extractfile(member).read()
@@ -1,21 +1,33 @@
 import ast
-from typing import List, Dict, Union, Tuple
+from typing import List, Dict, Optional, Set, Union, Tuple
 from pydiagram.py_class_extractor.schemas import ClassInformation, FunctionInformation, AttributeInformation, RelationshipInformation
 
 
 class ClassDefCollector(ast.NodeVisitor):
     """
-    Collects ClassDef nodes from the AST.
+    Collects ClassDef nodes from the AST, outer classes before the classes nested in them.
 
     Attributes:
     - collected_classes (List[ast.ClassDef]): List of ClassDef nodes found during traversal.
+    - parent_names (List[Optional[str]]): The qualified name of the scope enclosing each collected
+      class, as in its `__qualname__`: "Outer.Middle" for a class nested in classes,
+      "Outer.method.<locals>" for a class defined in a function, or None for a module-level class.
+    - scope (List[str]): The qualified name of the node being visited, split on dots.
+    - skip_function_bodies (bool): Whether to leave out the classes defined inside functions.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, skip_function_bodies: bool = False) -> None:
         """
         Initializes the ClassDefCollector.
+
+        Args:
+        - skip_function_bodies (bool): Whether to leave out the classes defined inside functions,
+          without visiting the function bodies.
         """
         self.collected_classes: List[ast.ClassDef] = []
+        self.parent_names: List[Optional[str]] = []
+        self.scope: List[str] = []
+        self.skip_function_bodies = skip_function_bodies
 
     def visit_ClassDef(self, node: ast.ClassDef) -> None:
         """
@@ -25,14 +37,55 @@ class ClassDefCollector(ast.NodeVisitor):
         - node (ast.ClassDef): The ClassDef node to visit.
         """
         self.collected_classes.append(node)
+        self.parent_names.append(".".join(self.scope) or None)
+
+        self.scope.append(node.name)
         self.generic_visit(node)
+        self.scope.pop()
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        """
+        Visits a FunctionDef node, unless function bodies are skipped.
+
+        Args:
+        - node (ast.FunctionDef): The FunctionDef node to visit.
+        """
+        self._visit_function(node)
+
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> None:
+        """
+        Visits an AsyncFunctionDef node, unless function bodies are skipped.
+
+        Args:
+        - node (ast.AsyncFunctionDef): The AsyncFunctionDef node to visit.
+        """
+        self._visit_function(node)
+
+    def _visit_function(self, node: Union[ast.FunctionDef, ast.AsyncFunctionDef]) -> None:
+        """
+        Visits the body of a function within its "<locals>" scope, as Python qualifies the
+        classes defined there ("Outer.method.<locals>.Local").
+
+        Args:
+        - node (Union[ast.FunctionDef, ast.AsyncFunctionDef]): The function node to visit.
+        """
+        if self.skip_function_bodies:
+            return
+        self.scope.extend((node.name, "<locals>"))
+        self.generic_visit(node)
+        del self.scope[-2:]
 
 
 class ClassMetadataInspector(ast.NodeVisitor):
     """
     Analyzes nodes in the AST to extract metadata from classes.
 
+    The body of a nested class is not visited: the nested class is inspected on its own,
+    so its members are not credited to the enclosing class and every node is visited once.
+
     Attributes:
+    - skip_function_bodies (bool): Whether to leave the method bodies unvisited, which leaves out
+      the attributes assigned in `__init__`.
     - current_class (Union[ast.ClassDef, None]): The current ClassDef node being analyzed.
     - current_function (Union[ast.FunctionDef, None]): The current function node being analyzed.
     - current_assignment (Union[ast.AST, None]): The current assignment node being analyzed.
@@ -40,10 +93,14 @@ class ClassMetadataInspector(ast.NodeVisitor):
     - attributes (List[AttributeInformation]): List of attribute information collected.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, skip_function_bodies: bool = False) -> None:
         """
         Initializes the ClassMetadataInspector.
+
+        Args:
+        - skip_function_bodies (bool): Whether to leave the method bodies unvisited.
         """
+        self.skip_function_bodies = skip_function_bodies
         self.current_class: Union[ast.ClassDef, None] = None
         self.current_function: Union[ast.FunctionDef, None] = None
         self.current_assignment: Union[ast.AST, None] = None
@@ -58,10 +115,15 @@ class ClassMetadataInspector(ast.NodeVisitor):
         - node (ast.ClassDef): The ClassDef node to visit.
 
         Returns:
-        - ClassInformation: Metadata about the visited class, including methods and attributes.
+        - ClassInformation: Metadata about the visited class, including methods and attributes,
+          or None for a class nested in the inspected one.
         """
+        if self.current_class is not None:
+            return None
+
         self.current_class = node
-        self.generic_visit(node)
+        for statement in node.body:
+            self.visit(statement)
 
         return ClassInformation(
             modules=None,
@@ -92,9 +154,10 @@ class ClassMetadataInspector(ast.NodeVisitor):
             encapsulation=encapsulation
         ))
 
-        self.current_function = node
-        self.generic_visit(node)
-        self.current_function = None
+        if not self.skip_function_bodies:
+            self.current_function = node
+            self.generic_visit(node)
+            self.current_function = None
 
         return node
 
@@ -116,9 +179,10 @@ class ClassMetadataInspector(ast.NodeVisitor):
             encapsulation="Public"
         ))
 
-        self.current_function = node
-        self.generic_visit(node)
-        self.current_function = None
+        if not self.skip_function_bodies:
+            self.current_function = node
+            self.generic_visit(node)
+            self.current_function = None
 
         return node
 
@@ -220,7 +284,10 @@ class ClassMetadataInspector(ast.NodeVisitor):
         Returns:
         - list: A list of values within the tuple.
         """
-        return [self.visit(element) for element in node.elts if self.visit(element) is not None]
+        # Each element is visited once: visiting it again in the filter would double the work
+        # at every nesting level, and record the attributes of tuple targets twice
+        values = [self.visit(element) for element in node.elts]
+        return [value for value in values if value is not None]
 
     def visit_arg(self, node: ast.arg) -> ast.arg:
         """
@@ -264,31 +331,152 @@ class ClassMetadataInspector(ast.NodeVisitor):
         )
 
 
+def dotted_name(node: ast.AST) -> Optional[str]:
+    """
+    Returns the dotted name of a chain of Attribute nodes ending with a Name, without unparsing it.
+
+    Args:
+    - node (ast.AST): The node, for example the AST of `pkg.module.ClassName`.
+
+    Returns:
+    - Optional[str]: The dotted name, for example "pkg.module.ClassName", or None if the node
+      is not a plain chain of names.
+    """
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return ".".join(reversed(parts))
+
+
+def annotation_names(node: ast.AST) -> List[str]:
+    """
+    Collects the dotted names used in a type annotation.
+
+    Subscripts (`Optional[Foo]`), unions (`Foo | None`), tuples and lists are looked into, and
+    string annotations (`'Foo'`) are parsed. Any other expression contributes no name.
+
+    Args:
+    - node (ast.AST): The annotation node.
+
+    Returns:
+    - List[str]: The dotted names, in source order, for example ["Dict", "str", "pkg.Foo"].
+    """
+    names = []
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        name = dotted_name(node)
+        if name is not None:
+            names.append(name)
+        elif isinstance(node, ast.Subscript):
+            pending.extend((node.slice, node.value))
+        elif isinstance(node, ast.BinOp):
+            pending.extend((node.right, node.left))
+        elif isinstance(node, (ast.Tuple, ast.List)):
+            pending.extend(reversed(node.elts))
+        elif isinstance(node, ast.Constant) and isinstance(node.value, str):
+            try:
+                pending.append(ast.parse(node.value.strip(), mode="eval").body)
+            except SyntaxError:
+                pass
+    return names
+
+
+class RelationshipAccumulator:
+    """
+    Collects relationships without duplicates, in the order they are first found.
+
+    Attributes:
+    - relationships (Dict[Tuple[str, str, Tuple[str, ...]], RelationshipInformation]): The relationships,
+      keyed by relation type, related class name and modules.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes an empty RelationshipAccumulator.
+        """
+        self.relationships: Dict[Tuple[str, str, Tuple[str, ...]], RelationshipInformation] = {}
+
+    def add(self, relation_type: str, related: str, modules: Tuple[str, ...]) -> None:
+        """
+        Adds a relationship, unless an identical one was already added.
+
+        Args:
+        - relation_type (str): The type of the relationship, "inheritance" or "association".
+        - related (str): The name of the related class.
+        - modules (Tuple[str, ...]): The module path of the related class.
+        """
+        key = (relation_type, related, tuple(modules))
+        if key not in self.relationships:
+            self.relationships[key] = RelationshipInformation(
+                relation_type=relation_type,
+                related=related,
+                modules=modules
+            )
+
+    def to_tuple(self) -> Tuple[RelationshipInformation, ...]:
+        """
+        Returns the collected relationships.
+
+        Returns:
+        - tuple: The RelationshipInformation objects, in the order they were first added.
+        """
+        return tuple(self.relationships.values())
+
+
 class ClassRelationshipInspector(ast.NodeVisitor):
     """
     Analyzes class relationships and associations in the AST.
 
+    As for `ClassMetadataInspector`, the body of a nested class is left to its own visit.
+
+    Annotations and call targets are reduced to their dotted names with `annotation_names` and
+    `dotted_name`, and a class is associated when its name is one of the dotted name parts, so
+    "Foo" matches `pkg.Foo` and `Optional[Foo]` but no longer `FooBar`. Source text is only
+    rebuilt with `ast.unparse` for the bases that are not plain names, such as `Generic[T]`.
+
+    Referenced names are looked up in an index of the classes by name, and relationships are
+    deduplicated by a `RelationshipAccumulator`, so the cost of a reference does not depend on
+    the number of classes in the file or of relationships already found.
+
+    The depth limits the analysis: "headers" only reads the bases, "signatures" also reads the
+    class body without entering method bodies, so associations come from annotations and
+    class-level calls, and "full" reads everything.
+
     Attributes:
+    - depth (str): The extraction depth, "headers", "signatures" or "full".
     - current_class_node (Union[ast.ClassDef, None]): The current ClassDef node being analyzed.
     - alias_map (Dict[str, str]): Map of alias names to original names.
-    - relationships (List[RelationshipInformation]): List of relationships found during traversal.
+    - relationships (RelationshipAccumulator): The relationships of the current class.
     - current_base_node (Union[ast.AST, None]): The current base node being analyzed.
     - class_info_list (List[RelationshipInformation]): List of class information for resolving relationships.
+    - classes_by_name (Dict[str, List[Tuple[int, ClassInformation]]]): The classes of `class_info_list`
+      and their positions in it, indexed by name.
     """
 
-    def __init__(self, alias_map: Dict[str, str], class_info_list: List[RelationshipInformation]) -> None:
+    def __init__(self, alias_map: Dict[str, str], class_info_list: List[RelationshipInformation],
+                 depth: str = "full") -> None:
         """
         Initializes the ClassRelationshipInspector.
 
         Args:
         - alias_map (Dict[str, str]): Map of alias names to original names.
         - class_info_list (List[RelationshipInformation]): List of class information for resolving relationships.
+        - depth (str): The extraction depth, "headers", "signatures" or "full".
         """
+        self.depth = depth
         self.current_class_node = None
         self.alias_map = alias_map or {}
-        self.relationships: List[RelationshipInformation] = []
+        self.relationships = RelationshipAccumulator()
         self.current_base_node: Union[ast.AST, None] = None
         self.class_info_list = class_info_list
+        self.classes_by_name: Dict[str, List[Tuple[int, ClassInformation]]] = {}
+        for position, info in enumerate(class_info_list):
+            self.classes_by_name.setdefault(info.name, []).append((position, info))
 
     def visit_ClassDef(self, node: ast.ClassDef) -> Tuple[RelationshipInformation, ...]:
         """
@@ -298,39 +486,68 @@ class ClassRelationshipInspector(ast.NodeVisitor):
         - node (ast.ClassDef): The class definition node to visit.
 
         Returns:
-        - tuple: A tuple of RelationshipInformation objects representing inheritance relationships.
+        - tuple: A tuple of RelationshipInformation objects representing inheritance relationships,
+          or an empty tuple for a class nested in the inspected one.
         """
+        if self.current_class_node is not None:
+            return ()
+
         self.current_class_node = node
-        self.relationships = []
+        self.relationships = RelationshipAccumulator()
 
         for base in node.bases:
             self.current_base_node = base
-            base_name = self.visit(base)
-            resolved_base_name = self._resolve_aliases(base_name)
-            base_parts = resolved_base_name.split(".")
-            base_class_name = base_parts[-1]
+            subscripted_name = dotted_name(base.value) if isinstance(base, ast.Subscript) else None
+            if subscripted_name is not None:
+                # Generic[T]: the alias is resolved on the subscripted name, the subscript is only displayed
+                base_parts = self._resolve_aliases(subscripted_name).split(".")
+                base_class_name = base_parts[-1]
+                displayed_name = base_class_name + ast.unparse(base)[len(subscripted_name):]
+            else:
+                base_parts = self._resolve_aliases(dotted_name(base) or ast.unparse(base)).split(".")
+                base_class_name = displayed_name = base_parts[-1]
             base_modules = base_parts[:-1]
 
-            if any(info.name == base_class_name for info in self.class_info_list):
-                for info in self.class_info_list:
-                    if info.name == base_class_name:
-                        self.relationships.append(RelationshipInformation(
-                            relation_type="inheritance",
-                            related=info.name,
-                            modules=info.modules
-                        ))
-                        break
+            if base_class_name in self.classes_by_name:
+                _, info = self.classes_by_name[base_class_name][0]
+                self.relationships.add("inheritance", info.name, info.modules)
             else:
-                self.relationships.append(RelationshipInformation(
-                    relation_type="inheritance",
-                    related=base_class_name,
-                    modules=base_modules
-                ))
+                self.relationships.add("inheritance", displayed_name, base_modules)
 
             self.current_base_node = None
 
-        self.generic_visit(node)
-        return tuple(self.relationships)
+        if self.depth != "headers":
+            # The bases were visited above
+            for child in (*node.decorator_list, *node.keywords, *node.body):
+                self.visit(child)
+        self.current_class_node = None
+        return self.relationships.to_tuple()
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> ast.FunctionDef:
+        """
+        Visits a FunctionDef node, leaving its body out below the "full" depth.
+
+        Args:
+        - node (ast.FunctionDef): The FunctionDef node to visit.
+
+        Returns:
+        - ast.FunctionDef: The visited FunctionDef node.
+        """
+        self._visit_function(node)
+        return node
+
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> ast.AsyncFunctionDef:
+        """
+        Visits an AsyncFunctionDef node, leaving its body out below the "full" depth.
+
+        Args:
+        - node (ast.AsyncFunctionDef): The AsyncFunctionDef node to visit.
+
+        Returns:
+        - ast.AsyncFunctionDef: The visited AsyncFunctionDef node.
+        """
+        self._visit_function(node)
+        return node
 
     def visit_AnnAssign(self, node: ast.AnnAssign) -> ast.AnnAssign:
         """
@@ -342,56 +559,46 @@ class ClassRelationshipInspector(ast.NodeVisitor):
         Returns:
         - ast.AnnAssign: The visited AnnAssign node.
         """
-        annotation = self.visit(node.annotation)
-        resolved_annotation = self._resolve_aliases(annotation)
-
-        for info in self.class_info_list:
-            if info.name in resolved_annotation and self.current_class_node.name != info.name:
-                self.relationships.append(RelationshipInformation(
-                    relation_type="association",
-                    related=info.name,
-                    modules=info.modules
-                ))
-
+        self._add_associations(annotation_names(node.annotation))
         return node
 
-    def visit_Attribute(self, node: ast.Attribute) -> str:
+    def visit_Attribute(self, node: ast.Attribute) -> Optional[str]:
         """
-        Visits an Attribute node and returns its string representation.
+        Visits an Attribute node and returns its dotted name. Its value is not searched for associations.
 
         Args:
         - node (ast.Attribute): The Attribute node to visit.
 
         Returns:
-        - str: The string representation of the attribute.
+        - Optional[str]: The dotted name of the attribute, or None if it is not a plain chain of names.
         """
-        return ast.unparse(node)
+        return dotted_name(node)
 
-    def visit_Subscript(self, node: ast.Subscript) -> str:
+    def visit_Subscript(self, node: ast.Subscript) -> ast.Subscript:
         """
-        Visits a Subscript node and returns its string representation.
+        Visits a Subscript node. Subscripts are not searched for associations.
 
         Args:
         - node (ast.Subscript): The Subscript node to visit.
 
         Returns:
-        - str: The string representation of the subscript.
+        - ast.Subscript: The Subscript node.
         """
-        return ast.unparse(node)
+        return node
 
     def visit_Name(self, node: ast.Name) -> str:
         """
-        Visits a Name node and returns its string representation.
+        Visits a Name node and returns its identifier.
 
         Args:
         - node (ast.Name): The Name node to visit.
 
         Returns:
-        - str: The string representation of the name.
+        - str: The identifier of the name.
         """
-        return ast.unparse(node)
+        return node.id
 
-    def visit_Call(self, node: ast.Call) -> str:
+    def visit_Call(self, node: ast.Call) -> ast.Call:
         """
         Visits a Call node to check for associations.
 
@@ -399,74 +606,75 @@ class ClassRelationshipInspector(ast.NodeVisitor):
         - node (ast.Call): The Call node to visit.
 
         Returns:
-        - str: The string representation of the call.
+        - ast.Call: The Call node.
         """
-        if self.current_base_node:
-            return ast.unparse(node)
-
         for arg in node.args:
             self.visit(arg)
 
-        function_name = self.visit(node.func)
-        if isinstance(function_name, str):
-            resolved_function_name = self._resolve_aliases(function_name)
-            for info in self.class_info_list:
-                if info.name in resolved_function_name and self.current_class_node.name != info.name and not any(relationship.related == info.name and relationship.relation_type == "association" for relationship in self.relationships):
-                    self.relationships.append(RelationshipInformation(
-                        relation_type="association",
-                        related=info.name,
-                        modules=info.modules
-                    ))
+        # In chained calls such as `Builder().build()`, the inner call is a call of its own
+        function = node.func
+        while isinstance(function, (ast.Attribute, ast.Subscript)):
+            function = function.value
+        if isinstance(function, ast.Call):
+            self.visit(function)
+
+        # `Box[int]()` instantiates Box
+        called = node.func
+        while isinstance(called, ast.Subscript):
+            called = called.value
+        function_name = dotted_name(called)
+        if function_name is not None:
+            self._add_associations([function_name])
 
         return node
 
-    def visit_BinOp(self, node: ast.BinOp) -> str:
+    def visit_BinOp(self, node: ast.BinOp) -> ast.BinOp:
         """
-        Visits a BinOp node and returns its string representation.
+        Visits a BinOp node. The elements of a binary operation are not searched for associations.
 
         Args:
         - node (ast.BinOp): The BinOp node to visit.
 
         Returns:
-        - str: The string representation of the binary operation.
+        - ast.BinOp: The BinOp node.
         """
-        return ast.unparse(node)
+        return node
 
-    def visit_Constant(self, node: ast.Constant) -> str:
+    def visit_Constant(self, node: ast.Constant) -> ast.Constant:
         """
-        Visits a Constant node and returns its string representation.
+        Visits a Constant node. Constants hold no associations.
 
         Args:
         - node (ast.Constant): The Constant node to visit.
 
         Returns:
-        - str: The string representation of the constant.
+        - ast.Constant: The Constant node.
         """
-        return ast.unparse(node)
+        return node
 
-    def visit_Tuple(self, node: ast.Tuple) -> str:
+    def visit_Tuple(self, node: ast.Tuple) -> ast.Tuple:
         """
-        Visits a Tuple node and returns its string representation.
+        Visits a Tuple node. The elements of a tuple are not searched for associations.
 
         Args:
         - node (ast.Tuple): The Tuple node to visit.
 
         Returns:
-        - str: The string representation of the tuple.
+        - ast.Tuple: The Tuple node.
         """
-        return ast.unparse(node)
+        return node
 
-    def visit_List(self, node: ast.List) -> str:
+    def visit_List(self, node: ast.List) -> ast.List:
         """
-        Visits a List node and returns its string representation.
+        Visits a List node. The elements of a list are not searched for associations.
 
         Args:
         - node (ast.List): The List node to visit.
 
         Returns:
-        - str: The string representation of the list.
+        - ast.List: The List node.
         """
-        return ast.unparse(node)
+        return node
 
     def visit_arg(self, node: ast.arg) -> ast.arg:
         """
@@ -479,31 +687,65 @@ class ClassRelationshipInspector(ast.NodeVisitor):
         - ast.arg: The arg node.
         """
         if node.annotation:
-            annotation_str = self.visit(node.annotation)
-            resolved_annotation = self._resolve_aliases(annotation_str)
-            for info in self.class_info_list:
-                if info.name in resolved_annotation and self.current_class_node.name != info.name and not any(relationship.related == info.name and relationship.relation_type == "association" for relationship in self.relationships):
-                    self.relationships.append(RelationshipInformation(
-                        relation_type="association",
-                        related=info.name,
-                        modules=info.modules
-                    ))
+            self._add_associations(annotation_names(node.annotation))
 
         return node
 
+    def _visit_function(self, node: Union[ast.FunctionDef, ast.AsyncFunctionDef]) -> None:
+        """
+        Visits the fields of a function in the order of `generic_visit`, skipping the body below the "full" depth.
+
+        Args:
+        - node (Union[ast.FunctionDef, ast.AsyncFunctionDef]): The function node to visit.
+        """
+        if self.depth == "full":
+            self.generic_visit(node)
+            return
+        self.visit(node.args)
+        for decorator in node.decorator_list:
+            self.visit(decorator)
+        if node.returns is not None:
+            self.visit(node.returns)
+
     def _resolve_aliases(self, qualified_name: str) -> str:
         """
-        Resolves aliases in a qualified name using the alias map.
+        Resolves the import alias a qualified name starts with, using the alias map.
+
+        Args:
+        - qualified_name (str): The qualified name to resolve, for example "np.ndarray".
+
+        Returns:
+        - str: The resolved name, for example "numpy.ndarray".
+        """
+        head, dot, rest = qualified_name.partition(".")
+        original = self.alias_map.get(head)
+        return f"{original}{dot}{rest}" if original else qualified_name
+
+    def _add_associations(self, names: List[str]) -> None:
+        """
+        Associates the current class with the classes of the file that dotted names refer to.
+
+        Args:
+        - names (List[str]): Dotted names, as returned by `annotation_names`.
+        """
+        matches = [match for part in self._referenced_names(names)
+                   for match in self.classes_by_name.get(part, ())
+                   if match[1].name != self.current_class_node.name]
+        # In the order of the classes in the file, whatever the order of the names
+        for _, info in sorted(matches, key=lambda match: match[0]):
+            self.relationships.add("association", info.name, info.modules)
+
+    def _referenced_names(self, names: List[str]) -> Set[str]:
+        """
+        Resolves the aliases of dotted names and splits them into the names they are made of.
 
         Args:
-        - qualified_name (str): The qualified name to resolve.
+        - names (List[str]): Dotted names, as returned by `annotation_names`.
 
         Returns:
-        - str: The resolved name with aliases replaced.
+        - Set[str]: The parts of the resolved names.
         """
-        for alias, original in self.alias_map.items():
-            qualified_name = qualified_name.replace(alias, original)
-        return qualified_name
+        return {part for name in names for part in self._resolve_aliases(name).split(".")}
 
 
 class ImportCollector(ast.NodeVisitor):
@@ -512,13 +754,39 @@ class ImportCollector(ast.NodeVisitor):
 
     Attributes:
     - import_nodes (List[ast.AST]): List of import nodes found during traversal.
+    - skip_function_bodies (bool): Whether to leave out the imports made inside functions.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, skip_function_bodies: bool = False) -> None:
         """
         Initializes the ImportCollector.
+
+        Args:
+        - skip_function_bodies (bool): Whether to leave out the imports made inside functions,
+          without visiting the function bodies.
         """
         self.import_nodes: List[ast.AST] = []
+        self.skip_function_bodies = skip_function_bodies
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        """
+        Visits a FunctionDef node, unless function bodies are skipped.
+
+        Args:
+        - node (ast.FunctionDef): The FunctionDef node to visit.
+        """
+        if not self.skip_function_bodies:
+            self.generic_visit(node)
+
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> None:
+        """
+        Visits an AsyncFunctionDef node, unless function bodies are skipped.
+
+        Args:
+        - node (ast.AsyncFunctionDef): The AsyncFunctionDef node to visit.
+        """
+        if not self.skip_function_bodies:
+            self.generic_visit(node)
 
     def visit_Import(self, node: ast.Import) -> None:
         """
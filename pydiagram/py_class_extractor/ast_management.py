@@ -1,6 +1,5 @@
 import ast
-from pprint import pprint
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from pydiagram.py_class_extractor import ast_collectors, file_management
 from pydiagram.py_class_extractor.schemas import ClassInformation
 
@@ -38,6 +37,34 @@ def parse_ast_from_file(file_path: str) -> ast.AST:
         raise
 
 
+def parse_ast_from_source(source: bytes, file_name: str) -> ast.AST:
+    """
+    Parses Python source code that is not read from a file, such as an archive member.
+
+    The source is decoded as UTF-8 when possible, and with the detected encoding otherwise,
+    like the files read by `parse_ast_from_file`.
+
+    Args:
+        source (bytes): The raw source code.
+        file_name (str): The name of the source, used in error messages.
+
+    Returns:
+        ast.AST: Abstract syntax tree representation of the parsed Python code.
+
+    Raises:
+        SyntaxError: If there is an error in parsing the Python code.
+    """
+    try:
+        text = source.decode("utf-8")
+    except UnicodeDecodeError:
+        text = source.decode(file_management.detect_encoding(source) or "latin-1")
+    try:
+        return ast.parse(text, filename=file_name)
+    except SyntaxError as e:
+        print(f"Syntax error in file '{file_name}': {e}")
+        raise
+
+
 def display_ast_node(node: ast.AST):
     """
     Pretty prints the structure of the AST node.
@@ -45,6 +72,8 @@ def display_ast_node(node: ast.AST):
     Args:
         node (ast.AST): Abstract syntax tree node representation of the Python code.
     """
+    from pprint import pprint
+
     pprint(ast.dump(node, annotate_fields=True, indent=4))
 
 
@@ -63,17 +92,37 @@ def extract_class_nodes(tree: ast.AST) -> List[ast.ClassDef]:
     return collector.collected_classes
 
 
-def extract_alias_imports(tree: ast.AST) -> Dict[str, str]:
+def extract_nested_class_nodes(tree: ast.AST,
+                               skip_function_bodies: bool = False) -> Tuple[List[ast.ClassDef], List[Optional[str]]]:
+    """
+    Extracts ClassDef nodes from the AST along with the qualified name of their enclosing scope.
+
+    Args:
+        tree (ast.AST): Abstract syntax tree of the Python code.
+        skip_function_bodies (bool): Whether to leave out the classes defined inside functions.
+
+    Returns:
+        Tuple[List[ast.ClassDef], List[Optional[str]]]: The ClassDef nodes found in the AST, and for
+        each of them the qualified name of the enclosing class or function, as in `__qualname__`, or
+        None for a module-level class.
+    """
+    collector = ast_collectors.ClassDefCollector(skip_function_bodies)
+    collector.visit(tree)
+    return collector.collected_classes, collector.parent_names
+
+
+def extract_alias_imports(tree: ast.AST, skip_function_bodies: bool = False) -> Dict[str, str]:
     """
     Extracts import aliases from an Abstract Syntax Tree (AST) of Python code.
 
     Args:
         tree (ast.AST): Abstract syntax tree representing the Python code to be analyzed.
+        skip_function_bodies (bool): Whether to leave out the imports made inside functions.
 
     Returns:
         Dict[str, str]: A dictionary where keys are import aliases and values are the original import names.
     """
-    collector = ast_collectors.ImportCollector()
+    collector = ast_collectors.ImportCollector(skip_function_bodies)
     collector.visit(tree)
 
     alias_inspector = ast_collectors.AliasInspector()
@@ -83,12 +132,14 @@ def extract_alias_imports(tree: ast.AST) -> Dict[str, str]:
     return alias_inspector.alias_map
 
 
-def get_class_metadata(class_node: ast.ClassDef) -> ClassInformation:
+def get_class_metadata(class_node: ast.ClassDef, depth: str = "full") -> ClassInformation:
     """
     Retrieves metadata for a class node from an Abstract Syntax Tree (AST).
 
     Args:
         class_node (ast.ClassDef): The class node in the AST representing the class to analyze.
+        depth (str): The extraction depth. "headers" leaves out every member, "signatures"
+            leaves out the attributes assigned in method bodies, and "full" keeps everything.
 
     Returns:
         ClassInformation: An object containing metadata about the class, including its methods and attributes.
@@ -99,7 +150,10 @@ def get_class_metadata(class_node: ast.ClassDef) -> ClassInformation:
     if not isinstance(class_node, ast.ClassDef):
         raise ValueError("Provided class_node must be an instance of ast.ClassDef")
 
-    inspector = ast_collectors.ClassMetadataInspector()
+    if depth == "headers":
+        return ClassInformation(modules=None, name=class_node.name, relationships=None, methods=(), attributes=())
+
+    inspector = ast_collectors.ClassMetadataInspector(skip_function_bodies=depth != "full")
     class_metadata = inspector.visit(class_node)
 
     return class_metadata
@@ -0,0 +1,226 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Tuple
+from pydiagram.py_class_extractor.file_management import SerializableToDict
+
+# A class is identified by its qualified name and, when several classes share it, by its rank among them.
+ClassKey = Tuple[str, int]
+
+
+def qualified_name(class_metadata: Dict[str, Any]) -> str:
+    """
+    Returns the module path, enclosing classes and name of a class, joined with dots.
+
+    Args:
+    - class_metadata (Dict[str, Any]): A class metadata dictionary.
+
+    Returns:
+    - str: The qualified name, for example "pkg.module.ClassName" or "pkg.module.Outer.Inner".
+    """
+    parent = class_metadata.get("parent")
+    return ".".join([*class_metadata["modules"], *([parent] if parent else []), class_metadata["name"]])
+
+
+def class_keys(metadata: Iterable[Dict[str, Any]]) -> List[ClassKey]:
+    """
+    Computes the key of every class, in metadata order.
+
+    Args:
+    - metadata (Iterable[Dict[str, Any]]): Class metadata dictionaries.
+
+    Returns:
+    - List[ClassKey]: The (qualified name, rank) key of each class.
+    """
+    seen = Counter()
+    keys = []
+    for class_metadata in metadata:
+        name = qualified_name(class_metadata)
+        keys.append((name, seen[name]))
+        seen[name] += 1
+    return keys
+
+
+@dataclass
+class ClassDiff(SerializableToDict):
+    """
+    Data class to store the changes of a class present in both snapshots.
+
+    Members are matched by name (and rank, for repeated names). A member whose name is
+    kept but whose type, arguments or encapsulation changed is reported as changed.
+
+    Attributes:
+    - key (ClassKey): The key of the class.
+    - added_attributes, removed_attributes (List[dict]): Attributes only found in the new or in the old snapshot.
+    - changed_attributes (List[Tuple[dict, dict]]): (old, new) pairs of attributes.
+    - added_methods, removed_methods (List[dict]): Methods only found in the new or in the old snapshot.
+    - changed_methods (List[Tuple[dict, dict]]): (old, new) pairs of methods.
+    - added_relationships, removed_relationships (List[dict]): Declared relationships only found in the
+      new or in the old snapshot.
+    """
+    key: ClassKey
+    added_attributes: List[dict] = field(default_factory=list)
+    removed_attributes: List[dict] = field(default_factory=list)
+    changed_attributes: List[Tuple[dict, dict]] = field(default_factory=list)
+    added_methods: List[dict] = field(default_factory=list)
+    removed_methods: List[dict] = field(default_factory=list)
+    changed_methods: List[Tuple[dict, dict]] = field(default_factory=list)
+    added_relationships: List[dict] = field(default_factory=list)
+    removed_relationships: List[dict] = field(default_factory=list)
+
+    @property
+    def members_changed(self) -> bool:
+        """
+        Whether the attributes or methods of the class changed, which changes its box.
+        """
+        return bool(self.added_attributes or self.removed_attributes or self.changed_attributes or
+                    self.added_methods or self.removed_methods or self.changed_methods)
+
+    def to_dictionary(self) -> dict:
+        """
+        Converts the ClassDiff object into a dictionary representation suitable for JSON serialization.
+
+        Returns:
+        - dict: The non-empty changes of the class, keyed by kind.
+        """
+        data = {"class": self.key[0]}
+        if self.key[1]:
+            data["rank"] = self.key[1]
+        for kind in ("attributes", "methods", "relationships"):
+            for change in ("added", "removed", "changed"):
+                values = getattr(self, f"{change}_{kind}", None)
+                if values:
+                    data[f"{change}_{kind}"] = [
+                        {"old": old, "new": new} for old, new in values] if change == "changed" else values
+        return data
+
+
+@dataclass
+class MetadataDiff(SerializableToDict):
+    """
+    Data class to store the differences between two metadata snapshots.
+
+    Attributes:
+    - added_classes (List[dict]): Metadata of the classes only found in the new snapshot.
+    - removed_classes (List[dict]): Metadata of the classes only found in the old snapshot.
+    - changed_classes (List[ClassDiff]): Changes of the classes found in both snapshots.
+    """
+    added_classes: List[dict] = field(default_factory=list)
+    removed_classes: List[dict] = field(default_factory=list)
+    changed_classes: List[ClassDiff] = field(default_factory=list)
+
+    def is_empty(self) -> bool:
+        """
+        Checks whether the two snapshots describe the same classes.
+
+        Returns:
+        - bool: True if nothing was added, removed or changed.
+        """
+        return not (self.added_classes or self.removed_classes or self.changed_classes)
+
+    def to_dictionary(self) -> dict:
+        """
+        Converts the MetadataDiff object into a dictionary representation suitable for JSON serialization.
+
+        Returns:
+        - dict: The qualified names of the added and removed classes, and the changes of the other ones.
+        """
+        return {
+            "added_classes": [qualified_name(class_metadata) for class_metadata in self.added_classes],
+            "removed_classes": [qualified_name(class_metadata) for class_metadata in self.removed_classes],
+            "changed_classes": [class_diff.to_dictionary() for class_diff in self.changed_classes],
+        }
+
+
+def diff_metadata(old_metadata: List[Dict[str, Any]], new_metadata: List[Dict[str, Any]]) -> MetadataDiff:
+    """
+    Compares two metadata snapshots.
+
+    Classes are matched by qualified name, so a class that moved to another module is
+    reported as removed and added. Both snapshots are indexed once, so the comparison is
+    linear in their size.
+
+    Args:
+    - old_metadata (List[Dict[str, Any]]): The previous class metadata, for example a saved class.json.
+    - new_metadata (List[Dict[str, Any]]): The current class metadata.
+
+    Returns:
+    - MetadataDiff: The added, removed and changed classes.
+    """
+    old_classes = dict(zip(class_keys(old_metadata), old_metadata))
+    new_classes = dict(zip(class_keys(new_metadata), new_metadata))
+
+    diff = MetadataDiff()
+    diff.removed_classes = [class_metadata for key, class_metadata in old_classes.items() if key not in new_classes]
+    for key, class_metadata in new_classes.items():
+        old_class = old_classes.get(key)
+        if old_class is None:
+            diff.added_classes.append(class_metadata)
+            continue
+
+        class_diff = ClassDiff(key)
+        for kind in ("attributes", "methods"):
+            added, removed, changed = _diff_members(old_class[kind], class_metadata[kind])
+            setattr(class_diff, f"added_{kind}", added)
+            setattr(class_diff, f"removed_{kind}", removed)
+            setattr(class_diff, f"changed_{kind}", changed)
+        class_diff.added_relationships, class_diff.removed_relationships = _diff_relationships(
+            old_class["relationships"], class_metadata["relationships"])
+
+        if class_diff.members_changed or class_diff.added_relationships or class_diff.removed_relationships:
+            diff.changed_classes.append(class_diff)
+    return diff
+
+
+def _diff_members(old_members: List[dict], new_members: List[dict]) -> Tuple[List[dict], List[dict], List[Tuple[dict, dict]]]:
+    """
+    Matches members by name and rank and splits them into added, removed and changed ones.
+    """
+    old_by_key = dict(zip(_member_keys(old_members), old_members))
+    new_by_key = dict(zip(_member_keys(new_members), new_members))
+    added = [member for key, member in new_by_key.items() if key not in old_by_key]
+    removed = [member for key, member in old_by_key.items() if key not in new_by_key]
+    changed = [(old_by_key[key], member) for key, member in new_by_key.items()
+               if key in old_by_key and _normalize(old_by_key[key]) != _normalize(member)]
+    return added, removed, changed
+
+
+def _member_keys(members: List[dict]) -> List[Tuple[str, int]]:
+    seen = Counter()
+    keys = []
+    for member in members:
+        keys.append((member["name"], seen[member["name"]]))
+        seen[member["name"]] += 1
+    return keys
+
+
+def _diff_relationships(old_relationships: List[dict], new_relationships: List[dict]) -> Tuple[List[dict], List[dict]]:
+    """
+    Compares declared relationships as multisets.
+    """
+    old_counts = Counter(_normalize(relationship) for relationship in old_relationships)
+    new_counts = Counter(_normalize(relationship) for relationship in new_relationships)
+    added = [relationship for relationship in new_relationships if not _take(old_counts, _normalize(relationship))]
+    removed = [relationship for relationship in old_relationships if not _take(new_counts, _normalize(relationship))]
+    return added, removed
+
+
+def _take(counts: Counter, item: Any) -> bool:
+    """
+    Consumes one occurrence of an item; returns False when none is left.
+    """
+    if counts[item] > 0:
+        counts[item] -= 1
+        return True
+    return False
+
+
+def _normalize(value: Any) -> Any:
+    """
+    Converts a metadata value to a hashable form in which tuples and lists compare equal,
+    since snapshots read back from JSON hold lists where fresh ones hold tuples.
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((key, _normalize(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalize(item) for item in value)
+    return value
@@ -1,8 +1,7 @@
 import json
 import os
-import chardet
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Callable, List, Optional
 
 
 class SerializableToDict(ABC):
@@ -51,23 +50,30 @@ def get_files_recursively(directory: str, ignore_patterns: Optional[List[str]] =
     return files
 
 
-def find_files_with_extension(directory: str, extension: str) -> List[str]:
+def find_files_with_extension(directory: str, extension: str,
+                              accept_directory: Optional[Callable[[str], bool]] = None) -> List[str]:
     """
     Recursively finds all files with a specific extension in a directory and its subdirectories.
 
+    Entries are visited in name order, so the result does not depend on the file system.
+
     Args:
         directory (str): Directory path to start exploring.
         extension (str): Extension of the files to search for (e.g., '.py').
+        accept_directory (Optional[Callable[[str], bool]]): Called with the path of every
+            subdirectory; the subdirectories it rejects are not explored.
 
     Returns:
         List[str]: List of file paths that have the specified extension.
     """
     files = []
 
-    for item in os.listdir(directory):
+    # Sorted, so that every machine lists the files in the same order
+    for item in sorted(os.listdir(directory)):
         item_path = os.path.join(directory, item)
         if os.path.isdir(item_path):
-            files.extend(find_files_with_extension(item_path, extension))
+            if accept_directory is None or accept_directory(item_path):
+                files.extend(find_files_with_extension(item_path, extension, accept_directory))
         elif item.endswith(extension):
             files.append(item_path)
 
@@ -108,8 +114,23 @@ def detect_file_encoding(filename: str) -> str:
         str: Encoding name detected.
     """
     with open(filename, 'rb') as rawdata:
-        result = chardet.detect(rawdata.read())
-    return result['encoding']
+        return detect_encoding(rawdata.read())
+
+
+def detect_encoding(data: bytes) -> str:
+    """
+    Detects the encoding of raw file content.
+
+    Args:
+        data (bytes): The content to detect the encoding of.
+
+    Returns:
+        str: Encoding name detected.
+    """
+    # chardet is slow to import and only needed for files that are not UTF-8
+    import chardet
+
+    return chardet.detect(data)['encoding']
 
 
 def save_data_to_json(filename: str, data: dict):
@@ -0,0 +1,164 @@
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from typing import List, Optional, Sequence, Set, Tuple
+
+# Levels of detail of the extraction, from the fastest to the most complete
+EXTRACTION_DEPTHS = ("headers", "signatures", "full")
+
+
+@dataclass(frozen=True)
+class ExtractionFilter:
+    """
+    Include and exclude patterns on the modules and classes to extract, and the level of detail
+    extracted from each class.
+
+    Patterns are `fnmatch` patterns, matched case-sensitively against dotted names, where
+    "*" also matches dots. Module paths start with the name of the analyzed directory, as
+    in the "modules" of the class metadata.
+
+    A module pattern matches a module when it matches its dotted path ("pkg.tests.test_models")
+    or the dotted path of one of its packages ("pkg.tests"). A pattern without a dot, such as
+    "migrations" or "test_*", matches a package or module of that name at any depth.
+
+    A class pattern matches a class when it matches its name, its qualified name within its
+    module, as in `__qualname__` ("Outer.Inner", "Outer.method.<locals>.Local"), or its
+    qualified name prefixed with its module path ("pkg.module.Outer.Inner"). The classes
+    nested in an excluded class, or defined in one of its methods, are excluded.
+
+    A module or a class is extracted when it matches one of the include patterns, if there
+    are any, and none of the exclude patterns. Module patterns are applied while the files
+    are listed, so excluded files are never read and excluded directories are not walked;
+    class patterns are applied right after parsing, before the members and relationships of
+    the classes are analyzed. Relationships to excluded classes are dropped like relationships
+    to any class outside of the analyzed code, and excluded base classes become placeholders.
+
+    The depth is one of `EXTRACTION_DEPTHS`:
+    - "headers" extracts the classes and their bases only, with no member and no association;
+    - "signatures" adds the methods with their arguments, the class-level attributes, and the
+      associations found in annotations and in the class body outside of methods;
+    - "full" also reads the method bodies, for the attributes assigned in `__init__` and the
+      classes instantiated in methods.
+    Below "full", function bodies are not visited at all: the classes and imports inside
+    functions are left out too. The source is still parsed with `ast.parse`, whose C parser
+    is faster than a tokenizer-based scan in Python, so the saving is the AST visits.
+
+    Attributes:
+        include_modules (Tuple[str, ...]): Patterns of the modules to extract.
+        exclude_modules (Tuple[str, ...]): Patterns of the modules to skip.
+        include_classes (Tuple[str, ...]): Patterns of the classes to extract.
+        exclude_classes (Tuple[str, ...]): Patterns of the classes to skip.
+        depth (str): The level of detail extracted from each class.
+    """
+    include_modules: Tuple[str, ...] = ()
+    exclude_modules: Tuple[str, ...] = ()
+    include_classes: Tuple[str, ...] = ()
+    exclude_classes: Tuple[str, ...] = ()
+    depth: str = "full"
+
+    def __post_init__(self) -> None:
+        if self.depth not in EXTRACTION_DEPTHS:
+            raise ValueError(f"Unknown extraction depth: {self.depth}. Expected one of: {', '.join(EXTRACTION_DEPTHS)}")
+
+    def filters_modules(self) -> bool:
+        """
+        Returns True if some modules may be skipped.
+        """
+        return bool(self.include_modules or self.exclude_modules)
+
+    def filters_classes(self) -> bool:
+        """
+        Returns True if some classes may be skipped.
+        """
+        return bool(self.include_classes or self.exclude_classes)
+
+    def accepts_module(self, module_paths: Sequence[str]) -> bool:
+        """
+        Checks whether the classes of a module are extracted.
+
+        Args:
+            module_paths (Sequence[str]): The module path, for example ("pkg", "sub", "module").
+
+        Returns:
+            bool: True if the module is included and not excluded.
+        """
+        if self.include_modules and not _matches_module(self.include_modules, module_paths):
+            return False
+        return not _matches_module(self.exclude_modules, module_paths)
+
+    def accepts_package(self, package_paths: Sequence[str]) -> bool:
+        """
+        Checks whether a package may hold modules that are extracted.
+
+        A package is rejected when the exclude patterns match every module below it, so its
+        directory does not need to be walked. Include patterns never reject a package, as a
+        module deeper in the package may match them.
+
+        Args:
+            package_paths (Sequence[str]): The package path, for example ("pkg", "tests").
+
+        Returns:
+            bool: False if no module of the package can be extracted.
+        """
+        if _matches_module(self.exclude_modules, package_paths):
+            return False
+        # A dotted pattern ending with "*" that matches "pkg.tests." matches every module below it
+        package_prefix = ".".join(package_paths) + "."
+        return not any(pattern.endswith("*") and "." in pattern and fnmatchcase(package_prefix, pattern)
+                       for pattern in self.exclude_modules)
+
+    def select_classes(self, names: Sequence[str], parent_names: Sequence[Optional[str]],
+                       module_paths: Sequence[str]) -> List[int]:
+        """
+        Selects the classes of a module that are extracted.
+
+        Args:
+            names (Sequence[str]): The names of the classes of the module, enclosing classes first.
+            parent_names (Sequence[Optional[str]]): The qualified name of the scope enclosing each
+                class, or None for a module-level class.
+            module_paths (Sequence[str]): The module path of the classes.
+
+        Returns:
+            List[int]: The positions of the extracted classes.
+        """
+        module_name = ".".join(module_paths)
+        excluded = set()
+        selected = []
+        for position, (name, parent_name) in enumerate(zip(names, parent_names)):
+            qualified_name = f"{parent_name}.{name}" if parent_name else name
+            candidates = (name, qualified_name, f"{module_name}.{qualified_name}" if module_name else qualified_name)
+            if _in_excluded_class(parent_name, excluded) or _matches_any(self.exclude_classes, candidates):
+                excluded.add(qualified_name)
+            elif not self.include_classes or _matches_any(self.include_classes, candidates):
+                selected.append(position)
+        return selected
+
+
+def _matches_any(patterns: Sequence[str], names: Sequence[str]) -> bool:
+    """
+    Checks whether one of the patterns matches one of the names.
+    """
+    return any(fnmatchcase(name, pattern) for pattern in patterns for name in names)
+
+
+def _in_excluded_class(parent_name: Optional[str], excluded: Set[str]) -> bool:
+    """
+    Checks whether a scope is an excluded class, or is nested in one.
+    """
+    if not parent_name or not excluded:
+        return False
+    parts = parent_name.split(".")
+    return any(".".join(parts[:length]) in excluded for length in range(1, len(parts) + 1))
+
+
+def _matches_module(patterns: Sequence[str], module_paths: Sequence[str]) -> bool:
+    """
+    Checks whether one of the module patterns matches a module or one of its packages.
+    """
+    if not patterns:
+        return False
+    prefixes = [".".join(module_paths[:length]) for length in range(1, len(module_paths) + 1)]
+    for pattern in patterns:
+        names = prefixes if "." in pattern else module_paths
+        if any(fnmatchcase(name, pattern) for name in names):
+            return True
+    return False
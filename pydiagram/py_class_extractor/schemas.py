@@ -1,4 +1,4 @@
-from typing import Any, Tuple
+from typing import Any, Optional, Tuple
 from dataclasses import dataclass
 from pydiagram.py_class_extractor.file_management import SerializableToDict
 
@@ -45,12 +45,15 @@ class ClassInformation(SerializableToDict):
     - relationships (Tuple[RelationshipInformation]): Tuple of RelationshipInformation objects representing relationships with other classes.
     - attributes (Tuple[AttributeInformation]): Tuple of AttributeInformation objects representing attributes of the class.
     - methods (Tuple[FunctionInformation]): Tuple of FunctionInformation objects representing methods of the class.
+    - parent (Optional[str]): Qualified name of the enclosing scope within its module, as in `__qualname__`,
+      for a class nested in a class ("Outer") or defined in a function ("Outer.method.<locals>").
     """
     modules: Tuple[str]  
     name: str
     relationships: Tuple[RelationshipInformation]  
     attributes: Tuple[AttributeInformation]  
     methods: Tuple[FunctionInformation]  
+    parent: Optional[str] = None
 
     def to_dictionary(self) -> dict:
         """
@@ -63,7 +66,8 @@ class ClassInformation(SerializableToDict):
                 "name": str,                               # The name of the class.
                 "relationships": Tuple[dict],              # Tuple of dictionaries representing relationships (RelationshipInformation objects).
                 "attributes": Tuple[dict],                 # Tuple of dictionaries representing attributes (AttributeInformation objects).
-                "methods": Tuple[dict]                     # Tuple of dictionaries representing methods (FunctionInformation objects).
+                "methods": Tuple[dict],                    # Tuple of dictionaries representing methods (FunctionInformation objects).
+                "parent": Optional[str]                    # Qualified name of the enclosing scope, or None.
             }
         """
         return {
@@ -72,4 +76,25 @@ class ClassInformation(SerializableToDict):
             "relationships": [relationship.__dict__ for relationship in self.relationships],
             "attributes": [attribute.__dict__ for attribute in self.attributes],
             "methods": [method.__dict__ for method in self.methods],
+            "parent": self.parent,
         }
+
+    @classmethod
+    def from_dictionary(cls, data: dict) -> "ClassInformation":
+        """
+        Builds a ClassInformation object from its dictionary representation, as produced by `to_dictionary`.
+
+        Args:
+        - data (dict): The dictionary representation of the class, possibly read back from JSON.
+
+        Returns:
+        - ClassInformation: The class information.
+        """
+        return cls(
+            data["modules"],
+            data["name"],
+            [RelationshipInformation(**relationship) for relationship in data["relationships"]],
+            [AttributeInformation(**attribute) for attribute in data["attributes"]],
+            [FunctionInformation(**method) for method in data["methods"]],
+            data.get("parent"),
+        )
@@ -0,0 +1,285 @@
+import json
+import sqlite3
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+DEFAULT_BATCH_SIZE = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS modules (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS classes (
+    id INTEGER PRIMARY KEY,
+    module_id INTEGER NOT NULL REFERENCES modules(id),
+    name TEXT NOT NULL,
+    parent TEXT
+);
+CREATE TABLE IF NOT EXISTS members (
+    class_id INTEGER NOT NULL REFERENCES classes(id),
+    kind TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    data_type TEXT,
+    args TEXT,
+    return_value TEXT,
+    encapsulation TEXT,
+    PRIMARY KEY (class_id, kind, position)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS relationships (
+    class_id INTEGER NOT NULL REFERENCES classes(id),
+    position INTEGER NOT NULL,
+    relation_type TEXT NOT NULL,
+    related TEXT NOT NULL,
+    modules TEXT NOT NULL,
+    PRIMARY KEY (class_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS classes_by_name ON classes(name);
+CREATE INDEX IF NOT EXISTS classes_by_module ON classes(module_id);
+CREATE INDEX IF NOT EXISTS relationships_by_related ON relationships(related);
+"""
+
+
+class MetadataStore:
+    """
+    An SQLite database of class metadata, for diagrams too large to load as JSON.
+
+    Classes, their modules, members and relationships are stored in indexed tables, so a
+    subset of the classes (a package, the neighborhood of a class) is read without loading
+    the others. Classes are read back as the same dictionaries `to_dictionary` produces,
+    in the order they were written, and can be streamed straight into a renderer.
+
+    Only the standard library `sqlite3` module is used.
+
+    Attributes:
+        path (str): The path of the database file, or ":memory:".
+        connection (sqlite3.Connection): The open connection.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Opens the database, creating its tables if needed.
+
+        Args:
+            path (str): The path of the database file, or ":memory:".
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self) -> "MetadataStore":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Closes the connection.
+        """
+        self.connection.close()
+
+    def clear(self) -> None:
+        """
+        Removes every class from the store.
+        """
+        with self.connection:
+            for table in ("relationships", "members", "classes", "modules"):
+                self.connection.execute(f"DELETE FROM {table}")
+
+    def write(self, metadata: Iterable[Dict[str, Any]], batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+        """
+        Appends classes to the store, one transaction per batch.
+
+        The iterable is consumed lazily, so at most one batch of classes is held in memory.
+
+        Args:
+            metadata (Iterable[Dict[str, Any]]): Class metadata dictionaries.
+            batch_size (int): The number of classes written per transaction.
+
+        Returns:
+            int: The number of classes written.
+        """
+        batch: List[Dict[str, Any]] = []
+        written = 0
+        for class_metadata in metadata:
+            batch.append(class_metadata)
+            if len(batch) >= batch_size:
+                written += self._write_batch(batch)
+                batch = []
+        if batch:
+            written += self._write_batch(batch)
+        return written
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> int:
+        with self.connection:
+            cursor = self.connection.cursor()
+            members, relationships = [], []
+            for class_metadata in batch:
+                cursor.execute("INSERT OR IGNORE INTO modules(path) VALUES (?)",
+                               (json.dumps(list(class_metadata["modules"])),))
+                cursor.execute(
+                    "INSERT INTO classes(module_id, name, parent) SELECT id, ?, ? FROM modules WHERE path = ?",
+                    (class_metadata["name"], class_metadata.get("parent"), json.dumps(list(class_metadata["modules"]))))
+                class_id = cursor.lastrowid
+
+                for position, attribute in enumerate(class_metadata["attributes"]):
+                    members.append((class_id, "attribute", position, attribute["name"],
+                                    attribute.get("data_type"), None, None, attribute["encapsulation"]))
+                for position, method in enumerate(class_metadata["methods"]):
+                    members.append((class_id, "method", position, method["name"], None,
+                                    json.dumps(list(method["args"])), json.dumps(method["return_value"]),
+                                    method["encapsulation"]))
+                for position, relationship in enumerate(class_metadata["relationships"]):
+                    relationships.append((class_id, position, relationship["relation_type"],
+                                          relationship["related"], json.dumps(list(relationship["modules"]))))
+
+            cursor.executemany("INSERT INTO members VALUES (?, ?, ?, ?, ?, ?, ?, ?)", members)
+            cursor.executemany("INSERT INTO relationships VALUES (?, ?, ?, ?, ?)", relationships)
+        return len(batch)
+
+    def count(self) -> int:
+        """
+        Returns the number of classes in the store.
+        """
+        return self.connection.execute("SELECT COUNT(*) FROM classes").fetchone()[0]
+
+    def add_placeholder_classes(self) -> int:
+        """
+        Adds an empty class for every base class that is referenced but not stored.
+
+        This is the database counterpart of `add_placeholder_classes`, and adds the same
+        classes in the same order.
+
+        Returns:
+            int: The number of placeholder classes added.
+        """
+        rows = self.connection.execute("""
+            SELECT related, modules FROM relationships AS r
+            WHERE relation_type != 'association'
+              AND NOT EXISTS (SELECT 1 FROM classes AS c WHERE c.name = r.related)
+            ORDER BY class_id, position
+        """).fetchall()
+
+        placeholders = {}
+        for related, modules in rows:
+            placeholders.setdefault(related, json.loads(modules))
+        return self.write({"name": name, "modules": modules, "relationships": [], "attributes": [], "methods": [],
+                           "parent": None} for name, modules in placeholders.items())
+
+    def iter_classes(self, package: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Streams classes in the order they were written.
+
+        Args:
+            package (Optional[str]): A dotted module prefix, for example "pkg.sub". Only the
+                classes of that module path and of the modules below it are returned.
+
+        Yields:
+            Dict[str, Any]: Class metadata dictionaries.
+        """
+        if package is None:
+            cursor = self.connection.execute("SELECT id FROM classes ORDER BY id")
+        else:
+            prefix = json.dumps(package.split("."))[:-1]
+            # Module paths are stored as JSON arrays: a prefix match on the array text, which
+            # can use the unique index of the paths, is a prefix match on the module path.
+            cursor = self.connection.execute("""
+                SELECT c.id FROM classes AS c JOIN modules AS m ON m.id = c.module_id
+                WHERE m.path = ? OR (m.path >= ? AND m.path < ?)
+                ORDER BY c.id
+            """, (prefix + "]", prefix + ", ", prefix + ",!"))
+
+        while True:
+            ids = [row[0] for row in cursor.fetchmany(DEFAULT_BATCH_SIZE)]
+            if not ids:
+                return
+            yield from self.load(ids)
+
+    def neighborhood(self, names: Iterable[str], hops: int = 1) -> List[Dict[str, Any]]:
+        """
+        Returns the classes named `names` and the classes within `hops` relationships of them.
+
+        Relationships are followed in both directions. They are matched by class name here;
+        the renderers resolve the exact target of each relationship afterwards.
+
+        Args:
+            names (Iterable[str]): The names of the seed classes.
+            hops (int): The maximum number of relationships between a seed and a returned class.
+
+        Returns:
+            List[Dict[str, Any]]: Class metadata dictionaries, in the order they were written.
+        """
+        frontier = set(names)
+        reached = set(frontier)
+        for _ in range(hops):
+            if not frontier:
+                break
+            found = set()
+            for chunk in _chunks(sorted(frontier)):
+                marks = ", ".join("?" * len(chunk))
+                found.update(row[0] for row in self.connection.execute(f"""
+                    SELECT r.related FROM relationships AS r JOIN classes AS c ON c.id = r.class_id
+                    WHERE c.name IN ({marks})
+                    UNION
+                    SELECT c.name FROM relationships AS r JOIN classes AS c ON c.id = r.class_id
+                    WHERE r.related IN ({marks})
+                """, chunk + chunk))
+            frontier = found - reached
+            reached |= frontier
+
+        ids = []
+        for chunk in _chunks(sorted(reached)):
+            marks = ", ".join("?" * len(chunk))
+            ids.extend(row[0] for row in self.connection.execute(
+                f"SELECT id FROM classes WHERE name IN ({marks})", chunk))
+        return self.load(sorted(ids))
+
+    def load(self, class_ids: List[int]) -> List[Dict[str, Any]]:
+        """
+        Reads classes by id.
+
+        Args:
+            class_ids (List[int]): The ids of the classes, as returned by the queries of the store.
+
+        Returns:
+            List[Dict[str, Any]]: Class metadata dictionaries, in the order of `class_ids`.
+        """
+        classes: Dict[int, Dict[str, Any]] = {}
+        for chunk in _chunks(class_ids):
+            marks = ", ".join("?" * len(chunk))
+            for class_id, name, modules, parent in self.connection.execute(f"""
+                SELECT c.id, c.name, m.path, c.parent FROM classes AS c JOIN modules AS m ON m.id = c.module_id
+                WHERE c.id IN ({marks})
+            """, chunk):
+                classes[class_id] = {"name": name, "modules": json.loads(modules),
+                                     "relationships": [], "attributes": [], "methods": [], "parent": parent}
+
+            for class_id, relation_type, related, modules in self.connection.execute(f"""
+                SELECT class_id, relation_type, related, modules FROM relationships
+                WHERE class_id IN ({marks}) ORDER BY class_id, position
+            """, chunk):
+                classes[class_id]["relationships"].append(
+                    {"relation_type": relation_type, "related": related, "modules": json.loads(modules)})
+
+            for class_id, kind, name, data_type, args, return_value, encapsulation in self.connection.execute(f"""
+                SELECT class_id, kind, name, data_type, args, return_value, encapsulation FROM members
+                WHERE class_id IN ({marks}) ORDER BY class_id, kind, position
+            """, chunk):
+                if kind == "attribute":
+                    classes[class_id]["attributes"].append(
+                        {"name": name, "data_type": data_type, "encapsulation": encapsulation})
+                else:
+                    classes[class_id]["methods"].append(
+                        {"name": name, "args": json.loads(args), "return_value": json.loads(return_value),
+                         "encapsulation": encapsulation})
+
+        return [classes[class_id] for class_id in class_ids]
+
+
+def _chunks(values: List[Any], size: int = 500) -> Iterator[List[Any]]:
+    """
+    Splits a list into chunks small enough for the parameter limit of SQLite.
+    """
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
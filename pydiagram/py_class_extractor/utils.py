@@ -1,3 +1,4 @@
+import os
 from typing import List, Optional, Any, Tuple
 from pathlib import Path
 
@@ -62,3 +63,25 @@ def split_path(module_path: str) -> Tuple[str, ...]:
         '').parts if part]  # Avoid empty strings
 
     return tuple(path_parts)
+
+
+def relative_module_paths(file_path: str, base_directory: str) -> Tuple[str, ...]:
+    """
+    Computes the module path of a file from the directory its modules are relative to.
+
+    The path is computed from the position of the file under `base_directory`, so the
+    names of the directories above it do not matter, even when one of them has the same
+    name as the analyzed package.
+
+    Args:
+    - file_path (str): The path to the Python module file.
+    - base_directory (str): The directory holding the analyzed package or module.
+
+    Returns:
+    - Tuple[str, ...]: The module path, starting with the name of the analyzed package.
+
+    Example:
+    >>> relative_module_paths("/src/app/app/sub/module.py", "/src/app")
+    ('app', 'sub', 'module')
+    """
+    return split_path(os.path.relpath(file_path, base_directory))
@@ -0,0 +1,306 @@
+import asyncio
+import dataclasses
+import io
+import logging
+import os
+import urllib.parse
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+from pydiagram.pipeline import OUTPUT_FORMATS, render_diagram
+from pydiagram.py_class_extractor import add_placeholder_classes, collect_file_tasks, process_file, utils
+from pydiagram.uml_generator.layout import LayoutCache, autolayout_class_diagram
+from pydiagram.uml_generator.selection import class_neighbors, class_targets, select_neighborhood
+
+LOCALHOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Number of rendered diagrams kept in memory
+MAX_CACHED_RESPONSES = 64
+# Number of class graphs (metadata and relationship adjacency) kept in memory for seeded requests
+MAX_CACHED_GRAPHS = 8
+
+PLAIN_TEXT = "text/plain; charset=utf-8"
+CONTENT_TYPES = {
+    "drawio": "application/xml; charset=utf-8",
+}
+REASONS = {200: "OK", 400: "Bad Request", 403: "Forbidden", 404: "Not Found",
+           405: "Method Not Allowed", 500: "Internal Server Error"}
+
+# (modification time in nanoseconds, size in bytes) of a source file
+FileSignature = Tuple[int, int]
+
+
+class DiagramServer:
+    """
+    A local HTTP server that keeps the state of previous diagram requests in memory.
+
+    The server answers `GET /diagram?path=...&format=...`, where `path` is a file or a
+    directory relative to the root directory and `format` one of `OUTPUT_FORMATS`. Adding
+    `&seed=Name&hops=2` (`seed` is repeatable) only shows the classes within two
+    relationships of the seed classes.
+
+    Three levels of state stay warm between requests:
+    - the classes extracted from every file, keyed by file path and checked against the
+      file modification time and size, so only the files changed since the last request
+      are parsed again, whichever request first read them (only the module path of the
+      classes depends on the requested directory, and it is recomputed per request);
+    - the class metadata of a path and the adjacency of its relationships, so requests for
+      different seeds around an unchanged tree only walk the neighborhood of the seeds;
+    - the layout cache, kept in memory on top of its directory;
+    - the rendered diagrams, keyed by path, format, seeds and the signature of every file they
+      were built from, so a repeated request for an unchanged tree costs a few `stat` calls.
+
+    The server only listens on the loopback interface and only serves paths inside the
+    root directory.
+
+    Attributes:
+        root (str): The directory requested paths are resolved against.
+        layout_engine (str): The name of the layout engine used for draw.io diagrams.
+        layout_cache (Optional[LayoutCache]): The cache of component layouts.
+        jobs (int): The maximum number of processes used to lay out components.
+    """
+
+    def __init__(self, root: str, layout_engine: str = "layered", cache_dir: Optional[str] = None,
+                 jobs: int = 1) -> None:
+        """
+        Initializes the server state.
+
+        Args:
+            root (str): The directory requested paths are resolved against.
+            layout_engine (str): The name of the layout engine used for draw.io diagrams.
+            cache_dir (Optional[str]): The directory of the layout cache, or None to disable the layout cache.
+            jobs (int): The maximum number of processes used to lay out components.
+        """
+        self.root = os.path.realpath(root)
+        self.layout_engine = layout_engine
+        self.layout_cache = LayoutCache(cache_dir, keep_in_memory=True) if cache_dir else None
+        self.jobs = jobs
+        self._files: Dict[str, Tuple[FileSignature, list]] = {}
+        self._graphs: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._responses: "OrderedDict[tuple, str]" = OrderedDict()
+        self._lock = asyncio.Lock()
+
+    def resolve_path(self, path: str) -> str:
+        """
+        Resolves a requested path against the root directory.
+
+        Args:
+            path (str): The requested path.
+
+        Returns:
+            str: The absolute path.
+
+        Raises:
+            PermissionError: If the path is outside the root directory.
+            FileNotFoundError: If the path does not exist.
+        """
+        resolved = os.path.realpath(os.path.join(self.root, path))
+        if os.path.commonpath([self.root, resolved]) != self.root:
+            raise PermissionError(f"{path} is outside the served directory.")
+        if not os.path.exists(resolved):
+            raise FileNotFoundError(f"{path} does not exist.")
+        return resolved
+
+    def refresh(self, path: str) -> Tuple[List[Tuple[str, str]], Tuple[Tuple[str, FileSignature], ...]]:
+        """
+        Brings the classes of every file under a path up to date.
+
+        Files whose modification time or size changed are parsed again, and files that
+        disappeared are forgotten.
+
+        Args:
+            path (str): An absolute path to a file or a directory.
+
+        Returns:
+            Tuple: The (file path, base directory) pairs under the path, and the signature of each file.
+        """
+        file_tasks = collect_file_tasks([path])
+        signatures = []
+        for file_path, base_directory in file_tasks:
+            stat = os.stat(file_path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+            signatures.append((file_path, signature))
+
+            cached = self._files.get(file_path)
+            if cached is None or cached[0] != signature:
+                self._files[file_path] = (signature, process_file(file_path, base_directory))
+
+        if os.path.isdir(path):
+            current = {file_path for file_path, _ in file_tasks}
+            prefix = os.path.join(path, "")
+            for file_path in [file_path for file_path in self._files
+                              if file_path.startswith(prefix) and file_path not in current]:
+                del self._files[file_path]
+
+        return file_tasks, tuple(signatures)
+
+    def build_diagram(self, path: str, output_format: str, seeds: Sequence[str] = (), hops: int = 1) -> str:
+        """
+        Builds the diagram of a path, reusing everything that did not change since the last request.
+
+        Args:
+            path (str): An absolute path to a file or a directory.
+            output_format (str): One of `OUTPUT_FORMATS`.
+            seeds (Sequence[str]): Class names to center the diagram on, or none for the whole path.
+            hops (int): With seeds, the maximum number of relationships between a seed and a shown class.
+
+        Returns:
+            str: The rendered diagram.
+
+        Raises:
+            ValueError: If no class matches the seeds, or if `hops` is negative.
+        """
+        file_tasks, signatures = self.refresh(path)
+        seeds = tuple(sorted(set(seeds)))
+        key = (path, output_format, signatures, seeds, hops if seeds else None)
+        if key in self._responses:
+            self._responses.move_to_end(key)
+            return self._responses[key]
+
+        metadata, neighbors = self._class_graph(path, file_tasks, signatures, with_neighbors=bool(seeds))
+        if seeds:
+            metadata = select_neighborhood(metadata, seeds, hops, neighbors)
+
+        positions = None
+        if output_format == "drawio":
+            positions = autolayout_class_diagram(
+                metadata, self.layout_engine, cache=self.layout_cache, jobs=self.jobs)
+        stream = io.StringIO()
+        render_diagram(metadata, stream, output_format, positions)
+
+        self._responses[key] = stream.getvalue()
+        if len(self._responses) > MAX_CACHED_RESPONSES:
+            self._responses.popitem(last=False)
+        return self._responses[key]
+
+    def _class_graph(self, path: str, file_tasks: List[Tuple[str, str]], signatures: Tuple[Tuple[str, FileSignature], ...],
+                     with_neighbors: bool) -> Tuple[List[dict], Optional[list]]:
+        """
+        Returns the class metadata of a path and the adjacency of its relationships, computed
+        the first time a request needs it, both kept until a file of the path changes.
+        """
+        key = (path, signatures)
+        graph = self._graphs.get(key)
+        if graph is None:
+            # The graphs of older versions of the tree are never requested again
+            for stale in [stale for stale in self._graphs if stale[0] == path]:
+                del self._graphs[stale]
+            class_metadata_list = []
+            for file_path, base_directory in file_tasks:
+                module_paths = utils.relative_module_paths(file_path, base_directory)
+                class_metadata_list.extend(dataclasses.replace(metadata, modules=module_paths)
+                                           for metadata in self._files[file_path][1])
+            metadata = [class_metadata.to_dictionary()
+                        for class_metadata in add_placeholder_classes(class_metadata_list)]
+            graph = self._graphs[key] = [metadata, None]
+            if len(self._graphs) > MAX_CACHED_GRAPHS:
+                self._graphs.popitem(last=False)
+        if with_neighbors and graph[1] is None:
+            graph[1] = class_neighbors(class_targets(graph[0]))
+        self._graphs.move_to_end(key)
+        return graph[0], graph[1]
+
+    async def respond(self, method: str, target: str) -> Tuple[int, str, str]:
+        """
+        Computes the response to a request.
+
+        Args:
+            method (str): The HTTP method.
+            target (str): The request target, with its query string.
+
+        Returns:
+            Tuple[int, str, str]: The status code, the content type and the body.
+        """
+        if method != "GET":
+            return 405, PLAIN_TEXT, "Only GET is supported.\n"
+
+        url = urllib.parse.urlsplit(target)
+        if url.path != "/diagram":
+            return 404, PLAIN_TEXT, "Not found. Use /diagram?path=...&format=...\n"
+
+        query = urllib.parse.parse_qs(url.query)
+        output_format = query.get("format", ["drawio"])[0]
+        if "path" not in query:
+            return 400, PLAIN_TEXT, "Missing path parameter.\n"
+        if output_format not in OUTPUT_FORMATS:
+            return 400, PLAIN_TEXT, f"Unknown format. Expected one of: {', '.join(OUTPUT_FORMATS)}\n"
+
+        try:
+            hops = int(query.get("hops", ["1"])[0])
+        except ValueError:
+            return 400, PLAIN_TEXT, "The hops parameter must be an integer.\n"
+
+        try:
+            path = self.resolve_path(query["path"][0])
+        except PermissionError as error:
+            return 403, PLAIN_TEXT, f"{error}\n"
+        except FileNotFoundError as error:
+            return 404, PLAIN_TEXT, f"{error}\n"
+
+        # Parsing and layout are blocking: run them in a thread so other connections are
+        # still accepted, and one at a time so the caches are never updated concurrently.
+        async with self._lock:
+            try:
+                body = await asyncio.get_running_loop().run_in_executor(
+                    None, self.build_diagram, path, output_format, query.get("seed", []), hops)
+            except ValueError as error:
+                return 400, PLAIN_TEXT, f"{error}\n"
+        return 200, CONTENT_TYPES.get(output_format, PLAIN_TEXT), body
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Reads one HTTP request from a connection, answers it and closes the connection.
+        """
+        try:
+            request_line = (await reader.readline()).decode("latin-1")
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+
+            try:
+                method, target, _ = request_line.split(" ", 2)
+                status, content_type, body = await self.respond(method, target)
+            except ValueError:
+                status, content_type, body = 400, PLAIN_TEXT, "Malformed request.\n"
+            except Exception:
+                logging.exception(f"Failed to answer {request_line.strip()}")
+                status, content_type, body = 500, PLAIN_TEXT, "Internal error.\n"
+            logging.info(f"{request_line.strip()} {status}")
+
+            encoded = body.encode("utf-8")
+            writer.write((f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                          f"Content-Type: {content_type}\r\n"
+                          f"Content-Length: {len(encoded)}\r\n"
+                          "Connection: close\r\n\r\n").encode("latin-1") + encoded)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve_forever(self, port: int = DEFAULT_PORT) -> None:
+        """
+        Listens on the loopback interface until the task is cancelled.
+
+        Args:
+            port (int): The TCP port to listen on.
+        """
+        server = await asyncio.start_server(self.handle_connection, LOCALHOST, port)
+        logging.warning(f"Serving diagrams of {self.root} on http://{LOCALHOST}:{port}/diagram")
+        async with server:
+            await server.serve_forever()
+
+
+def serve(root: str, port: int = DEFAULT_PORT, layout_engine: str = "layered",
+          cache_dir: Optional[str] = None, jobs: int = 1) -> None:
+    """
+    Runs a diagram server until it is interrupted.
+
+    Args:
+        root (str): The directory requested paths are resolved against.
+        port (int): The TCP port to listen on.
+        layout_engine (str): The name of the layout engine used for draw.io diagrams.
+        cache_dir (Optional[str]): The directory of the layout cache, or None to disable the layout cache.
+        jobs (int): The maximum number of processes used to lay out components.
+    """
+    server = DiagramServer(root, layout_engine, cache_dir, jobs)
+    try:
+        asyncio.run(server.serve_forever(port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,102 @@
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Tuple
+from pydiagram.uml_generator.utils import has_common_element
+
+
+class Edge(NamedTuple):
+    """
+    A relationship resolved to the positions of its source and target classes in the metadata list.
+
+    Attributes:
+    - source (int): Index of the class that owns the relationship.
+    - target (int): Index of the class the relationship points to.
+    - relation_type (str): The relationship type ("inheritance" or "association").
+    """
+    source: int
+    target: int
+    relation_type: str
+
+
+class EdgeResolver:
+    """
+    Resolves the relationships stored in class metadata to the classes they point to.
+
+    A relationship targets every class whose name equals `related` and whose modules
+    share at least one element with the relationship modules (two empty module lists
+    also match). Instead of scanning the whole metadata list for every relationship,
+    the resolver keeps a hash map from class name to the indices of the classes with
+    that name, together with their precomputed module sets. Resolving all edges is
+    therefore linear in the number of relationships plus the number of matches.
+
+    Attributes:
+    - class_count (int): The number of classes added to the resolver.
+    """
+
+    def __init__(self, metadata: Iterable[Dict[str, Any]] = ()) -> None:
+        """
+        Initializes the resolver and indexes the given classes.
+
+        Args:
+        - metadata (Iterable[Dict[str, Any]]): Class metadata dictionaries to index.
+        """
+        self.class_count = 0
+        self._candidates: Dict[str, List[Tuple[int, FrozenSet[str]]]] = {}
+        self._relationships: List[Tuple[int, Dict[str, Any]]] = []
+        for class_metadata in metadata:
+            self.add(class_metadata)
+
+    def add(self, class_metadata: Dict[str, Any]) -> int:
+        """
+        Indexes a class and queues its relationships for resolution.
+
+        Args:
+        - class_metadata (Dict[str, Any]): The class metadata dictionary.
+
+        Returns:
+        - int: The index assigned to the class, which is its position in insertion order.
+        """
+        index = self.class_count
+        self.class_count += 1
+        self._candidates.setdefault(class_metadata["name"], []).append(
+            (index, frozenset(class_metadata["modules"])))
+        for relationship in class_metadata["relationships"]:
+            self._relationships.append((index, relationship))
+        return index
+
+    def targets(self, relationship: Dict[str, Any]) -> List[int]:
+        """
+        Finds the indices of the classes a relationship points to.
+
+        Args:
+        - relationship (Dict[str, Any]): A relationship dictionary with "related" and "modules" keys.
+
+        Returns:
+        - List[int]: The matching class indices, in insertion order.
+        """
+        candidates = self._candidates.get(relationship["related"])
+        if not candidates:
+            return []
+
+        modules = relationship["modules"]
+        if len(candidates) == 1:
+            index, candidate_modules = candidates[0]
+            return [index] if has_common_element(modules, candidate_modules) else []
+
+        modules = frozenset(modules)
+        if not modules:
+            return [index for index, candidate_modules in candidates if not candidate_modules]
+        return [index for index, candidate_modules in candidates
+                if not modules.isdisjoint(candidate_modules)]
+
+    def resolve(self) -> Iterator[Edge]:
+        """
+        Resolves every queued relationship.
+
+        Edges are produced grouped by source class, in the order the classes and their
+        relationships were added, which is the order the draw.io renderer has always used.
+
+        Yields:
+        - Edge: One edge per (relationship, matching target class) pair.
+        """
+        for source, relationship in self._relationships:
+            for target in self.targets(relationship):
+                yield Edge(source, target, relationship["relation_type"])
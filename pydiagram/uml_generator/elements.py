@@ -1,9 +1,13 @@
 import uuid
 import xml.etree.ElementTree as ET
-from typing import Any, List, Tuple, Dict
+from typing import Any, List, Optional, Tuple, Dict
 from .base import XmlElementFromString
 import pydiagram.uml_generator.utils as utils
 
+CLASS_WIDTH = 160
+ROW_HEIGHT = 26
+STROKE_HEIGHT = 8
+
 
 class DrawIODiagram(XmlElementFromString):
     """
@@ -77,7 +81,7 @@ class UMLClassDiagramElement(ET.Element):
         _parent (Any): Parent element to which this UML class element will be attached.
     """
 
-    def __init__(self, metadata: dict, dimensions: utils.Dimensions, parent: Any):
+    def __init__(self, metadata: dict, dimensions: utils.Dimensions, parent: Any, id: Optional[str] = None):
         """
         Initializes the UMLClassDiagramElement with metadata, dimensions, and parent element.
 
@@ -85,53 +89,75 @@ class UMLClassDiagramElement(ET.Element):
             metadata (dict): Metadata dictionary containing details of attributes and methods.
             dimensions (utils.Dimensions): Dimensions of the UML class element.
             parent (Any): The parent element to which this UML class element will be appended.
+            id (Optional[str]): The ID of the class cell, to rebuild a class that is already in a
+                diagram. By default, a new unique ID is made of the class identifier (see
+                `utils.class_identifier`) and a UUID, so that positions read back from the
+                diagram are keyed like the layout.
         """
-        self.id = f"class-{uuid.uuid4()}"
+        self.id = id or f"class-{utils.class_identifier(metadata)}-{uuid.uuid4()}"
         self._metadata = metadata
         self._dimensions = dimensions
         self._parent = parent
         self._build_class()
 
+    @staticmethod
+    def measure(metadata: dict, width: int = CLASS_WIDTH) -> Tuple[int, int]:
+        """
+        Computes the size of the box a class will occupy without building its XML.
+
+        The height follows the same rules as `_build_class`: a header row, one row per
+        attribute, the stroke separator and one row per method.
+
+        Args:
+            metadata (dict): Metadata dictionary containing details of attributes and methods.
+            width (int): The width of the class box.
+
+        Returns:
+            Tuple[int, int]: The width and height of the class box.
+        """
+        rows = 1 + len(metadata["attributes"]) + len(metadata["methods"])
+        return width, rows * ROW_HEIGHT + STROKE_HEIGHT
+
     def _build_class(self) -> None:
         """
         Builds the UML class element by adding attributes, a stroke, methods, and a header.
         """
         from .builders.elements import AttributeBuilder, MethodBuilder, StrokeBuilder
 
-        y_offset = 26
+        y_offset = ROW_HEIGHT
 
         # Create and append attributes
         attribute_builder = AttributeBuilder(self.id)
         for attribute in self._metadata["attributes"]:
             attribute_dimensions = utils.Dimensions(
-                0, y_offset, self._dimensions.width, 26)
+                0, y_offset, self._dimensions.width, ROW_HEIGHT)
             attribute_element = attribute_builder.build(
                 attribute, attribute_dimensions)
             self.append(attribute_element)
-            y_offset += 26
+            y_offset += ROW_HEIGHT
 
          # Create and append stroke
         stroke_builder = StrokeBuilder(self.id)
         stroke_dimensions = utils.Dimensions(
-            self._dimensions.x, y_offset, self._dimensions.width, 8)
+            self._dimensions.x, y_offset, self._dimensions.width, STROKE_HEIGHT)
         stroke_element = stroke_builder.build(stroke_dimensions)
         self.append(stroke_element)
-        y_offset += 8
+        y_offset += STROKE_HEIGHT
 
         # Create and append methods
         method_builder = MethodBuilder(self.id)
         for method in self._metadata["methods"]:
             method_dimensions = utils.Dimensions(
-                0, y_offset, self._dimensions.width, 26)
+                0, y_offset, self._dimensions.width, ROW_HEIGHT)
             method_element = method_builder.build(method, method_dimensions)
             self.append(method_element)
-            y_offset += 26
+            y_offset += ROW_HEIGHT
 
         # Create and append header
         header_dimensions = utils.Dimensions(
             self._dimensions.x, self._dimensions.y, self._dimensions.width, y_offset)
         header_element = ClassHeader(
-            self._metadata["name"], header_dimensions, self._parent, self.id)
+            utils.display_name(self._metadata), header_dimensions, self._parent, self.id)
         self.insert(0, header_element)
 
         self._dimensions = utils.Dimensions(
@@ -0,0 +1,84 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from pydiagram.uml_generator.layout.cache import LayoutCache
+from pydiagram.uml_generator.layout.components import layout_components
+from pydiagram.uml_generator.layout.graph import ClassGraph
+from pydiagram.uml_generator.layout.incremental import StoredPosition, incremental_layout
+from pydiagram.uml_generator.layout.layered import layered_layout
+from pydiagram.uml_generator.layout.overlap import remove_overlaps
+
+
+def _dot_layout(graph: ClassGraph) -> Dict[str, Tuple[float, float]]:
+    # Imported on demand: the dot engine is the only one that needs networkx and Graphviz.
+    from pydiagram.uml_generator.layout.dot import dot_layout
+    return dot_layout(graph)
+
+
+def _force_directed_layout(graph: ClassGraph) -> Dict[str, Tuple[float, float]]:
+    # Imported on demand: the force-directed engine is the only one that needs NumPy.
+    from pydiagram.uml_generator.layout.force_directed import force_directed_layout
+    return force_directed_layout(graph)
+
+
+LAYOUT_ENGINES: Dict[str, Callable[[ClassGraph], Dict[str, Tuple[float, float]]]] = {
+    "layered": layered_layout,
+    "dot": _dot_layout,
+    "force": _force_directed_layout,
+}
+
+# Engines whose layouts may place boxes on top of each other; the layered engine never does
+OVERLAPPING_ENGINES = ("dot", "force")
+
+
+def autolayout_class_diagram(metadata: List[Dict[str, Any]], engine: str = "layered",
+                             previous_positions: Optional[Dict[str, StoredPosition]] = None,
+                             cache: Optional[LayoutCache] = None,
+                             force: bool = False, jobs: int = 1,
+                             remove_overlap: bool = True) -> Dict[str, Tuple[float, float]]:
+    """
+    Computes the position of every class of a diagram.
+
+    The graph is split into weakly connected components, which are laid out separately
+    (in parallel when `jobs` is greater than one) and packed into shelves. Engines that
+    let boxes overlap (`force`, `dot`) are followed by an overlap-removal pass that uses
+    the final box sizes.
+
+    When positions from a previous run are given, the classes found there keep their
+    position and only new or resized classes are placed (see `incremental_layout`).
+
+    When a cache is given, component layouts are looked up by graph fingerprint first, so a
+    run where only method bodies or docstrings changed skips the layout engine entirely.
+
+    Args:
+        metadata (List[Dict[str, Any]]): Class metadata dictionaries.
+        engine (str): The name of the layout engine, one of the keys of `LAYOUT_ENGINES`.
+        previous_positions (Optional[Dict[str, StoredPosition]]): Boxes from a previous run, as read by
+            `read_positions_from_drawio` or `read_positions_file`.
+        cache (Optional[LayoutCache]): The cache of component layouts.
+        force (bool): Whether to recompute the layout even when the cache holds it.
+        jobs (int): The maximum number of processes used to lay out components.
+        remove_overlap (bool): Whether to push overlapping boxes apart after the layout of an
+            engine of `OVERLAPPING_ENGINES`.
+
+    Returns:
+        Dict[str, Tuple[float, float]]: The top-left corner of each class box, keyed by class identifier
+            (see `utils.class_identifier`).
+
+    Raises:
+        ValueError: If the layout engine is unknown.
+    """
+    try:
+        layout_engine = LAYOUT_ENGINES[engine]
+    except KeyError:
+        raise ValueError(
+            f"Unknown layout engine: {engine}. Expected one of: {', '.join(LAYOUT_ENGINES)}")
+
+    def full_layout(graph: ClassGraph) -> Dict[str, Tuple[float, float]]:
+        positions = layout_components(graph, layout_engine, engine, jobs, cache, force)
+        if remove_overlap and engine in OVERLAPPING_ENGINES:
+            positions = remove_overlaps(positions, graph.sizes)
+        return positions
+
+    graph = ClassGraph.from_metadata(metadata)
+    if previous_positions:
+        return incremental_layout(graph, previous_positions, full_layout)
+    return full_layout(graph)
@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+from pydiagram.uml_generator.layout.graph import ClassGraph
+
+DEFAULT_MAX_ENTRIES = 256
+
+
+def graph_fingerprint(graph: ClassGraph, engine: str) -> str:
+    """
+    Computes a canonical hash of everything a layout depends on.
+
+    The hash covers the layout engine, the node set with the box size of every node and
+    the edge set. Node and edge order do not matter, and changes that do not alter the
+    graph structure or the box sizes (docstrings, method bodies) keep the same hash.
+
+    Args:
+        graph (ClassGraph): The graph to fingerprint.
+        engine (str): The name of the layout engine.
+
+    Returns:
+        str: A hexadecimal SHA-256 digest.
+    """
+    canonical = {
+        "engine": engine,
+        "nodes": sorted([name, *graph.sizes[name]] for name in graph.nodes),
+        "edges": sorted(list(edge) for edge in graph.edges),
+    }
+    encoded = json.dumps(canonical, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class LayoutCache:
+    """
+    An on-disk cache of layout results, keyed by graph fingerprint.
+
+    Each entry is a small JSON file named after its key. Reading an entry refreshes its
+    modification time, and writing a new entry evicts the least recently used entries
+    once the cache holds more than `max_entries` files or more than `max_bytes` bytes.
+
+    A long-running process can also keep the entries it reads or writes in memory, so that
+    repeated lookups do not touch the disk.
+
+    Attributes:
+        directory (str): The directory the entries are stored in.
+        max_entries (int): The maximum number of entries kept.
+        max_bytes (Optional[int]): The maximum total size of the entries, or None for no size limit.
+        keep_in_memory (bool): Whether entries are also kept in memory.
+    """
+
+    def __init__(self, directory: str, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: Optional[int] = None,
+                 keep_in_memory: bool = False) -> None:
+        """
+        Initializes the cache and creates its directory if needed.
+
+        Args:
+            directory (str): The directory the entries are stored in.
+            max_entries (int): The maximum number of entries kept.
+            max_bytes (Optional[int]): The maximum total size of the entries, or None for no size limit.
+            keep_in_memory (bool): Whether entries are also kept in memory, up to `max_entries` of them.
+        """
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.keep_in_memory = keep_in_memory
+        self._memory: Dict[str, Dict[str, Tuple[float, float]]] = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Tuple[float, float]]]:
+        """
+        Returns the positions stored under a key.
+
+        Args:
+            key (str): The graph fingerprint.
+
+        Returns:
+            Optional[Dict[str, Tuple[float, float]]]: The stored positions, or None on a cache miss.
+        """
+        if key in self._memory:
+            # Move the entry to the end, which keeps the dictionary in least recently used order
+            self._memory[key] = self._memory.pop(key)
+            return dict(self._memory[key])
+
+        path = self._entry_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+        os.utime(path)
+        positions = {name: tuple(position) for name, position in data.items()}
+        self._remember(key, positions)
+        return dict(positions)
+
+    def put(self, key: str, positions: Dict[str, Tuple[float, float]]) -> None:
+        """
+        Stores positions under a key and evicts old entries if the cache is over its limits.
+
+        The entry is written to a temporary file first and then moved into place, so that
+        concurrent readers never see a partially written entry.
+
+        Args:
+            key (str): The graph fingerprint.
+            positions (Dict[str, Tuple[float, float]]): The positions to store.
+        """
+        import tempfile
+
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(file_descriptor, "w", encoding="utf-8") as file:
+            json.dump({name: list(position) for name, position in positions.items()}, file, ensure_ascii=False)
+        os.replace(temporary_path, self._entry_path(key))
+        self._remember(key, {name: tuple(position) for name, position in positions.items()})
+        self._evict()
+
+    def clear(self) -> None:
+        """
+        Removes every entry from the cache.
+        """
+        self._memory.clear()
+        for path, _, _ in self._entries():
+            os.remove(path)
+
+    def _remember(self, key: str, positions: Dict[str, Tuple[float, float]]) -> None:
+        """
+        Keeps an entry in memory, dropping the least recently used one when there are too many.
+        """
+        if not self.keep_in_memory:
+            return
+        self._memory.pop(key, None)
+        self._memory[key] = positions
+        if len(self._memory) > self.max_entries:
+            del self._memory[next(iter(self._memory))]
+
+    def _entries(self) -> List[Tuple[str, float, int]]:
+        """
+        Lists the entries as (path, modification time, size) tuples, least recently used first.
+        """
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(".json"):
+                stat = entry.stat()
+                entries.append((entry.path, stat.st_mtime, stat.st_size))
+        entries.sort(key=lambda entry: entry[1])
+        return entries
+
+    def _evict(self) -> None:
+        entries = self._entries()
+        excess_entries = len(entries) - self.max_entries
+        total_bytes = sum(size for _, _, size in entries)
+        for path, _, size in entries:
+            if excess_entries <= 0 and (self.max_bytes is None or total_bytes <= self.max_bytes):
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            excess_entries -= 1
+            total_bytes -= size
@@ -0,0 +1,152 @@
+import math
+from typing import Callable, Dict, List, Optional, Tuple
+from pydiagram.uml_generator.layout.cache import LayoutCache, graph_fingerprint
+from pydiagram.uml_generator.layout.graph import ClassGraph
+
+COMPONENT_GAP = 80
+# Below this number of nodes to lay out, starting worker processes costs more than it saves
+PARALLEL_THRESHOLD = 1000
+
+
+def split_components(graph: ClassGraph) -> List[ClassGraph]:
+    """
+    Splits a graph into its weakly connected components.
+
+    Components are found with a union-find over the edges, ignoring their direction.
+    They are returned largest first; components of the same size keep the order of their
+    first node in the graph.
+
+    Args:
+        graph (ClassGraph): The graph to split.
+
+    Returns:
+        List[ClassGraph]: One subgraph per component.
+    """
+    parent = {name: name for name in graph.nodes}
+
+    def find(name: str) -> str:
+        root = name
+        while parent[root] != root:
+            root = parent[root]
+        while parent[name] != root:
+            parent[name], name = root, parent[name]
+        return root
+
+    for source, target, _ in graph.edges:
+        source_root, target_root = find(source), find(target)
+        if source_root != target_root:
+            parent[target_root] = source_root
+
+    components: Dict[str, ClassGraph] = {}
+    for name in graph.nodes:
+        component = components.setdefault(find(name), ClassGraph())
+        component.add_node(name, graph.labels[name], graph.sizes[name])
+    for source, target, relation_type in graph.edges:
+        components[find(source)].edges.append((source, target, relation_type))
+
+    return sorted(components.values(), key=lambda component: -len(component.nodes))
+
+
+def layout_components(graph: ClassGraph, layout_engine: Callable[[ClassGraph], Dict[str, Tuple[float, float]]],
+                      engine: str, jobs: int = 1, cache: Optional[LayoutCache] = None,
+                      force: bool = False) -> Dict[str, Tuple[float, float]]:
+    """
+    Lays out every weakly connected component on its own and packs the results.
+
+    Isolated classes need no layout at all. The other components are looked up in the
+    cache first, and the remaining ones are laid out in a process pool when `jobs` is
+    greater than one, so the total time is close to the time of the largest component.
+
+    Args:
+        graph (ClassGraph): The graph to lay out.
+        layout_engine (Callable): The layout engine applied to each component. It must be a
+            module-level function so it can be sent to worker processes.
+        engine (str): The name of the layout engine, part of the cache key.
+        jobs (int): The maximum number of worker processes.
+        cache (Optional[LayoutCache]): The cache of component layouts.
+        force (bool): Whether to recompute layouts even when the cache holds them.
+
+    Returns:
+        Dict[str, Tuple[float, float]]: The top-left corner of every node, in diagram coordinates.
+    """
+    components = split_components(graph)
+    layouts: List[Optional[Dict[str, Tuple[float, float]]]] = [None] * len(components)
+    keys: Dict[int, str] = {}
+    pending: List[int] = []
+
+    for index, component in enumerate(components):
+        if len(component.nodes) == 1:
+            layouts[index] = {component.nodes[0]: (0, 0)}
+            continue
+        if cache is not None:
+            keys[index] = graph_fingerprint(component, engine)
+            if not force:
+                layouts[index] = cache.get(keys[index])
+                if layouts[index] is not None:
+                    continue
+        pending.append(index)
+
+    pending_nodes = sum(len(components[index].nodes) for index in pending)
+    if jobs > 1 and len(pending) > 1 and pending_nodes >= PARALLEL_THRESHOLD:
+        # Imported here: loading multiprocessing is a noticeable part of the startup time
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=min(jobs, len(pending))) as executor:
+            results = executor.map(layout_engine, [components[index] for index in pending])
+            for index, positions in zip(pending, results):
+                layouts[index] = positions
+    else:
+        for index in pending:
+            layouts[index] = layout_engine(components[index])
+
+    if cache is not None:
+        for index in pending:
+            cache.put(keys[index], layouts[index])
+
+    return pack_components(components, layouts)
+
+
+def pack_components(components: List[ClassGraph], layouts: List[Dict[str, Tuple[float, float]]],
+                    gap: float = COMPONENT_GAP) -> Dict[str, Tuple[float, float]]:
+    """
+    Packs component layouts into shelves.
+
+    Each layout is moved so that its bounding box starts at the origin. Components are
+    placed from left to right, tallest first, and a new shelf is started below the previous
+    one when the row would grow wider than the target width. The target width is chosen
+    so the result is roughly square, but never narrower than the widest component.
+
+    Args:
+        components (List[ClassGraph]): The components, used for the box sizes.
+        layouts (List[Dict[str, Tuple[float, float]]]): The layout of each component.
+        gap (float): The distance kept between two components.
+
+    Returns:
+        Dict[str, Tuple[float, float]]: The packed top-left corner of every node.
+    """
+    boxes = []
+    for index, (component, positions) in enumerate(zip(components, layouts)):
+        left = min(x for x, _ in positions.values())
+        top = min(y for _, y in positions.values())
+        right = max(x + component.sizes[name][0] for name, (x, _) in positions.items())
+        bottom = max(y + component.sizes[name][1] for name, (_, y) in positions.items())
+        boxes.append((index, left, top, right - left, bottom - top))
+
+    if not boxes:
+        return {}
+
+    area = sum((width + gap) * (height + gap) for _, _, _, width, height in boxes)
+    target_width = max(max(width for _, _, _, width, _ in boxes), math.sqrt(area))
+    boxes.sort(key=lambda box: (-box[4], box[0]))
+
+    packed = {}
+    shelf_x = shelf_y = shelf_height = 0
+    for index, left, top, width, height in boxes:
+        if shelf_x > 0 and shelf_x + width > target_width:
+            shelf_y += shelf_height + gap
+            shelf_x = shelf_height = 0
+        for name, (x, y) in layouts[index].items():
+            packed[name] = (x - left + shelf_x, y - top + shelf_y)
+        shelf_x += width + gap
+        shelf_height = max(shelf_height, height)
+    return packed
@@ -0,0 +1,60 @@
+import functools
+import os
+import shutil
+from typing import Dict, Optional, Tuple
+from pydiagram.uml_generator.layout.graph import ClassGraph
+
+WINDOWS_GRAPHVIZ_BIN = r"C:\Program Files\Graphviz\bin"
+
+
+@functools.lru_cache(maxsize=None)
+def find_graphviz() -> Optional[str]:
+    """
+    Finds the Graphviz `dot` executable.
+
+    The PATH is searched first, then the default Windows installation directory. The
+    lookup uses `shutil.which` instead of running a package manager, and its result is
+    cached for the lifetime of the process; call `find_graphviz.cache_clear()` after
+    installing Graphviz.
+
+    Returns:
+    - Optional[str]: The path of the `dot` executable, or None if Graphviz is not installed.
+    """
+    return shutil.which("dot") or shutil.which("dot", path=WINDOWS_GRAPHVIZ_BIN)
+
+
+def dot_layout(graph: ClassGraph) -> Dict[str, Tuple[float, float]]:
+    """
+    Lays out a class graph with Graphviz `dot`, through networkx and pydot.
+
+    This engine needs the Graphviz binaries on the PATH and runs `dot` in a subprocess.
+    The Graphviz coordinates are scaled to the diagram coordinate space the same way
+    the draw.io renderer has always scaled them.
+
+    Args:
+    - graph (ClassGraph): The graph to lay out.
+
+    Returns:
+    - Dict[str, Tuple[float, float]]: The position of every node, in diagram coordinates.
+
+    Raises:
+    - RuntimeError: If Graphviz is not installed.
+    """
+    dot_path = find_graphviz()
+    if dot_path is None:
+        raise RuntimeError("Graphviz 'dot' was not found. Install Graphviz or use another layout engine.")
+    graphviz_bin_dir = os.path.dirname(dot_path)
+    if graphviz_bin_dir not in os.environ.get("PATH", "").split(os.pathsep):
+        os.environ["PATH"] = os.pathsep.join([os.environ.get("PATH", ""), graphviz_bin_dir])
+
+    import networkx as nx
+    from networkx.drawing.nx_pydot import pydot_layout
+
+    G = nx.DiGraph()
+    for name in graph.nodes:
+        G.add_node(name, label=graph.labels[name])
+    for source, target, _ in graph.edges:
+        G.add_edge(source, target)
+
+    positions = pydot_layout(G, prog='dot')
+    return {name: (x * 3, y * 5) for name, (x, y) in positions.items()}
@@ -0,0 +1,103 @@
+from typing import Any, Dict, Iterable, List, Tuple
+from pydiagram.uml_generator.edges import EdgeResolver
+from pydiagram.uml_generator.elements import UMLClassDiagramElement
+from pydiagram.uml_generator.utils import class_identifier
+
+
+class ClassGraph:
+    """
+    The graph handed to the layout engines.
+
+    Nodes are identified by their sanitized class name, which is also the key of the
+    position mapping returned by every layout engine. Classes whose sanitized names
+    collide are merged into a single node, as they have always been.
+
+    Attributes:
+    - nodes (List[str]): Node identifiers, in metadata order.
+    - labels (Dict[str, str]): The original class name of each node.
+    - sizes (Dict[str, Tuple[int, int]]): The width and height of the box drawn for each node.
+    - edges (List[Tuple[str, str, str]]): Unique (source, target, relation_type) triples, without self-loops.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes an empty ClassGraph.
+        """
+        self.nodes: List[str] = []
+        self.labels: Dict[str, str] = {}
+        self.sizes: Dict[str, Tuple[int, int]] = {}
+        self.edges: List[Tuple[str, str, str]] = []
+
+    @classmethod
+    def from_metadata(cls, metadata: List[Dict[str, Any]]) -> "ClassGraph":
+        """
+        Builds the graph from class metadata, sizing each node like `UMLClassDiagramElement` does.
+
+        Nodes are keyed by `class_identifier`, so classes sharing a name in different modules
+        or enclosing classes are laid out as separate boxes.
+
+        Args:
+        - metadata (List[Dict[str, Any]]): Class metadata dictionaries.
+
+        Returns:
+        - ClassGraph: The graph of classes and their resolved relationships.
+        """
+        graph = cls()
+        node_names = []
+        for class_metadata in metadata:
+            name = class_identifier(class_metadata)
+            graph.add_node(name, class_metadata["name"],
+                           UMLClassDiagramElement.measure(class_metadata))
+            node_names.append(name)
+
+        graph.add_edges((node_names[edge.source], node_names[edge.target], edge.relation_type)
+                        for edge in EdgeResolver(metadata).resolve())
+        return graph
+
+    def add_node(self, name: str, label: str, size: Tuple[int, int]) -> None:
+        """
+        Adds a node, or grows an existing node so that it fits the given size.
+
+        Args:
+        - name (str): The node identifier.
+        - label (str): The class name shown for the node.
+        - size (Tuple[int, int]): The width and height of the node box.
+        """
+        if name in self.sizes:
+            width, height = self.sizes[name]
+            self.sizes[name] = (max(width, size[0]), max(height, size[1]))
+            return
+        self.nodes.append(name)
+        self.labels[name] = label
+        self.sizes[name] = tuple(size)
+
+    def add_edges(self, edges: Iterable[Tuple[str, str, str]]) -> None:
+        """
+        Adds edges between existing nodes, ignoring self-loops and duplicates.
+
+        Args:
+        - edges (Iterable[Tuple[str, str, str]]): (source, target, relation_type) triples.
+        """
+        seen = set(self.edges)
+        for edge in edges:
+            source, target, _ = edge
+            if source == target or edge in seen or source not in self.sizes or target not in self.sizes:
+                continue
+            seen.add(edge)
+            self.edges.append(edge)
+
+    def subgraph(self, nodes: Iterable[str]) -> "ClassGraph":
+        """
+        Builds the subgraph induced by the given nodes.
+
+        Args:
+        - nodes (Iterable[str]): The nodes to keep.
+
+        Returns:
+        - ClassGraph: A new graph with the given nodes and the edges between them.
+        """
+        graph = ClassGraph()
+        for name in nodes:
+            graph.add_node(name, self.labels[name], self.sizes[name])
+        graph.add_edges(self.edges)
+        return graph
@@ -0,0 +1,276 @@
+import base64
+import json
+import math
+import os
+import urllib.parse
+import xml.etree.ElementTree as ET
+import zlib
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from pydiagram.uml_generator.layout.graph import ClassGraph
+from pydiagram.uml_generator.utils import sanitize_class_name, strip_badge
+
+# (x, y, width, height); width and height are None when the source only stores positions.
+StoredPosition = Tuple[float, float, Optional[float], Optional[float]]
+
+PLACEMENT_GAP = 40
+SEARCH_RINGS = 25
+
+
+def read_positions_from_drawio(drawio_path: str) -> Dict[str, StoredPosition]:
+    """
+    Reads the position and size of every class box from a draw.io file.
+
+    Class boxes are the `mxCell`s whose id starts with "class-", as written by
+    `UMLClassDiagramElement`. Positions changed by hand in draw.io are picked up too.
+    Compressed diagrams, as saved by some draw.io versions, are inflated first.
+
+    Boxes are keyed by the class identifier held in their id. Boxes written before ids
+    held it are keyed by their sanitized name, which only matches classes outside of any
+    module.
+
+    Args:
+        drawio_path (str): Path to the draw.io file (for example a previous output.xml).
+
+    Returns:
+        Dict[str, StoredPosition]: The stored box of each class, keyed by class identifier.
+    """
+    root = ET.parse(drawio_path).getroot()
+    models = list(root.iter("mxGraphModel"))
+    for diagram in root.iter("diagram"):
+        if diagram.find("mxGraphModel") is None and diagram.text and diagram.text.strip():
+            models.append(ET.fromstring(inflate_diagram(diagram.text.strip())))
+
+    positions = {}
+    for model in models:
+        for cell in model.iter("mxCell"):
+            if not cell.get("id", "").startswith("class-") or cell.get("vertex") != "1":
+                continue
+            geometry = cell.find("mxGeometry")
+            if geometry is None:
+                continue
+            positions[cell_class_identifier(cell)] = (
+                float(geometry.get("x", 0)),
+                float(geometry.get("y", 0)),
+                float(geometry.get("width")) if geometry.get("width") else None,
+                float(geometry.get("height")) if geometry.get("height") else None,
+            )
+    return positions
+
+
+def cell_class_identifier(cell: ET.Element) -> str:
+    """
+    Returns the class identifier of a class box cell written by `UMLClassDiagramElement`.
+
+    Args:
+        cell (ET.Element): The class header cell, whose id is "class-<identifier>-<uuid>".
+
+    Returns:
+        str: The class identifier, or the sanitized class name for a cell whose id is "class-<uuid>".
+    """
+    # Identifiers hold no "-", and a UUID holds four
+    parts = cell.get("id", "").split("-")
+    if len(parts) == 7:
+        return parts[1]
+    return sanitize_class_name(strip_badge(cell.get("value", "")))
+
+
+def inflate_diagram(text: str) -> str:
+    """
+    Decodes the content of a compressed draw.io `diagram` element.
+    """
+    raw = zlib.decompress(base64.b64decode(text), -zlib.MAX_WBITS)
+    return urllib.parse.unquote(raw.decode("utf-8"))
+
+
+def read_positions_file(positions_path: str) -> Dict[str, StoredPosition]:
+    """
+    Reads positions from a JSON sidecar file.
+
+    The file maps class identifiers to `[x, y]` or `[x, y, width, height]` lists.
+
+    Args:
+        positions_path (str): Path to the sidecar file.
+
+    Returns:
+        Dict[str, StoredPosition]: The stored box of each class.
+    """
+    with open(positions_path, "r", encoding="utf-8") as file:
+        data = json.load(file)
+
+    positions = {}
+    for name, values in data.items():
+        x, y, *size = values
+        width, height = size if len(size) == 2 else (None, None)
+        positions[name] = (x, y, width, height)
+    return positions
+
+
+def save_positions_file(positions_path: str, positions: Dict[str, Tuple[float, float]], graph: ClassGraph) -> None:
+    """
+    Writes positions and box sizes to a JSON sidecar file.
+
+    Args:
+        positions_path (str): Path to the sidecar file.
+        positions (Dict[str, Tuple[float, float]]): The top-left corner of each class box.
+        graph (ClassGraph): The graph the positions were computed for, used for the box sizes.
+    """
+    data = {name: [x, y, *graph.sizes[name]] for name, (x, y) in positions.items() if name in graph.sizes}
+    with open(positions_path, "w", encoding="utf-8") as file:
+        json.dump(data, file, ensure_ascii=False, indent=4)
+
+
+def load_previous_positions(path: str) -> Dict[str, StoredPosition]:
+    """
+    Loads previous positions from a draw.io file or a JSON sidecar file, based on the extension.
+
+    Args:
+        path (str): Path to a `.xml`/`.drawio` file or to a JSON sidecar file.
+
+    Returns:
+        Dict[str, StoredPosition]: The stored box of each class.
+    """
+    if os.path.splitext(path)[1].lower() in (".xml", ".drawio"):
+        return read_positions_from_drawio(path)
+    return read_positions_file(path)
+
+
+class _SpatialHash:
+    """
+    A uniform grid of placed boxes, used to test a candidate box against its neighbors only.
+    """
+
+    def __init__(self, cell_size: float) -> None:
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], List[Tuple[float, float, float, float]]] = {}
+
+    def _cells(self, x: float, y: float, width: float, height: float) -> Iterator[Tuple[int, int]]:
+        for cell_x in range(math.floor(x / self.cell_size), math.floor((x + width) / self.cell_size) + 1):
+            for cell_y in range(math.floor(y / self.cell_size), math.floor((y + height) / self.cell_size) + 1):
+                yield cell_x, cell_y
+
+    def insert(self, box: Tuple[float, float, float, float]) -> None:
+        for cell in self._cells(*box):
+            self.cells.setdefault(cell, []).append(box)
+
+    def collides(self, box: Tuple[float, float, float, float], gap: float) -> bool:
+        x, y, width, height = box
+        padded = (x - gap, y - gap, width + 2 * gap, height + 2 * gap)
+        for cell in self._cells(*padded):
+            for other_x, other_y, other_width, other_height in self.cells.get(cell, ()):
+                if (x - gap < other_x + other_width and other_x < x + width + gap and
+                        y - gap < other_y + other_height and other_y < y + height + gap):
+                    return True
+        return False
+
+
+def incremental_layout(graph: ClassGraph, previous: Dict[str, StoredPosition],
+                       fallback: Callable[[ClassGraph], Dict[str, Tuple[float, float]]],
+                       gap: float = PLACEMENT_GAP) -> Dict[str, Tuple[float, float]]:
+    """
+    Lays out a graph while keeping the classes that were already placed in a previous run.
+
+    Classes found in `previous` with an unchanged box size are pinned where they were.
+    Only new classes and classes whose box size changed are placed, by a local search
+    around an anchor point: the previous position for a resized class, the mean position
+    of its already placed neighbors for a new class, or the area below the diagram when
+    the class has no placed neighbor. Each candidate is checked against a spatial hash of
+    the placed boxes, so the work is proportional to the number of classes to place.
+
+    Args:
+        graph (ClassGraph): The graph to lay out.
+        previous (Dict[str, StoredPosition]): Boxes from a previous run, keyed by node name.
+        fallback (Callable): The layout engine used when no class of the graph was placed before.
+        gap (float): The minimum distance kept between a placed class and its neighbors.
+
+    Returns:
+        Dict[str, Tuple[float, float]]: The top-left corner of every node, in diagram coordinates.
+    """
+    if not any(name in previous for name in graph.nodes):
+        return fallback(graph)
+
+    positions: Dict[str, Tuple[float, float]] = {}
+    pending: List[str] = []
+    for name in graph.nodes:
+        stored = previous.get(name)
+        if stored is not None and _same_size(stored, graph.sizes[name]):
+            positions[name] = (stored[0], stored[1])
+        else:
+            pending.append(name)
+
+    if not pending:
+        return positions
+
+    sizes = graph.sizes
+    cell_size = sum(max(width, height) for width, height in sizes.values()) / len(sizes) + gap
+    index = _SpatialHash(cell_size)
+    for name, (x, y) in positions.items():
+        index.insert((x, y, *sizes[name]))
+
+    neighbors: Dict[str, List[str]] = {name: [] for name in pending}
+    for source, target, _ in graph.edges:
+        if source in neighbors:
+            neighbors[source].append(target)
+        if target in neighbors:
+            neighbors[target].append(source)
+
+    bottom = max((y + sizes[name][1] for name, (x, y) in positions.items()), default=0)
+    left = min((x for x, y in positions.values()), default=0)
+    next_free_x = left
+
+    for name in pending:
+        width, height = sizes[name]
+        placed = [positions[other] for other in neighbors[name] if other in positions]
+        if name in previous:
+            anchor = previous[name][:2]
+        elif placed:
+            anchor = (sum(x for x, _ in placed) / len(placed), sum(y for _, y in placed) / len(placed) + height + gap)
+        else:
+            anchor = (next_free_x, bottom + gap)
+            next_free_x += width + gap
+
+        position = _search_free_spot(index, anchor, width, height, gap)
+        if position is None:
+            position = (next_free_x, bottom + gap)
+            next_free_x += width + gap
+        positions[name] = position
+        index.insert((*position, width, height))
+
+    return positions
+
+
+def _same_size(stored: StoredPosition, size: Tuple[int, int]) -> bool:
+    """
+    Checks whether a stored box still has the size computed for the class.
+    """
+    _, _, width, height = stored
+    if width is None or height is None:
+        return True
+    return math.isclose(width, size[0]) and math.isclose(height, size[1])
+
+
+def _search_free_spot(index: _SpatialHash, anchor: Tuple[float, float],
+                      width: float, height: float, gap: float) -> Optional[Tuple[float, float]]:
+    """
+    Searches rings of growing radius around the anchor for a box that collides with nothing.
+    """
+    step_x, step_y = width / 2 + gap, height / 2 + gap
+    anchor_x, anchor_y = anchor
+    for offset_x, offset_y in _ring_offsets(SEARCH_RINGS):
+        candidate = (anchor_x + offset_x * step_x, anchor_y + offset_y * step_y)
+        if not index.collides((*candidate, width, height), gap):
+            return candidate
+    return None
+
+
+def _ring_offsets(rings: int) -> Iterator[Tuple[int, int]]:
+    """
+    Yields grid offsets ring by ring, starting with the anchor itself.
+    """
+    yield 0, 0
+    for ring in range(1, rings):
+        for offset in range(-ring, ring + 1):
+            yield offset, ring
+            yield offset, -ring
+        for offset in range(-ring + 1, ring):
+            yield ring, offset
+            yield -ring, offset
@@ -0,0 +1,107 @@
+from typing import Dict, Iterator, List, Tuple
+
+OVERLAP_GAP = 20
+RELAXATION_PASSES = 5
+# Bound on the moves made for one box while settling, after which it goes below everything
+MAX_SETTLE_MOVES = 100
+
+
+def remove_overlaps(positions: Dict[str, Tuple[float, float]], sizes: Dict[str, Tuple[int, int]],
+                    gap: float = OVERLAP_GAP, passes: int = RELAXATION_PASSES) -> Dict[str, Tuple[float, float]]:
+    """
+    Moves class boxes apart until no two boxes overlap.
+
+    Boxes are bucketed in a uniform grid, so a box is only compared with the boxes that
+    share a grid cell with it, and each pass costs O(n log n) rather than comparing every
+    pair. Removal runs in two stages:
+    - relaxation: a few passes push every overlapping pair apart along the axis where the
+      overlap is smallest, each box moving half of the distance, which keeps the overall
+      shape of the layout;
+    - settling: the boxes are then placed one by one from top to bottom, and a box that
+      still overlaps an already placed box is moved right or down, whichever is shorter,
+      until it is free. This stage guarantees that no overlap is left.
+
+    Args:
+        positions (Dict[str, Tuple[float, float]]): The top-left corner of every box.
+        sizes (Dict[str, Tuple[int, int]]): The final width and height of every box.
+        gap (float): The minimum distance kept between two boxes.
+        passes (int): The number of relaxation passes.
+
+    Returns:
+        Dict[str, Tuple[float, float]]: The adjusted top-left corner of every box.
+    """
+    if len(positions) < 2:
+        return dict(positions)
+
+    names = list(positions)
+    x = [float(positions[name][0]) for name in names]
+    y = [float(positions[name][1]) for name in names]
+    widths = [sizes[name][0] + gap for name in names]
+    heights = [sizes[name][1] + gap for name in names]
+    cell_size = sum(max(width, height) for width, height in zip(widths, heights)) / len(names)
+
+    def cells(index: int) -> Iterator[Tuple[int, int]]:
+        for cell_x in range(int(x[index] // cell_size), int((x[index] + widths[index]) // cell_size) + 1):
+            for cell_y in range(int(y[index] // cell_size), int((y[index] + heights[index]) // cell_size) + 1):
+                yield cell_x, cell_y
+
+    def overlap(first: int, second: int) -> Tuple[float, float]:
+        overlap_x = min(x[first] + widths[first], x[second] + widths[second]) - max(x[first], x[second])
+        overlap_y = min(y[first] + heights[first], y[second] + heights[second]) - max(y[first], y[second])
+        return overlap_x, overlap_y
+
+    for _ in range(passes):
+        grid: Dict[Tuple[int, int], List[int]] = {}
+        for index in range(len(names)):
+            for cell in cells(index):
+                grid.setdefault(cell, []).append(index)
+
+        moved = False
+        checked = set()
+        for members in grid.values():
+            for position, first in enumerate(members):
+                for second in members[position + 1:]:
+                    if (first, second) in checked:
+                        continue
+                    checked.add((first, second))
+
+                    overlap_x, overlap_y = overlap(first, second)
+                    if overlap_x <= 0 or overlap_y <= 0:
+                        continue
+                    moved = True
+                    if overlap_x < overlap_y:
+                        shift = overlap_x / 2 if x[first] <= x[second] else -overlap_x / 2
+                        x[first] -= shift
+                        x[second] += shift
+                    else:
+                        shift = overlap_y / 2 if y[first] <= y[second] else -overlap_y / 2
+                        y[first] -= shift
+                        y[second] += shift
+        if not moved:
+            break
+
+    placed: Dict[Tuple[int, int], List[int]] = {}
+    bottom = 0.0
+    for index in sorted(range(len(names)), key=lambda index: (y[index], x[index])):
+        for _ in range(MAX_SETTLE_MOVES):
+            blockers = {other for cell in cells(index) for other in placed.get(cell, ())}
+            shift_right = shift_down = 0.0
+            for other in blockers:
+                overlap_x, overlap_y = overlap(index, other)
+                if overlap_x > 0 and overlap_y > 0:
+                    shift_right = max(shift_right, x[other] + widths[other] - x[index])
+                    shift_down = max(shift_down, y[other] + heights[other] - y[index])
+            if shift_right == 0 and shift_down == 0:
+                break
+            if shift_right <= shift_down:
+                x[index] += shift_right
+            else:
+                y[index] += shift_down
+        else:
+            y[index] = bottom
+
+        bottom = max(bottom, y[index] + heights[index])
+        for cell in cells(index):
+            placed.setdefault(cell, []).append(index)
+
+    return {name: (round(x[index]), round(y[index])) for index, name in enumerate(names)}
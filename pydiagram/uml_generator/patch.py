@@ -0,0 +1,220 @@
+import xml.etree.ElementTree as ET
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+from pydiagram.py_class_extractor.diff import ClassKey, MetadataDiff, class_keys, diff_metadata
+from pydiagram.uml_generator.builders.relationships import RelationshipBuilder
+from pydiagram.uml_generator.edges import EdgeResolver
+from pydiagram.uml_generator.elements import CLASS_WIDTH, ROW_HEIGHT, UMLClassDiagramElement
+from pydiagram.uml_generator.layout.graph import ClassGraph
+from pydiagram.uml_generator.layout.incremental import incremental_layout, inflate_diagram
+from pydiagram.uml_generator.layout.layered import layered_layout
+from pydiagram.uml_generator.relationships import AssociationRelationship, InheritanceRelationship
+from pydiagram.uml_generator.utils import Dimensions, class_identifier, strip_badge
+
+RELATIONSHIP_TYPES = {
+    "inheritance": InheritanceRelationship,
+    "association": AssociationRelationship,
+}
+
+
+def patch_drawio(document: ET.Element, old_metadata: List[Dict[str, Any]], new_metadata: List[Dict[str, Any]],
+                 diff: Optional[MetadataDiff] = None) -> MetadataDiff:
+    """
+    Updates a draw.io diagram built from `old_metadata` so that it shows `new_metadata`.
+
+    Only the cells affected by the change are touched:
+    - the box of a removed class and its edges are deleted;
+    - the member rows of a class whose attributes or methods changed are rebuilt, while the
+      class cell keeps its id, its position and its width, including manual changes;
+    - edges are added or deleted where the resolved relationships differ;
+    - added classes are placed next to their neighbors without moving any other class.
+
+    Class boxes are matched to the old metadata by class name, in document order, as they
+    are written by `UMLClassDiagramElement`. Compressed diagrams are stored uncompressed
+    after the patch.
+
+    Args:
+        document (ET.Element): The root element of the draw.io file, modified in place.
+        old_metadata (List[Dict[str, Any]]): The class metadata the diagram was built from.
+        new_metadata (List[Dict[str, Any]]): The current class metadata.
+        diff (Optional[MetadataDiff]): The result of `diff_metadata(old_metadata, new_metadata)`,
+            when it is already known.
+
+    Returns:
+        MetadataDiff: The applied differences.
+
+    Raises:
+        ValueError: If the document holds no diagram.
+    """
+    if diff is None:
+        diff = diff_metadata(old_metadata, new_metadata)
+    model_root = _model_root(document)
+
+    cells = list(model_root)
+    children: Dict[str, List[ET.Element]] = {}
+    headers_by_name: Dict[str, List[ET.Element]] = {}
+    edges: Dict[Tuple[str, str, str], List[ET.Element]] = {}
+    for cell in cells:
+        if cell.get("edge") == "1":
+            relation_type = cell.get("id", "").split("-", 1)[0]
+            edges.setdefault((cell.get("source"), cell.get("target"), relation_type), []).append(cell)
+        elif cell.get("id", "").startswith("class-") and cell.get("vertex") == "1":
+            headers_by_name.setdefault(strip_badge(cell.get("value", "")), []).append(cell)
+        elif cell.get("parent") is not None:
+            children.setdefault(cell.get("parent"), []).append(cell)
+
+    # Match the class boxes with the old metadata
+    headers: Dict[ClassKey, ET.Element] = {}
+    taken = Counter()
+    for key, class_metadata in zip(class_keys(old_metadata), old_metadata):
+        candidates = headers_by_name.get(class_metadata["name"], [])
+        if taken[class_metadata["name"]] < len(candidates):
+            headers[key] = candidates[taken[class_metadata["name"]]]
+            taken[class_metadata["name"]] += 1
+    removed_ids = set()
+
+    old_by_key = dict(zip(class_keys(old_metadata), old_metadata))
+    new_keys = class_keys(new_metadata)
+    new_by_key = dict(zip(new_keys, new_metadata))
+    removed_keys = set(class_keys(old_metadata)) - set(new_keys)
+    for key in removed_keys:
+        header = headers.pop(key, None)
+        if header is None:
+            continue
+        removed_ids.add(header.get("id"))
+        for cell in [header, *children.pop(header.get("id"), [])]:
+            model_root.remove(cell)
+
+    for class_diff in diff.changed_classes:
+        header = headers.get(class_diff.key)
+        if header is not None and class_diff.members_changed:
+            _rebuild_members(model_root, header, children.pop(header.get("id"), []), new_by_key[class_diff.key])
+
+    # Place and build the added classes
+    added_keys = [key for key in new_keys if key not in headers]
+    if added_keys:
+        previous = {}
+        for key, header in headers.items():
+            geometry = header.find("mxGeometry")
+            previous[class_identifier(old_by_key[key])] = (
+                _number(geometry.get("x", 0)), _number(geometry.get("y", 0)), None, None)
+        positions = incremental_layout(ClassGraph.from_metadata(new_metadata), previous, layered_layout)
+
+        default_parent = _default_parent(model_root)
+        for key in added_keys:
+            x, y = positions[class_identifier(new_by_key[key])]
+            element = UMLClassDiagramElement(
+                new_by_key[key], Dimensions(x=x, y=y, width=CLASS_WIDTH, height=ROW_HEIGHT), default_parent)
+            model_root.extend(list(element))
+            headers[key] = element[0]
+
+    # Delete and add the edges whose resolved relationships changed
+    old_edges = _resolved_edges(old_metadata)
+    new_edges = _resolved_edges(new_metadata)
+    for (source, target, relation_type), count in (old_edges - new_edges).items():
+        if source not in headers or target not in headers:
+            continue
+        cells = edges.get((headers[source].get("id"), headers[target].get("id"), relation_type), [])
+        for cell in cells[:count]:
+            model_root.remove(cell)
+
+    for cell_list in edges.values():
+        for cell in cell_list:
+            if cell.get("source") in removed_ids or cell.get("target") in removed_ids:
+                model_root.remove(cell)
+
+    first_class = next((index for index, cell in enumerate(model_root) if cell.get("vertex") == "1"), len(model_root))
+    added_edges = []
+    for (source, target, relation_type), count in (new_edges - old_edges).items():
+        relationship_class = RELATIONSHIP_TYPES.get(relation_type)
+        if relationship_class is None:
+            continue
+        builder = RelationshipBuilder(_default_parent(model_root), headers[source].get("id"))
+        added_edges.extend(builder.build(relationship_class, headers[target].get("id")) for _ in range(count))
+    # Edges go before the class boxes, so that draw.io draws them underneath
+    model_root[first_class:first_class] = added_edges
+
+    return diff
+
+
+def patch_drawio_file(drawio_path: str, old_metadata: List[Dict[str, Any]], new_metadata: List[Dict[str, Any]],
+                      output_path: Optional[str] = None) -> MetadataDiff:
+    """
+    Patches a draw.io file in place, or into another file.
+
+    Args:
+        drawio_path (str): Path to the draw.io file built from `old_metadata`.
+        old_metadata (List[Dict[str, Any]]): The class metadata the diagram was built from.
+        new_metadata (List[Dict[str, Any]]): The current class metadata.
+        output_path (Optional[str]): Where to write the patched diagram. Defaults to `drawio_path`.
+
+    Returns:
+        MetadataDiff: The applied differences.
+    """
+    document = ET.parse(drawio_path).getroot()
+    diff = patch_drawio(document, old_metadata, new_metadata)
+    if not diff.is_empty() or output_path not in (None, drawio_path):
+        with open(output_path or drawio_path, "w", encoding="utf-8") as file:
+            file.write(ET.tostring(document, encoding="unicode"))
+    return diff
+
+
+def _model_root(document: ET.Element) -> ET.Element:
+    """
+    Returns the element holding the cells of the first page, inflating it if it is compressed.
+    """
+    diagram = document if document.tag == "diagram" else document.find("diagram")
+    if diagram is None:
+        raise ValueError("The document holds no draw.io diagram.")
+    if diagram.find("mxGraphModel") is None and diagram.text and diagram.text.strip():
+        diagram.append(ET.fromstring(inflate_diagram(diagram.text.strip())))
+        diagram.text = None
+
+    model_root = diagram.find("mxGraphModel/root")
+    if model_root is None:
+        raise ValueError("The document holds no draw.io diagram.")
+    return model_root
+
+
+def _default_parent(model_root: ET.Element) -> str:
+    """
+    Returns the id of the layer the class boxes are attached to.
+    """
+    for cell in model_root:
+        if cell.get("parent") == "0":
+            return cell.get("id")
+    return "1"
+
+
+def _rebuild_members(model_root: ET.Element, header: ET.Element, members: List[ET.Element],
+                     class_metadata: Dict[str, Any]) -> None:
+    """
+    Replaces the member rows of a class box and resizes the box, keeping its id, position and width.
+    """
+    geometry = header.find("mxGeometry")
+    dimensions = Dimensions(x=_number(geometry.get("x", 0)), y=_number(geometry.get("y", 0)),
+                            width=_number(geometry.get("width", CLASS_WIDTH)), height=ROW_HEIGHT)
+    element = UMLClassDiagramElement(class_metadata, dimensions, header.get("parent"), header.get("id"))
+
+    for cell in members:
+        model_root.remove(cell)
+    position = list(model_root).index(header) + 1
+    model_root[position:position] = list(element)[1:]
+    geometry.set("height", element[0].find("mxGeometry").get("height"))
+
+
+def _number(value: Any) -> float:
+    """
+    Parses a geometry value, keeping whole numbers as integers so they are written back unchanged.
+    """
+    number = float(value)
+    return int(number) if number.is_integer() else number
+
+
+def _resolved_edges(metadata: List[Dict[str, Any]]) -> Counter:
+    """
+    Resolves the relationships of a snapshot into (source key, target key, relation type) counts.
+    """
+    keys = class_keys(metadata)
+    return Counter((keys[edge.source], keys[edge.target], edge.relation_type)
+                   for edge in EdgeResolver(metadata).resolve())
@@ -0,0 +1,237 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, List, TextIO, Tuple, Type
+from pydiagram.uml_generator.edges import EdgeResolver
+from pydiagram.uml_generator.utils import class_identifier, display_name, encapsulation_signal
+
+
+class TextRenderer(ABC):
+    """
+    Abstract base class for renderers that write a class diagram as plain text.
+
+    Text renderers consume the class metadata stream one class at a time and write
+    each line to the output stream as soon as it is known. No XML tree is built and
+    no layout is computed; the consumer of the text (PlantUML, Mermaid, Graphviz) is
+    responsible for placing the classes.
+
+    Relationships are buffered until the end of the stream, because a relationship
+    can only be written once it is known that its target class is part of the diagram.
+
+    Attributes:
+        stream (TextIO): The stream the diagram is written to.
+    """
+
+    def __init__(self, stream: TextIO) -> None:
+        """
+        Initializes the renderer with the output stream.
+
+        Args:
+            stream (TextIO): The stream the diagram is written to.
+        """
+        self.stream = stream
+
+    def render(self, metadata: Iterable[Dict[str, Any]]) -> None:
+        """
+        Writes the whole diagram for the given class metadata.
+
+        Args:
+            metadata (Iterable[Dict[str, Any]]): Class metadata dictionaries, as produced by
+                the class extractor. The iterable is consumed only once.
+        """
+        resolver = EdgeResolver()
+        class_ids: List[str] = []
+
+        self._write_lines(self.begin())
+        for class_metadata in metadata:
+            class_id = self.class_id(class_metadata)
+            resolver.add(class_metadata)
+            class_ids.append(class_id)
+            self._write_lines(self.render_class(class_id, class_metadata))
+
+        for edge in resolver.resolve():
+            self._write_lines(self.render_relationship(
+                class_ids[edge.source], class_ids[edge.target], edge.relation_type))
+        self._write_lines(self.end())
+
+    def class_id(self, class_metadata: Dict[str, Any]) -> str:
+        """
+        Builds the identifier used for a class in the rendered text.
+
+        The identifier is the one the layout uses (see `class_identifier`), so that classes
+        sharing the same name in different modules, or nested in different classes of the
+        same module, do not collapse into a single node.
+
+        Args:
+            class_metadata (Dict[str, Any]): The class metadata.
+
+        Returns:
+            str: An identifier made only of alphanumeric characters and underscores.
+        """
+        return class_identifier(class_metadata)
+
+    def begin(self) -> Iterable[str]:
+        """
+        Returns the lines written before the first class.
+        """
+        return ()
+
+    def end(self) -> Iterable[str]:
+        """
+        Returns the lines written after the last relationship.
+        """
+        return ()
+
+    @abstractmethod
+    def render_class(self, class_id: str, class_metadata: Dict[str, Any]) -> Iterable[str]:
+        """
+        Returns the lines describing a single class.
+
+        Args:
+            class_id (str): The identifier of the class.
+            class_metadata (Dict[str, Any]): The class metadata.
+        """
+        pass
+
+    @abstractmethod
+    def render_relationship(self, source_id: str, target_id: str, relation_type: str) -> Iterable[str]:
+        """
+        Returns the lines describing a relationship between two classes.
+
+        Args:
+            source_id (str): The identifier of the source class.
+            target_id (str): The identifier of the target class.
+            relation_type (str): The relationship type ("inheritance" or "association").
+        """
+        pass
+
+    def _write_lines(self, lines: Iterable[str]) -> None:
+        for line in lines:
+            self.stream.write(line)
+            self.stream.write("\n")
+
+    @staticmethod
+    def _members(class_metadata: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+        """
+        Formats the attributes and methods of a class using UML visibility signals.
+        """
+        attributes = [f"{encapsulation_signal(attribute['encapsulation'])}{attribute['name']}"
+                      for attribute in class_metadata["attributes"]]
+        methods = [f"{encapsulation_signal(method['encapsulation'])}{method['name']}({', '.join(method['args'])})"
+                   for method in class_metadata["methods"]]
+        return attributes, methods
+
+
+class PlantUMLRenderer(TextRenderer):
+    """
+    Renders class metadata as a PlantUML class diagram.
+    """
+
+    def begin(self) -> Iterable[str]:
+        return ("@startuml",)
+
+    def end(self) -> Iterable[str]:
+        return ("@enduml",)
+
+    def render_class(self, class_id: str, class_metadata: Dict[str, Any]) -> Iterable[str]:
+        attributes, methods = self._members(class_metadata)
+        yield f'class "{display_name(class_metadata)}" as {class_id} {{'
+        for attribute in attributes:
+            yield f"  {{field}} {attribute}"
+        for method in methods:
+            yield f"  {{method}} {method}"
+        yield "}"
+
+    def render_relationship(self, source_id: str, target_id: str, relation_type: str) -> Iterable[str]:
+        if relation_type == "inheritance":
+            yield f"{target_id} <|-- {source_id}"
+        elif relation_type == "association":
+            yield f"{source_id} -- {target_id}"
+
+
+class MermaidRenderer(TextRenderer):
+    """
+    Renders class metadata as a Mermaid classDiagram.
+    """
+
+    def begin(self) -> Iterable[str]:
+        return ("classDiagram",)
+
+    def render_class(self, class_id: str, class_metadata: Dict[str, Any]) -> Iterable[str]:
+        attributes, methods = self._members(class_metadata)
+        name = display_name(class_metadata).replace('"', "'")
+        yield f'  class {class_id}["{name}"] {{'
+        for member in attributes + methods:
+            yield f"    {member}"
+        yield "  }"
+
+    def render_relationship(self, source_id: str, target_id: str, relation_type: str) -> Iterable[str]:
+        if relation_type == "inheritance":
+            yield f"  {target_id} <|-- {source_id}"
+        elif relation_type == "association":
+            yield f"  {source_id} -- {target_id}"
+
+
+class DotRenderer(TextRenderer):
+    """
+    Renders class metadata as a Graphviz DOT digraph using record-shaped nodes.
+    """
+
+    def begin(self) -> Iterable[str]:
+        return (
+            "digraph classes {",
+            "  rankdir=BT;",
+            '  node [shape=record, fontname="Helvetica", fontsize=10];',
+        )
+
+    def end(self) -> Iterable[str]:
+        return ("}",)
+
+    def render_class(self, class_id: str, class_metadata: Dict[str, Any]) -> Iterable[str]:
+        attributes, methods = self._members(class_metadata)
+        sections = [
+            self._escape(display_name(class_metadata)),
+            "".join(f"{self._escape(attribute)}\\l" for attribute in attributes),
+            "".join(f"{self._escape(method)}\\l" for method in methods),
+        ]
+        yield f'  {class_id} [label="{{{"|".join(sections)}}}"];'
+
+    def render_relationship(self, source_id: str, target_id: str, relation_type: str) -> Iterable[str]:
+        if relation_type == "inheritance":
+            yield f"  {source_id} -> {target_id} [arrowhead=empty];"
+        elif relation_type == "association":
+            yield f"  {source_id} -> {target_id} [arrowhead=none];"
+
+    @staticmethod
+    def _escape(text: str) -> str:
+        """
+        Escapes the characters that have a special meaning inside DOT record labels.
+        """
+        for char in '\\"{}|<>':
+            text = text.replace(char, f"\\{char}")
+        return text
+
+
+RENDERERS: Dict[str, Type[TextRenderer]] = {
+    "plantuml": PlantUMLRenderer,
+    "mermaid": MermaidRenderer,
+    "dot": DotRenderer,
+}
+
+
+def render_text_diagram(metadata: Iterable[Dict[str, Any]], stream: TextIO, output_format: str) -> None:
+    """
+    Writes a text class diagram for the given metadata.
+
+    Args:
+        metadata (Iterable[Dict[str, Any]]): Class metadata dictionaries.
+        stream (TextIO): The stream the diagram is written to.
+        output_format (str): One of the keys of `RENDERERS` ("plantuml", "mermaid" or "dot").
+
+    Raises:
+        ValueError: If the output format is unknown.
+    """
+    try:
+        renderer_class = RENDERERS[output_format]
+    except KeyError:
+        raise ValueError(
+            f"Unknown output format: {output_format}. Expected one of: {', '.join(RENDERERS)}")
+    renderer_class(stream).render(metadata)
@@ -0,0 +1,184 @@
+from typing import Any, Dict, Iterable, List, Optional, Set
+from pydiagram.py_class_extractor.diff import qualified_name
+from pydiagram.uml_generator.edges import EdgeResolver
+
+RANKINGS = ("degree", "pagerank")
+
+PAGERANK_DAMPING = 0.85
+# The iterations stop when the ranks change by less than the tolerance in total
+PAGERANK_MAX_ITERATIONS = 100
+PAGERANK_TOLERANCE = 1e-6
+
+
+def class_targets(metadata: List[Dict[str, Any]]) -> List[Set[int]]:
+    """
+    Resolves the relationships of every class to the other classes they point to.
+
+    Args:
+    - metadata (List[Dict[str, Any]]): Class metadata dictionaries.
+
+    Returns:
+    - List[Set[int]]: For each class, the indices of the other classes its relationships point to.
+    """
+    targets: List[Set[int]] = [set() for _ in metadata]
+    for edge in EdgeResolver(metadata).resolve():
+        if edge.source != edge.target:
+            targets[edge.source].add(edge.target)
+    return targets
+
+
+def class_neighbors(targets: List[Set[int]]) -> List[Set[int]]:
+    """
+    Computes the classes each class is connected to, in either direction.
+
+    Args:
+    - targets (List[Set[int]]): The classes each class points to, as returned by `class_targets`.
+
+    Returns:
+    - List[Set[int]]: For each class, the indices of the classes it points to or that point to it.
+    """
+    neighbors = [set(class_targets) for class_targets in targets]
+    for source, class_targets in enumerate(targets):
+        for target in class_targets:
+            neighbors[target].add(source)
+    return neighbors
+
+
+def pagerank_scores(targets: List[Set[int]], damping: float = PAGERANK_DAMPING) -> List[float]:
+    """
+    Scores every class by its PageRank on the relationship graph.
+
+    Relationships point from a class to the class it inherits from or uses, so base
+    classes and widely used classes rank high. Classes without outgoing relationships
+    spread their rank evenly over all classes.
+
+    Args:
+    - targets (List[Set[int]]): The classes each class points to, as returned by `class_targets`.
+    - damping (float): The probability of following a relationship rather than jumping to a random class.
+
+    Returns:
+    - List[float]: The score of each class, summing to 1.
+    """
+    count = len(targets)
+    if count == 0:
+        return []
+
+    outgoing = [(source, list(class_targets)) for source, class_targets in enumerate(targets) if class_targets]
+    dangling = [source for source, class_targets in enumerate(targets) if not class_targets]
+
+    ranks = [1.0 / count] * count
+    for _ in range(PAGERANK_MAX_ITERATIONS):
+        base = (1.0 - damping + damping * sum(ranks[source] for source in dangling)) / count
+        new_ranks = [base] * count
+        for source, class_targets in outgoing:
+            share = damping * ranks[source] / len(class_targets)
+            for target in class_targets:
+                new_ranks[target] += share
+        change = sum(abs(new - old) for new, old in zip(new_ranks, ranks))
+        ranks = new_ranks
+        if change < PAGERANK_TOLERANCE:
+            break
+    return ranks
+
+
+def select_top_classes(metadata: List[Dict[str, Any]], limit: int, ranking: str = "degree") -> List[Dict[str, Any]]:
+    """
+    Keeps the `limit` most connected classes of a diagram.
+
+    The classes are ranked by degree, the number of classes they are related to by
+    inheritance or association, or by `pagerank_scores`; ties keep the metadata order.
+    The kept classes are returned in metadata order, each as a copy carrying a
+    "hidden_neighbors" count: the number of classes it is related to that were pruned,
+    which the renderers show next to the class name. Relationships to pruned classes are
+    left in the metadata and simply resolve to nothing, so the cost of the layout and the
+    rendering only depends on `limit`.
+
+    Args:
+    - metadata (List[Dict[str, Any]]): Class metadata dictionaries.
+    - limit (int): The maximum number of classes to keep.
+    - ranking (str): One of `RANKINGS`.
+
+    Returns:
+    - List[Dict[str, Any]]: The metadata of the kept classes.
+
+    Raises:
+    - ValueError: If the ranking is unknown or the limit is negative.
+    """
+    if ranking not in RANKINGS:
+        raise ValueError(f"Unknown ranking: {ranking}. Expected one of: {', '.join(RANKINGS)}")
+    if limit < 0:
+        raise ValueError(f"The number of classes to keep must be positive, got {limit}.")
+
+    targets = class_targets(metadata)
+    neighbors = class_neighbors(targets)
+    if ranking == "degree":
+        scores = [len(related) for related in neighbors]
+    else:
+        scores = pagerank_scores(targets)
+    ranked = sorted(range(len(metadata)), key=lambda index: -scores[index])
+    return hide_classes(metadata, set(ranked[:limit]), neighbors)
+
+
+def select_neighborhood(metadata: List[Dict[str, Any]], seeds: Iterable[str], hops: int = 1,
+                        neighbors: Optional[List[Set[int]]] = None) -> List[Dict[str, Any]]:
+    """
+    Keeps the seed classes and the classes within `hops` relationships of them.
+
+    Relationships are followed in both directions, on the adjacency of the resolved
+    relationship graph, so the cost of the walk only depends on the size of the neighborhood
+    once the adjacency is known. As with `select_top_classes`, the kept classes carry a
+    "hidden_neighbors" count.
+
+    Args:
+    - metadata (List[Dict[str, Any]]): Class metadata dictionaries.
+    - seeds (Iterable[str]): Class names ("Widget") or qualified names ("pkg.module.Widget",
+      "pkg.module.Outer.Inner").
+      A name matches every class with that name.
+    - hops (int): The maximum number of relationships between a seed and a kept class.
+    - neighbors (Optional[List[Set[int]]]): The adjacency returned by `class_neighbors` for
+      `metadata`, when it is already known, for example by a server answering several queries.
+
+    Returns:
+    - List[Dict[str, Any]]: The metadata of the kept classes, in metadata order.
+
+    Raises:
+    - ValueError: If no class matches the seeds, or if `hops` is negative.
+    """
+    if hops < 0:
+        raise ValueError(f"The number of hops must be positive, got {hops}.")
+    seeds = set(seeds)
+    frontier = {index for index, class_metadata in enumerate(metadata)
+                if class_metadata["name"] in seeds or qualified_name(class_metadata) in seeds}
+    if not frontier:
+        raise ValueError(f"No class matches {', '.join(sorted(seeds))}.")
+    if neighbors is None:
+        neighbors = class_neighbors(class_targets(metadata))
+
+    reached = set(frontier)
+    for _ in range(hops):
+        frontier = {neighbor for index in frontier for neighbor in neighbors[index]} - reached
+        if not frontier:
+            break
+        reached |= frontier
+    return hide_classes(metadata, reached, neighbors)
+
+
+def hide_classes(metadata: List[Dict[str, Any]], kept: Set[int], neighbors: List[Set[int]]) -> List[Dict[str, Any]]:
+    """
+    Keeps a subset of the classes, counting on each kept class the related classes that are hidden.
+
+    The count adds up with the "hidden_neighbors" count the metadata may already carry, so
+    that selections applied one after the other, such as a neighborhood then its top classes,
+    count the classes hidden by each of them.
+
+    Args:
+    - metadata (List[Dict[str, Any]]): Class metadata dictionaries.
+    - kept (Set[int]): The indices of the classes to keep.
+    - neighbors (List[Set[int]]): The related classes of each class, as returned by `class_neighbors`.
+
+    Returns:
+    - List[Dict[str, Any]]: Copies of the kept classes, in metadata order, with a "hidden_neighbors" count.
+    """
+    return [{**metadata[index],
+             "hidden_neighbors": metadata[index].get("hidden_neighbors", 0) + len(neighbors[index] - kept)}
+            for index in sorted(kept)]
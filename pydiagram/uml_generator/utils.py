@@ -1,7 +1,12 @@
 import json
+import re
 import xml.etree.ElementTree as ET
 from collections import namedtuple
 from typing import Any, List, Optional, Dict
+from pydiagram.py_class_extractor.diff import qualified_name
+
+# The "(+N)" badge `display_name` appends to the name of a class with hidden related classes
+BADGE_PATTERN = re.compile(r" \(\+\d+\)$")
 
 
 class Dimensions(namedtuple('Dimensions', ['x', 'y', 'width', 'height'])):
@@ -142,3 +147,80 @@ def get_elements_by_attribute(root: ET.Element, attribute_name: str, attribute_v
     - List[ET.Element]: A list of XML elements matching the specified attribute and value.
     """
     return [element for element in root.findall('.//*') if element.get(attribute_name) == attribute_value]
+
+
+def sanitize_class_name(name: str) -> str:
+    """
+    Sanitizes a class name so it can be used as a node identifier.
+
+    Args:
+    - name (str): The class name to sanitize.
+
+    Returns:
+    - str: The name with every character that is not alphanumeric or an underscore removed.
+    """
+    return ''.join(char for char in name if char.isalnum() or char == '_')
+
+
+def class_identifier(class_metadata: Dict[str, Any]) -> str:
+    """
+    Builds the identifier of a class in diagrams and layouts.
+
+    The identifier is qualified with the module path and the enclosing classes, so that
+    classes sharing the same name in different modules, or nested in different classes of
+    the same module, are distinct nodes with distinct positions.
+
+    Args:
+    - class_metadata (Dict[str, Any]): The class metadata.
+
+    Returns:
+    - str: An identifier made only of alphanumeric characters and underscores, for example
+      "pkg_module_Outer_Inner".
+    """
+    return "_".join(sanitize_class_name(part) for part in qualified_name(class_metadata).split("."))
+
+
+def display_name(class_metadata: Dict[str, Any]) -> str:
+    """
+    Returns the name shown for a class, with a badge counting its hidden related classes.
+
+    Args:
+    - class_metadata (Dict[str, Any]): The class metadata, possibly returned by `selection.select_top_classes`.
+
+    Returns:
+    - str: The class name, followed by "(+N)" when N related classes were pruned.
+    """
+    hidden = class_metadata.get("hidden_neighbors")
+    return f"{class_metadata['name']} (+{hidden})" if hidden else class_metadata["name"]
+
+
+def strip_badge(label: str) -> str:
+    """
+    Returns the class name of a label written by `display_name`.
+
+    Args:
+    - label (str): The label of a class box, for example "Widget (+3)".
+
+    Returns:
+    - str: The class name, for example "Widget".
+    """
+    return BADGE_PATTERN.sub("", label)
+
+
+def has_common_element(arr1: List[Any], arr2: List[Any]) -> bool:
+    """
+    Checks whether two module lists refer to a common module.
+
+    Two empty lists are considered to match, which is how classes without module
+    information are paired with each other.
+
+    Args:
+    - arr1 (List[Any]): The first list.
+    - arr2 (List[Any]): The second list.
+
+    Returns:
+    - bool: True if both lists are empty or if they share at least one element.
+    """
+    if len(arr1) == 0 and len(arr2) == 0:
+        return True
+    return bool(set(arr1) & set(arr2))